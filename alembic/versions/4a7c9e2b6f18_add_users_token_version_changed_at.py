@@ -0,0 +1,41 @@
+"""add users.token_version_changed_at
+
+Revision ID: 4a7c9e2b6f18
+Revises: d8a1c5e3b942
+Create Date: 2026-10-19 11:26:51.094472
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4a7c9e2b6f18'
+down_revision: Union[str, Sequence[str], None] = 'd8a1c5e3b942'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('token_version_changed_at', sa.DateTime(timezone=True), nullable=True))
+    # زمان باطل‌شدن‌های قبلی معلوم نیست؛ یه طول عمر توکن دیگه توی جدول نسخه‌ها می‌مونن
+    op.execute("UPDATE users SET token_version_changed_at = now() WHERE token_version > 0 OR NOT is_active")
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_users_revoked_tokens', table_name='users', postgresql_concurrently=True)
+        op.create_index(
+            'ix_users_token_version_changed_at', 'users', ['token_version_changed_at'],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_users_token_version_changed_at', table_name='users')
+    op.create_index(
+        'ix_users_revoked_tokens', 'users', ['id'],
+        postgresql_where=sa.text('token_version > 0 OR NOT is_active'),
+    )
+    op.drop_column('users', 'token_version_changed_at')
@@ -0,0 +1,36 @@
+"""add exclusion constraint preventing overlapping appointments
+
+Revision ID: 5b1e7c2d9a40
+Revises: e2fcdf7a4288
+Create Date: 2026-10-18 16:02:11.412305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b1e7c2d9a40'
+down_revision: Union[str, Sequence[str], None] = 'e2fcdf7a4288'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    op.create_exclude_constraint(
+        'appointments_no_overlap',
+        'appointments',
+        ('provider_id', '='),
+        (sa.func.tsrange(sa.literal_column('start_time'), sa.literal_column('end_time')), '&&'),
+        using='gist',
+        where=sa.text("status IN ('pending', 'confirmed')"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('appointments_no_overlap', 'appointments')
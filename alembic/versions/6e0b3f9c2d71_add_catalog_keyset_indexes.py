@@ -0,0 +1,37 @@
+"""add (created_at, id) indexes for services and provider_services
+
+Revision ID: 6e0b3f9c2d71
+Revises: 2c5f8a0d7e14
+Create Date: 2026-10-19 10:12:40.227914
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6e0b3f9c2d71'
+down_revision: Union[str, Sequence[str], None] = '2c5f8a0d7e14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ('ix_services_created_at_id', 'services', ['created_at', 'id']),
+    ('ix_provider_services_created_at_id', 'provider_services', ['created_at', 'id']),
+    ('ix_provider_services_provider_id_created_at_id', 'provider_services', ['provider_id', 'created_at', 'id']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,75 @@
+"""add composite indexes for appointment and availability hot queries
+
+Revision ID: 8d3f0a6b1c52
+Revises: 5b1e7c2d9a40
+Create Date: 2026-10-18 16:40:27.905118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d3f0a6b1c52'
+down_revision: Union[str, Sequence[str], None] = '5b1e7c2d9a40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # which duplicate offering (and price) to keep is a business decision,
+    # so stop with the offending rows instead of deleting any of them
+    duplicates = op.get_bind().execute(sa.text(
+        "SELECT provider_id, service_id, count(*) AS offerings FROM provider_services "
+        "GROUP BY provider_id, service_id HAVING count(*) > 1 ORDER BY provider_id, service_id"
+    )).all()
+    if duplicates:
+        raise RuntimeError(
+            "provider_services has several rows for the same provider and service; "
+            "remove the extra rows and rerun the migration:\n"
+            + "\n".join(
+                f"  provider_id={row.provider_id} service_id={row.service_id} ({row.offerings} rows)"
+                for row in duplicates
+            )
+        )
+    op.create_unique_constraint(
+        'uq_provider_services_provider_id_service_id',
+        'provider_services',
+        ['provider_id', 'service_id'],
+    )
+    # CONCURRENTLY so large tables stay writable while the indexes build
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_appointments_patient_id_start_time', 'appointments',
+            ['patient_id', 'start_time'],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_appointments_provider_id_start_time', 'appointments',
+            ['provider_id', 'start_time'],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_appointments_provider_id_active', 'appointments',
+            ['provider_id', 'start_time', 'end_time'],
+            postgresql_where=sa.text("status IN ('pending', 'confirmed')"),
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_availabilities_provider_id_available', 'availabilities',
+            ['provider_id', 'start_time', 'end_time'],
+            postgresql_where=sa.text('is_available'),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_availabilities_provider_id_available', table_name='availabilities')
+    op.drop_index('ix_appointments_provider_id_active', table_name='appointments')
+    op.drop_index('ix_appointments_provider_id_start_time', table_name='appointments')
+    op.drop_index('ix_appointments_patient_id_start_time', table_name='appointments')
+    op.drop_constraint('uq_provider_services_provider_id_service_id', 'provider_services', type_='unique')
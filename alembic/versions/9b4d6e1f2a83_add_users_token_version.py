@@ -0,0 +1,35 @@
+"""add users.token_version
+
+Revision ID: 9b4d6e1f2a83
+Revises: f3a8d2c61b07
+Create Date: 2026-10-18 21:05:12.407913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b4d6e1f2a83'
+down_revision: Union[str, Sequence[str], None] = 'f3a8d2c61b07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('token_version', sa.Integer(), server_default='0', nullable=False))
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_users_revoked_tokens', 'users', ['id'],
+            postgresql_where=sa.text('token_version > 0 OR NOT is_active'),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_users_revoked_tokens', table_name='users')
+    op.drop_column('users', 'token_version')
@@ -0,0 +1,39 @@
+"""add (created_at, id) indexes for keyset pagination
+
+Revision ID: a41c9e7f3d18
+Revises: 8d3f0a6b1c52
+Create Date: 2026-10-18 17:21:54.118620
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a41c9e7f3d18'
+down_revision: Union[str, Sequence[str], None] = '8d3f0a6b1c52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ('ix_appointments_created_at_id', 'appointments', ['created_at', 'id']),
+    ('ix_appointments_patient_id_created_at_id', 'appointments', ['patient_id', 'created_at', 'id']),
+    ('ix_appointments_provider_id_created_at_id', 'appointments', ['provider_id', 'created_at', 'id']),
+    ('ix_availabilities_provider_id_created_at_id', 'availabilities', ['provider_id', 'created_at', 'id']),
+    ('ix_users_created_at_id', 'users', ['created_at', 'id']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,31 @@
+"""add appointments.start_time index for analytics range scans
+
+Revision ID: c7e2b19f4a65
+Revises: a41c9e7f3d18
+Create Date: 2026-10-18 19:02:11.530274
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7e2b19f4a65'
+down_revision: Union[str, Sequence[str], None] = 'a41c9e7f3d18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_appointments_start_time', 'appointments', ['start_time'], postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_appointments_start_time', table_name='appointments')
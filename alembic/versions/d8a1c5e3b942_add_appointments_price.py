@@ -0,0 +1,35 @@
+"""add appointments.price, the provider-service price at booking time
+
+Revision ID: d8a1c5e3b942
+Revises: 6e0b3f9c2d71
+Create Date: 2026-10-19 10:41:03.518266
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8a1c5e3b942'
+down_revision: Union[str, Sequence[str], None] = '6e0b3f9c2d71'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('appointments', sa.Column('price', sa.Integer(), nullable=True))
+    # قیمت زمان رزرو نوبت‌های قبلی معلوم نیست؛ همون قیمتی که rollupها باهاش ساخته شدن
+    op.execute("""
+        UPDATE appointments a
+        SET price = ps.price
+        FROM provider_services ps
+        WHERE ps.provider_id = a.provider_id AND ps.service_id = a.service_id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('appointments', 'price')
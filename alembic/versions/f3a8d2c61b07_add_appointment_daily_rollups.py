@@ -0,0 +1,59 @@
+"""add appointment_daily_rollups
+
+Revision ID: f3a8d2c61b07
+Revises: c7e2b19f4a65
+Create Date: 2026-10-18 19:48:37.204816
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a8d2c61b07'
+down_revision: Union[str, Sequence[str], None] = 'c7e2b19f4a65'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COUNTERS = ['pending', 'confirmed', 'completed', 'cancelled', 'booked_minutes', 'revenue']
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'appointment_daily_rollups',
+        sa.Column('provider_id', sa.UUID(), nullable=False),
+        sa.Column('service_id', sa.UUID(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        *[sa.Column(name, sa.Integer(), server_default='0', nullable=False) for name in COUNTERS],
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['provider_id'], ['users.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['service_id'], ['services.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('provider_id', 'service_id', 'day'),
+    )
+    op.create_index('ix_appointment_daily_rollups_day', 'appointment_daily_rollups', ['day'])
+    # backfill: همون query که دستور rebuild_rollups اجرا می‌کنه
+    op.execute("""
+        INSERT INTO appointment_daily_rollups
+            (provider_id, service_id, day, pending, confirmed, completed, cancelled, booked_minutes, revenue)
+        SELECT a.provider_id, a.service_id, date(a.start_time),
+               count(*) FILTER (WHERE a.status = 'pending'),
+               count(*) FILTER (WHERE a.status = 'confirmed'),
+               count(*) FILTER (WHERE a.status = 'completed'),
+               count(*) FILTER (WHERE a.status = 'cancelled'),
+               coalesce(sum(CAST(EXTRACT(EPOCH FROM a.end_time) - EXTRACT(EPOCH FROM a.start_time) AS INTEGER) / 60)
+                        FILTER (WHERE a.status != 'cancelled'), 0),
+               coalesce(sum(ps.price) FILTER (WHERE a.status != 'cancelled'), 0)
+        FROM appointments a
+        LEFT OUTER JOIN provider_services ps
+            ON ps.provider_id = a.provider_id AND ps.service_id = a.service_id
+        GROUP BY a.provider_id, a.service_id, date(a.start_time)
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_appointment_daily_rollups_day', table_name='appointment_daily_rollups')
+    op.drop_table('appointment_daily_rollups')
@@ -0,0 +1,97 @@
+import base64
+import binascii
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from fastapi import HTTPException, Query, status
+from sqlalchemy import Select, and_, func, literal, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.scheduling import to_naive_utc
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def encode_cursor(row_id: uuid.UUID, created_at: datetime) -> str:
+    # SQLite created_at رو بدون tzinfo (UTC) برمی‌گردونه
+    micros = (to_naive_utc(created_at) - datetime(1970, 1, 1)) // timedelta(microseconds=1)
+    raw = row_id.bytes + micros.to_bytes(8, "big", signed=True)
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[uuid.UUID, datetime]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        if len(raw) != 24:
+            raise ValueError(cursor)
+        micros = int.from_bytes(raw[16:], "big", signed=True)
+        return uuid.UUID(bytes=raw[:16]), _EPOCH + timedelta(microseconds=micros)
+    except (binascii.Error, ValueError, OverflowError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def epoch_seconds(value: datetime) -> int:
+    return int((value - datetime(1970, 1, 1)).total_seconds())
+
+
+def validate_window(
+    window_start: datetime,
+    window_end: datetime,
+    max_days: int = settings.SLOT_SEARCH_MAX_DAYS,
+) -> tuple[datetime, datetime]:
+    window_start, window_end = to_naive_utc(window_start), to_naive_utc(window_end)
+    if window_start >= window_end:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, detail="from must be before to")
+    if window_end - window_start > timedelta(days=max_days):
+        raise HTTPException(
+            status.HTTP_400_BAD_REQUEST,
+            detail=f"window can be at most {max_days} days",
+        )
+    return window_start, window_end
+
+
+class Pagination:
+    """
+    Keyset pagination on (created_at, id).
+
+    The cursor carries the id and created_at of the last row. While that row
+    exists its created_at is read back in a subquery, so both sides of the
+    comparison come from the database; once it is deleted the cursor's copy
+    is used instead.
+    """
+
+    def __init__(
+        self,
+        limit: int = Query(
+            default=settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX,
+            description="maximum number of items in the page",
+        ),
+        cursor: Optional[str] = Query(default=None, description="next_cursor of the previous page"),
+    ):
+        self.limit = limit
+        self.cursor_id, self.cursor_created_at = decode_cursor(cursor) if cursor else (None, None)
+
+    async def paginate(self, db: AsyncSession, stmt: Select, model) -> dict:
+        if self.cursor_id is not None:
+            cursor_created_at = func.coalesce(
+                select(model.created_at).where(model.id == self.cursor_id).scalar_subquery(),
+                literal(self.cursor_created_at, model.created_at.type),
+            )
+            stmt = stmt.where(
+                or_(
+                    model.created_at > cursor_created_at,
+                    and_(model.created_at == cursor_created_at, model.id > self.cursor_id),
+                )
+            )
+
+        stmt = stmt.order_by(model.created_at, model.id).limit(self.limit + 1)
+        items = (await db.execute(stmt)).scalars().all()
+
+        next_cursor = None
+        if len(items) > self.limit:
+            items = items[: self.limit]
+            next_cursor = encode_cursor(items[-1].id, items[-1].created_at)
+        return {"items": items, "next_cursor": next_cursor}
@@ -0,0 +1,212 @@
+import uuid
+from typing import List, Optional
+from datetime import date, datetime, timedelta, timezone
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import Float, Integer, and_, case, cast, func, literal, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.deps import epoch_seconds, validate_window
+from app.core.config import settings
+from app.core.security import require_admin
+from app.db.functions import epoch
+from app.db.session import get_db
+from app.models.appointment import Appointment
+from app.models.appointment_rollup import AppointmentDailyRollup
+from app.models.availability import Availability
+from app.models.service import Service
+from app.models.user import User
+from app.schema.analytics_schema import *
+
+router = APIRouter(tags=["analytics"], prefix="/analytics")
+
+# همه‌ی گزارش‌ها با group by و window function داخل دیتابیس حساب می‌شن
+
+
+def analytics_window(
+    window_start: datetime = Query(..., alias="from"),
+    window_end: datetime = Query(..., alias="to"),
+) -> tuple[datetime, datetime]:
+    return validate_window(window_start, window_end, settings.ANALYTICS_MAX_DAYS)
+
+
+def clipped_minutes(start, end, window: tuple[datetime, datetime]):
+    """Minutes of [start, end) that fall inside the window."""
+    lower = literal(epoch_seconds(window[0]), Float)
+    upper = literal(epoch_seconds(window[1]), Float)
+    start_s, end_s = epoch(start), epoch(end)
+    return (
+        case((end_s < upper, end_s), else_=upper) - case((start_s > lower, start_s), else_=lower)
+    ) / 60
+
+
+def in_window(column_start, column_end, window: tuple[datetime, datetime]):
+    return and_(column_start < window[1], column_end > window[0])
+
+
+@router.get("/utilization", response_model=List[ProviderUtilizationSchema])
+async def provider_utilization(
+    window: tuple[datetime, datetime] = Depends(analytics_window),
+    provider_id: Optional[uuid.UUID] = None,
+    db: AsyncSession = Depends(get_db),
+    admin=Depends(require_admin),
+):
+    available = (
+        select(
+            Availability.provider_id,
+            func.sum(clipped_minutes(Availability.start_time, Availability.end_time, window)).label("minutes"),
+        )
+        .where(
+            Availability.is_available == True,
+            in_window(Availability.start_time, Availability.end_time, window),
+        )
+        .group_by(Availability.provider_id)
+        .cte("available")
+    )
+    booked = (
+        select(
+            Appointment.provider_id,
+            func.sum(clipped_minutes(Appointment.start_time, Appointment.end_time, window)).label("minutes"),
+        )
+        .where(
+            Appointment.status != "cancelled",
+            in_window(Appointment.start_time, Appointment.end_time, window),
+        )
+        .group_by(Appointment.provider_id)
+        .cte("booked")
+    )
+
+    available_minutes = func.coalesce(available.c.minutes, 0)
+    booked_minutes = func.coalesce(booked.c.minutes, 0)
+    stmt = (
+        select(
+            User.id.label("provider_id"),
+            User.full_name,
+            available_minutes.label("available_minutes"),
+            booked_minutes.label("booked_minutes"),
+            (booked_minutes / func.nullif(available_minutes, 0)).label("utilization"),
+        )
+        .outerjoin(available, available.c.provider_id == User.id)
+        .outerjoin(booked, booked.c.provider_id == User.id)
+        .where(or_(available.c.minutes.isnot(None), booked.c.minutes.isnot(None)))
+        .order_by(User.full_name, User.id)
+    )
+    if provider_id:
+        stmt = stmt.where(User.id == provider_id)
+
+    return (await db.execute(stmt)).mappings().all()
+
+
+@router.get("/revenue", response_model=List[ServiceRevenueSchema])
+async def service_revenue(
+    window: tuple[datetime, datetime] = Depends(analytics_window),
+    db: AsyncSession = Depends(get_db),
+    admin=Depends(require_admin),
+):
+    """Revenue per service at the price each appointment was booked at."""
+    not_cancelled = Appointment.status != "cancelled"
+    completed = Appointment.status == "completed"
+    stmt = (
+        select(
+            Service.id.label("service_id"),
+            Service.name,
+            func.count().filter(not_cancelled).label("appointments"),
+            func.count().filter(completed).label("completed"),
+            func.coalesce(func.sum(Appointment.price).filter(not_cancelled), 0).label("booked_revenue"),
+            func.coalesce(func.sum(Appointment.price).filter(completed), 0).label("completed_revenue"),
+        )
+        .select_from(Appointment)
+        .join(Service, Service.id == Appointment.service_id)
+        .where(in_window(Appointment.start_time, Appointment.end_time, window))
+        .group_by(Service.id, Service.name)
+        .order_by(Service.name)
+    )
+    return (await db.execute(stmt)).mappings().all()
+
+
+@router.get("/cancellations", response_model=List[ProviderCancellationSchema])
+async def cancellation_rates(
+    window: tuple[datetime, datetime] = Depends(analytics_window),
+    db: AsyncSession = Depends(get_db),
+    admin=Depends(require_admin),
+):
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    # no-show: نوبتی که تموم شده ولی هنوز confirmed مونده و completed نشده
+    no_show = and_(Appointment.status == "confirmed", Appointment.end_time < now)
+    cancelled = Appointment.status == "cancelled"
+    total = func.count()
+    stmt = (
+        select(
+            Appointment.provider_id,
+            User.full_name,
+            total.label("total"),
+            func.count().filter(cancelled).label("cancelled"),
+            func.count().filter(no_show).label("no_show"),
+            (func.count().filter(cancelled) * 1.0 / total).label("cancellation_rate"),
+            (func.count().filter(no_show) * 1.0 / total).label("no_show_rate"),
+        )
+        .join(User, User.id == Appointment.provider_id)
+        .where(in_window(Appointment.start_time, Appointment.end_time, window))
+        .group_by(Appointment.provider_id, User.full_name)
+        .order_by(User.full_name, Appointment.provider_id)
+    )
+    return (await db.execute(stmt)).mappings().all()
+
+
+@router.get("/daily-volume", response_model=List[DailyVolumeSchema])
+async def daily_volume(
+    window: tuple[datetime, datetime] = Depends(analytics_window),
+    db: AsyncSession = Depends(get_db),
+    admin=Depends(require_admin),
+):
+    day = func.date(Appointment.start_time).label("day")
+    daily = (
+        select(
+            day,
+            func.count().label("appointments"),
+            func.count().filter(Appointment.status == "cancelled").label("cancelled"),
+        )
+        .where(Appointment.start_time >= window[0], Appointment.start_time < window[1])
+        .group_by(day)
+        .subquery("daily")
+    )
+    # شماره‌ی روز تقویمی، تا RANGE روزهای بدون نوبت رو هم جزو 7 روز حساب کنه
+    day_number = cast(epoch(daily.c.day) / 86400, Integer)
+    days_since_start = day_number - (window[0].date() - date(1970, 1, 1)).days
+    # روزهای قبل از شروع window توی میانگین نیستن
+    days_covered = case((days_since_start < 6, days_since_start + 1), else_=7)
+    stmt = select(
+        daily.c.day,
+        daily.c.appointments,
+        daily.c.cancelled,
+        func.sum(daily.c.appointments).over(order_by=daily.c.day).label("running_total"),
+        (
+            func.sum(daily.c.appointments).over(order_by=day_number, range_=(-6, 0)) * 1.0 / days_covered
+        ).label("moving_average_7d"),
+    ).order_by(daily.c.day)
+    return (await db.execute(stmt)).mappings().all()
+
+
+@router.get("/daily-rollups", response_model=List[DailyRollupSchema])
+async def daily_rollups(
+    day_from: date = Query(..., alias="from"),
+    day_to: date = Query(..., alias="to", description="inclusive"),
+    provider_id: Optional[uuid.UUID] = None,
+    service_id: Optional[uuid.UUID] = None,
+    db: AsyncSession = Depends(get_db),
+    admin=Depends(require_admin),
+):
+    """Pre-aggregated rows from appointment_daily_rollups; no scan of appointments."""
+    if day_from > day_to or day_to - day_from > timedelta(days=settings.ANALYTICS_MAX_DAYS):
+        raise HTTPException(
+            status.HTTP_400_BAD_REQUEST,
+            detail=f"from must not be after to and the range can be at most {settings.ANALYTICS_MAX_DAYS} days",
+        )
+    stmt = (
+        select(AppointmentDailyRollup)
+        .where(AppointmentDailyRollup.day >= day_from, AppointmentDailyRollup.day <= day_to)
+        .order_by(AppointmentDailyRollup.day, AppointmentDailyRollup.provider_id, AppointmentDailyRollup.service_id)
+    )
+    if provider_id:
+        stmt = stmt.where(AppointmentDailyRollup.provider_id == provider_id)
+    if service_id:
+        stmt = stmt.where(AppointmentDailyRollup.service_id == service_id)
+    return (await db.scalars(stmt)).all()
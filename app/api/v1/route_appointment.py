@@ -1,27 +1,74 @@
+import csv
+import io
+import json
 import uuid
-from typing import List
+from collections import defaultdict
+from typing import List, Optional
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_
+from sqlalchemy import select, insert, update, exists, literal, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import selectinload
 
+from app.api.deps import Pagination
+from app.core.config import settings
+from app.core.scheduling import to_naive_utc
+from app.db.rollups import record_rollup_changes
 from app.db.session import get_db
-from app.models.appointment import Appointment
+from app.models.appointment import Appointment, ACTIVE_STATUSES, OVERLAP_CONSTRAINT
 from app.models.availability import Availability
 from app.models.provider_service import ProviderService
 from app.schema.appointment_schema import *
-from app.core.security import get_authenticated_user
+from app.schema.pagination_schema import PageSchema
+from app.core.security import get_authenticated_user, require_admin
 from app.models.user import User
 
 router = APIRouter(prefix="/appointments", tags=["Appointments"])
 
-@router.get("/", response_model=List[AppointmentResponseSchema])
+EXPANDABLE = {
+    "patient": Appointment.patient,
+    "provider": Appointment.provider,
+    "service": Appointment.service,
+}
+
+
+def expand_relations(
+    expand: Optional[str] = Query(None, description="comma separated relations to embed: patient,provider,service"),
+) -> set[str]:
+    requested = {name.strip() for name in expand.split(",") if name.strip()} if expand else set()
+    unknown = requested - EXPANDABLE.keys()
+    if unknown:
+        raise HTTPException(400, f"Cannot expand: {', '.join(sorted(unknown))}")
+    return requested
+
+
+def expand_options(expand: set[str]) -> list:
+    # یک query برای هر رابطه‌ی خواسته شده
+    return [selectinload(EXPANDABLE[name]) for name in sorted(expand)]
+
+
+def expanded_response(appointment: Appointment, expand: set[str]) -> AppointmentExpandedResponseSchema:
+    # رابطه‌های خواسته نشده load نشدن و اصلاً خونده نمی‌شن (وگرنه lazy load توی async)
+    fields = {name: getattr(appointment, name) for name in AppointmentResponseSchema.model_fields}
+    fields.update({name: getattr(appointment, name) for name in expand})
+    return AppointmentExpandedResponseSchema.model_validate(fields, from_attributes=True)
+
+
+@router.get("/", response_model=PageSchema[AppointmentExpandedResponseSchema])
 async def list_appointments(
+    status_filter: Optional[AppointmentStatus] = Query(None, alias="status"),
+    provider_id: Optional[uuid.UUID] = None,
+    date_from: Optional[datetime] = Query(None, description="appointments starting at or after"),
+    date_to: Optional[datetime] = Query(None, description="appointments starting before"),
+    pagination: Pagination = Depends(),
+    expand: set[str] = Depends(expand_relations),
     db: AsyncSession = Depends(get_db),
     user: User = Depends(get_authenticated_user),
 ):
-    stmt = select(Appointment)
+    stmt = select(Appointment).options(*expand_options(expand))
 
     if user.role == "client":
         stmt = stmt.where(Appointment.patient_id == user.id)
@@ -29,8 +76,18 @@ async def list_appointments(
         stmt = stmt.where(Appointment.provider_id == user.id)
     # admin همه رو می‌بینه
 
-    result = await db.execute(stmt)
-    return result.scalars().all()
+    if status_filter:
+        stmt = stmt.where(Appointment.status == status_filter.value)
+    if provider_id:
+        stmt = stmt.where(Appointment.provider_id == provider_id)
+    if date_from:
+        stmt = stmt.where(Appointment.start_time >= date_from)
+    if date_to:
+        stmt = stmt.where(Appointment.start_time < date_to)
+
+    page = await pagination.paginate(db, stmt, Appointment)
+    page["items"] = [expanded_response(appointment, expand) for appointment in page["items"]]
+    return page
 
 @router.post("/", response_model=AppointmentResponseSchema)
 async def create_appointment(
@@ -41,74 +98,256 @@ async def create_appointment(
     if user.role != "client":
         raise HTTPException(status_code=403, detail="Only clients can book appointments")
 
-    if request.start_time >= request.end_time:
+    # مثل batch: ساعت با offset هم به UTC بدون tzinfo تبدیل می‌شه
+    start, end = to_naive_utc(request.start_time), to_naive_utc(request.end_time)
+    if start >= end:
         raise HTTPException(status_code=400, detail="Invalid time range")
 
-    # بررسی اینکه provider این سرویس رو ارائه میده
+    provider_offers_service = exists().where(
+        ProviderService.provider_id == request.provider_id,
+        ProviderService.service_id == request.service_id,
+        ProviderService.is_active == True,
+    )
+    provider_is_available = exists().where(
+        Availability.provider_id == request.provider_id,
+        Availability.is_available == True,
+        Availability.start_time <= start,
+        Availability.end_time >= end,
+    )
+
+    # همه‌ی بررسی‌ها و insert توی یک statement؛ overlap رو constraint دیتابیس رد می‌کنه
+    stmt = (
+        insert(Appointment)
+        .from_select(
+            ["id", "patient_id", "provider_id", "service_id", "start_time", "end_time", "status", "price"],
+            select(
+                literal(uuid.uuid4(), Appointment.id.type),
+                literal(user.id, Appointment.patient_id.type),
+                literal(request.provider_id, Appointment.provider_id.type),
+                literal(request.service_id, Appointment.service_id.type),
+                literal(start, Appointment.start_time.type),
+                literal(end, Appointment.end_time.type),
+                literal("pending", Appointment.status.type),
+                ProviderService.price,
+            ).where(
+                ProviderService.provider_id == request.provider_id,
+                ProviderService.service_id == request.service_id,
+                ProviderService.is_active == True,
+                provider_is_available,
+            ),
+        )
+        .returning(Appointment)
+    )
+    try:
+        appointment = (await db.execute(stmt)).scalar_one_or_none()
+        if appointment is not None:
+            await record_rollup_changes(db, [(appointment, None, "pending")])
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        if OVERLAP_CONSTRAINT in str(e.orig):
+            raise HTTPException(status_code=409, detail="Time slot already booked")
+        raise
+
+    if appointment is None:
+        # فقط در حالت خطا دلیلش رو پیدا می‌کنیم
+        result = await db.execute(select(provider_offers_service, provider_is_available))
+        offers_service, is_available = result.one()
+        if not offers_service:
+            raise HTTPException(status_code=400, detail="Provider does not offer this service")
+        raise HTTPException(status_code=400, detail="Provider not available at this time")
+
+    return appointment
+
+def _overlaps(start, end, intervals) -> bool:
+    return any(other_start < end and other_end > start for other_start, other_end in intervals)
+
+
+@router.post("/batch", response_model=List[AppointmentResponseSchema])
+async def create_appointments_batch(
+    request: AppointmentBatchCreateSchema,
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_authenticated_user),
+):
+    if user.role != "client":
+        raise HTTPException(status_code=403, detail="Only clients can book appointments")
+
+    items = [
+        (item, to_naive_utc(item.start_time), to_naive_utc(item.end_time))
+        for item in request.items
+    ]
+    provider_ids = {item.provider_id for item, _, _ in items}
+    range_start = min(start for _, start, _ in items)
+    range_end = max(end for _, _, end in items)
+
+    # هر بررسی یک query برای کل batch، نه یکی برای هر آیتم
     result = await db.execute(
-        select(ProviderService).where(
-            ProviderService.provider_id == request.provider_id,
-            ProviderService.service_id == request.service_id,
+        select(ProviderService.provider_id, ProviderService.service_id, ProviderService.price).where(
+            ProviderService.provider_id.in_(provider_ids),
             ProviderService.is_active == True,
         )
     )
-    if not result.scalar_one_or_none():
-        raise HTTPException(status_code=400, detail="Provider does not offer this service")
+    offered = {(provider_id, service_id): price for provider_id, service_id, price in result}
 
-    # بررسی availability
+    windows = defaultdict(list)
     result = await db.execute(
-        select(Availability).where(
-            Availability.provider_id == request.provider_id,
+        select(Availability.provider_id, Availability.start_time, Availability.end_time).where(
+            Availability.provider_id.in_(provider_ids),
             Availability.is_available == True,
-            Availability.start_time <= request.start_time,
-            Availability.end_time >= request.end_time,
+            Availability.start_time <= range_end,
+            Availability.end_time >= range_start,
         )
     )
-    if not result.scalar_one_or_none():
-        raise HTTPException(status_code=400, detail="Provider not available at this time")
+    for provider_id, start, end in result:
+        windows[provider_id].append((to_naive_utc(start), to_naive_utc(end)))
 
-    # جلوگیری از overlap
+    booked = defaultdict(list)
     result = await db.execute(
-        select(Appointment).where(
-            Appointment.provider_id == request.provider_id,
-            Appointment.status.in_(["pending", "confirmed"]),
-            or_(
-                and_(
-                    Appointment.start_time <= request.start_time,
-                    Appointment.end_time > request.start_time,
-                ),
-                and_(
-                    Appointment.start_time < request.end_time,
-                    Appointment.end_time >= request.end_time,
-                ),
-            ),
+        select(Appointment.provider_id, Appointment.start_time, Appointment.end_time).where(
+            Appointment.provider_id.in_(provider_ids),
+            Appointment.status.in_(ACTIVE_STATUSES),
+            Appointment.start_time < range_end,
+            Appointment.end_time > range_start,
+        )
+    )
+    for provider_id, start, end in result:
+        booked[provider_id].append((to_naive_utc(start), to_naive_utc(end)))
+
+    conflicts = []
+    in_batch = defaultdict(list)
+    for index, (item, start, end) in enumerate(items):
+        if start >= end:
+            reason = "Invalid time range"
+        elif (item.provider_id, item.service_id) not in offered:
+            reason = "Provider does not offer this service"
+        elif not any(w_start <= start and w_end >= end for w_start, w_end in windows[item.provider_id]):
+            reason = "Provider not available at this time"
+        elif _overlaps(start, end, booked[item.provider_id]):
+            reason = "Time slot already booked"
+        elif _overlaps(start, end, in_batch[item.provider_id]):
+            reason = "Overlaps another appointment in this batch"
+        else:
+            in_batch[item.provider_id].append((start, end))
+            continue
+        conflicts.append({"index": index, "reason": reason})
+
+    if conflicts:
+        raise HTTPException(
+            status_code=409,
+            detail={"message": "No appointments were booked", "conflicts": conflicts},
+        )
+
+    try:
+        result = await db.scalars(
+            insert(Appointment)
+            .values([
+                {
+                    "patient_id": user.id,
+                    "provider_id": item.provider_id,
+                    "service_id": item.service_id,
+                    "start_time": start,
+                    "end_time": end,
+                    "status": "pending",
+                    "price": offered[(item.provider_id, item.service_id)],
+                }
+                for item, start, end in items
+            ])
+            .returning(Appointment)
         )
+        appointments = result.all()
+        await record_rollup_changes(db, [(appointment, None, "pending") for appointment in appointments])
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        if OVERLAP_CONSTRAINT in str(e.orig):
+            raise HTTPException(
+                status_code=409,
+                detail={"message": "No appointments were booked", "conflicts": []},
+            )
+        raise
+
+    return appointments
+
+
+EXPORT_COLUMNS = [column.name for column in Appointment.__table__.columns]
+
+
+def _export_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def _encode_ndjson(rows) -> str:
+    return "".join(
+        json.dumps({key: _export_value(value) for key, value in row.items()}) + "\n"
+        for row in rows
     )
-    if result.scalar_one_or_none():
-        raise HTTPException(status_code=409, detail="Time slot already booked")
-
-    appointment = Appointment(
-        patient_id=user.id,
-        provider_id=request.provider_id,
-        service_id=request.service_id,
-        start_time=request.start_time,
-        end_time=request.end_time,
-        status="pending",
+
+
+def _csv_text(lines) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(lines)
+    return buffer.getvalue()
+
+
+def _encode_csv(rows) -> str:
+    return _csv_text([_export_value(row[column]) for column in EXPORT_COLUMNS] for row in rows)
+
+
+# format -> (encoder برای هر batch از ردیف‌ها, متن اول فایل, media type)
+EXPORT_ENCODERS = {
+    ExportFormat.ndjson: (_encode_ndjson, "", "application/x-ndjson"),
+    ExportFormat.csv: (_encode_csv, _csv_text([EXPORT_COLUMNS]), "text/csv"),
+}
+
+
+@router.get("/export")
+async def export_appointments(
+    export_format: ExportFormat = Query(ExportFormat.ndjson, alias="format"),
+    provider_id: Optional[uuid.UUID] = None,
+    date_from: Optional[datetime] = Query(None, description="appointments starting at or after"),
+    date_to: Optional[datetime] = Query(None, description="appointments starting before"),
+    db: AsyncSession = Depends(get_db),
+    admin: User = Depends(require_admin),
+):
+    # ستون‌ها رو select می‌کنیم نه ORM entity، تا identity map بزرگ نشه
+    stmt = select(*Appointment.__table__.columns).order_by(Appointment.created_at, Appointment.id)
+    if provider_id:
+        stmt = stmt.where(Appointment.provider_id == provider_id)
+    if date_from:
+        stmt = stmt.where(Appointment.start_time >= date_from)
+    if date_to:
+        stmt = stmt.where(Appointment.start_time < date_to)
+    stmt = stmt.execution_options(yield_per=settings.EXPORT_BATCH_SIZE)
+
+    encode, header, media_type = EXPORT_ENCODERS[export_format]
+
+    async def body():
+        if header:
+            yield header
+        result = await db.stream(stmt)
+        async for rows in result.mappings().partitions():
+            yield encode(rows)
+
+    return StreamingResponse(
+        body(),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=appointments.{export_format.value}"},
     )
 
-    db.add(appointment)
-    await db.commit()
-    await db.refresh(appointment)
-    return appointment
 
-@router.get("/{appointment_id}", response_model=AppointmentResponseSchema)
+@router.get("/{appointment_id}", response_model=AppointmentExpandedResponseSchema)
 async def retrieve_appointment(
     appointment_id: uuid.UUID,
+    expand: set[str] = Depends(expand_relations),
     db: AsyncSession = Depends(get_db),
     user: User = Depends(get_authenticated_user),
 ):
     result = await db.execute(
-        select(Appointment).where(Appointment.id == appointment_id)
+        select(Appointment).where(Appointment.id == appointment_id).options(*expand_options(expand))
     )
     appointment = result.scalar_one_or_none()
 
@@ -121,7 +360,74 @@ async def retrieve_appointment(
     ):
         raise HTTPException(403, "You have no permission")
 
-    return appointment
+    return expanded_response(appointment, expand)
+
+@router.post("/bulk-status", response_model=AppointmentBulkStatusResponseSchema)
+async def bulk_update_appointment_status(
+    request: AppointmentBulkStatusSchema,
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_authenticated_user),
+):
+    # همون قوانین update_appointment_status، ولی به صورت شرط WHERE
+    conditions = [Appointment.status != request.status.value]
+    if user.role == "client":
+        if request.status != AppointmentStatus.cancelled:
+            raise HTTPException(403, "Clients can only cancel their own appointments")
+        conditions.append(Appointment.patient_id == user.id)
+    elif user.role == "provider":
+        if request.status not in (AppointmentStatus.confirmed, AppointmentStatus.completed):
+            raise HTTPException(403, "Invalid action")
+        conditions.append(Appointment.provider_id == user.id)
+
+    if request.ids:
+        conditions.append(Appointment.id.in_(request.ids))
+    if request.provider_id:
+        conditions.append(Appointment.provider_id == request.provider_id)
+    if request.date_from:
+        conditions.append(Appointment.start_time >= request.date_from)
+    if request.date_to:
+        conditions.append(Appointment.start_time < request.date_to)
+    if request.current_status:
+        conditions.append(Appointment.status == request.current_status.value)
+
+    if request.dry_run:
+        matched = await db.scalar(select(func.count()).select_from(Appointment).where(*conditions))
+        return {"dry_run": True, "matched": matched}
+
+    # وضعیت قبلی برای rollup لازمه و RETURNING فقط مقدار جدید رو می‌ده؛
+    # برای هر وضعیت قبلی یک UPDATE با همون شرط‌ها، مستقل از تعداد ردیف‌ها
+    if request.current_status:
+        previous_statuses = [request.current_status.value]
+    else:
+        previous_statuses = [s.value for s in AppointmentStatus if s != request.status]
+    rows = []
+    try:
+        for previous_status in previous_statuses:
+            result = await db.execute(
+                update(Appointment)
+                .where(*conditions, Appointment.status == previous_status)
+                .values(status=request.status.value)
+                .returning(
+                    Appointment.id,
+                    Appointment.provider_id,
+                    Appointment.service_id,
+                    Appointment.start_time,
+                    Appointment.end_time,
+                    Appointment.price,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            rows.extend((row, previous_status, request.status.value) for row in result)
+        await record_rollup_changes(db, rows)
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        if OVERLAP_CONSTRAINT in str(e.orig):
+            raise HTTPException(409, "Time slot already booked")
+        raise
+
+    ids = [row.id for row, _, _ in rows]
+    return {"dry_run": False, "matched": len(ids), "ids": ids}
 
 @router.put("/{appointment_id}/status", response_model=AppointmentResponseSchema)
 async def update_appointment_status(
@@ -151,9 +457,16 @@ async def update_appointment_status(
 
     # admin همه چی می‌تونه
 
+    previous_status = appointment.status
     appointment.status = request.status.value
-    await db.commit()
-    await db.refresh(appointment)
+    try:
+        await record_rollup_changes(db, [(appointment, previous_status, appointment.status)])
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        if OVERLAP_CONSTRAINT in str(e.orig):
+            raise HTTPException(409, "Time slot already booked")
+        raise
     return appointment
 
 @router.delete("/{appointment_id}")
@@ -173,7 +486,9 @@ async def cancel_appointment(
     if user.role != "admin" and appointment.patient_id != user.id:
         raise HTTPException(403, "You have no permission")
 
+    previous_status = appointment.status
     appointment.status = "cancelled"
+    await record_rollup_changes(db, [(appointment, previous_status, appointment.status)])
     await db.commit()
 
     return {"message": "Appointment cancelled successfully"}
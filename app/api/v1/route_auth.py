@@ -1,4 +1,5 @@
 import email
+import uuid
 from sqlalchemy import select
 from fastapi import APIRouter, HTTPException, status, Depends
 from fastapi.responses import JSONResponse
@@ -7,7 +8,7 @@ from app.db.session import get_db
 from typing import List
 from app.models.user import User
 from app.schema.user_schema import *
-from app.core.security import get_authenticated_user,hash_password,verify_password
+from app.core.security import hash_password_async,verify_password_async
 from app.schema.user_schema import (
     UserLoginSchema,
     UserRegisterSchema,
@@ -15,11 +16,14 @@ from app.schema.user_schema import (
 )
 
 from app.core.security import (
+    decode_token,
     generate_access_token,
-    generate_refresh_token,
-    decode_refresh_token,
-    get_authenticated_user
+    get_authenticated_user,
+    token_claims,
 )
+from app.core.rate_limit import LoginAttempt, login_rate_limit
+from app.core.refresh_tokens import refresh_tokens
+from app.core.tokens import jwks
 
 router = APIRouter(tags=["Authentications"], prefix="/auth")
 
@@ -42,13 +46,12 @@ async def user_register(
             full_name=request.full_name.lower(),
             email=request.email.lower(),
             role=request.role.lower(),
-            password_hash= hash_password(request.password),
+            password_hash= await hash_password_async(request.password),
             is_superuser=request.role == "admin",
         )
 
         db.add(user_obj)
         await db.commit()
-        await db.refresh(user_obj)
 
     except Exception:
         await db.rollback()
@@ -60,21 +63,28 @@ async def user_register(
     )
 
 @router.post("/login")
-async def user_login(request: UserLoginSchema, db: AsyncSession = Depends(get_db)):
+async def user_login(
+    request: UserLoginSchema,
+    db: AsyncSession = Depends(get_db),
+    attempt: LoginAttempt = Depends(login_rate_limit),
+):
     email = request.email.lower()
     result = await db.execute(select(User).where(User.email == email))
     user = result.scalar_one_or_none()
     if not user:
+        await attempt.failed()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="user doesn't exists",
         )
-    if not verify_password(request.password,user.password_hash):
+    if not await verify_password_async(request.password,user.password_hash):
+        await attempt.failed()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="password invalid"
         )
-    access_token = generate_access_token(user.id)
-    refresh_token = generate_refresh_token(user.id)
+    claims = token_claims(user)
+    access_token = generate_access_token(user.id, claims=claims)
+    refresh_token = refresh_tokens.issue(user.id, claims)
     return JSONResponse(
         status_code=status.HTTP_200_OK,
         content={
@@ -85,13 +95,36 @@ async def user_login(request: UserLoginSchema, db: AsyncSession = Depends(get_db
     )
 
 
+# فقط چرخش توکن قبلی همین‌جا نوشته می‌شه؛ ردیف توکن جدید رو refresh_tokens.run بعداً می‌نویسه
 @router.post("/refresh-token")
-def user_refresh_token(
-    request: UserRefreshTokenSchema, db: AsyncSession = Depends(get_db)
-):
-    user_id = decode_refresh_token(request.token)
-    access_token = generate_access_token(user_id)
+async def user_refresh_token(request: UserRefreshTokenSchema):
+    payload = decode_token(request.token, "refresh")
+    await refresh_tokens.verify(payload)
+    # کاربر غیرفعال یا توکن باطل‌شده دیگه access token نمی‌گیره
+    principal = await refresh_tokens.principal(payload)
+    claims = token_claims(principal)
+    refresh_token = await refresh_tokens.rotate(payload, claims)
+    access_token = generate_access_token(principal.id, claims=claims)
     return JSONResponse(
         status_code=status.HTTP_200_OK,
-        content={"detail": "Login successful", "access_token": access_token},
+        content={"detail": "Login successful", "access_token": access_token, "refresh_token": refresh_token},
     )
+
+
+@router.post("/logout")
+async def user_logout(request: UserRefreshTokenSchema):
+    """Revoke the refresh token and every token rotated from the same login."""
+    payload = decode_token(request.token, "refresh")
+    if not payload.get("fam"):
+        raise HTTPException(status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
+    await refresh_tokens.revoke_family(uuid.UUID(payload["fam"]), uuid.UUID(payload["user_id"]))
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={"detail": "Logged out"},
+    )
+
+
+@router.get("/.well-known/jwks.json")
+async def json_web_key_set():
+    """Public keys for services that verify our access tokens themselves."""
+    return jwks()
@@ -1,18 +1,28 @@
 import uuid
+from itertools import islice
+from typing import Optional
 from fastapi.responses import JSONResponse
-from fastapi import APIRouter, HTTPException, status, Depends
-from sqlalchemy import select
+from fastapi import APIRouter, HTTPException, Query, status, Depends
+from sqlalchemy import insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.deps import Pagination
+from app.core.config import settings
+from app.core.scheduling import to_naive_utc
 from app.db.session import get_db   
 from typing import List
 from app.models.availability import Availability
 from app.schema.availability_schema import *
+from app.schema.pagination_schema import PageSchema
 from app.core.security import get_authenticated_user,require_admin
 
 router = APIRouter(tags=["availability"], prefix="/availability")
 
-@router.get("/list-availability", response_model=List[AvailabilityResponseSchema])
+@router.get("/list-availability", response_model=PageSchema[AvailabilityResponseSchema])
 async def list_availability(
+    provider_id: Optional[uuid.UUID] = None,
+    date_from: Optional[datetime] = Query(None, description="windows ending after"),
+    date_to: Optional[datetime] = Query(None, description="windows starting before"),
+    pagination: Pagination = Depends(),
     db: AsyncSession = Depends(get_db),
     user=Depends(get_authenticated_user),
 ):
@@ -23,8 +33,14 @@ async def list_availability(
     elif user.role == "provider":
         stmt = stmt.where(Availability.provider_id == user.id)
 
-    result = await db.execute(stmt)
-    return result.scalars().all()
+    if provider_id:
+        stmt = stmt.where(Availability.provider_id == provider_id)
+    if date_from:
+        stmt = stmt.where(Availability.end_time > date_from)
+    if date_to:
+        stmt = stmt.where(Availability.start_time < date_to)
+
+    return await pagination.paginate(db, stmt, Availability)
 
         
 @router.post("/create-availability", response_model=AvailabilityResponseSchema)
@@ -59,10 +75,60 @@ async def create_availability(
 
     db.add(availability)
     await db.commit()
-    await db.refresh(availability)
     return availability
 
 
+@router.post("/bulk-create-availability", response_model=List[AvailabilityResponseSchema])
+async def bulk_create_availability(
+    request: AvailabilityBulkCreateSchema,
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_authenticated_user),
+):
+    if user.role == "client":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You have no permission"
+        )
+
+    provider_id = request.provider_id if user.role == "admin" else user.id
+
+    # همه به UTC بدون tzinfo، تا پنجره‌های Z دار و بدون tz با هم مقایسه بشن
+    windows = [
+        (to_naive_utc(start), to_naive_utc(end))
+        for start, end in islice(request.expand(), settings.AVAILABILITY_BULK_MAX + 1)
+    ]
+    if not windows:
+        raise HTTPException(status_code=400, detail="recurrence produced no windows")
+    if len(windows) > settings.AVAILABILITY_BULK_MAX:
+        raise HTTPException(
+            status_code=400,
+            detail=f"at most {settings.AVAILABILITY_BULK_MAX} windows per request"
+        )
+
+    # overlap داخل خود batch، بعد از sort با یک پیمایش
+    windows.sort()
+    for index, (start, end) in enumerate(windows):
+        if start >= end:
+            raise HTTPException(status_code=400, detail=f"start_time must be before end_time ({start})")
+        if index and start < windows[index - 1][1]:
+            raise HTTPException(
+                status_code=400,
+                detail=f"windows overlap: {windows[index - 1][0]} - {windows[index - 1][1]} and {start} - {end}"
+            )
+
+    result = await db.scalars(
+        insert(Availability)
+        .values([
+            {"provider_id": provider_id, "start_time": start, "end_time": end, "is_available": True}
+            for start, end in windows
+        ])
+        .returning(Availability)
+    )
+    availabilities = result.all()
+    await db.commit()
+    return availabilities
+
+
 @router.get("/retrieve-availability/{availabilityID}", response_model=AvailabilityResponseSchema)
 async def retrieve_availability(
     availabilityID: uuid.UUID,
@@ -124,7 +190,6 @@ async def update_availability(
     availability.is_available=True
 
     await db.commit()
-    await db.refresh(availability)
     return availability
 
 
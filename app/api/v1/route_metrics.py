@@ -0,0 +1,71 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+from app.core.config import settings
+from app.core.instrumentation import render_prometheus
+from app.core.catalog_cache import catalog_cache
+from app.core.security import auth_cache, password_hasher, require_admin
+from app.core.rate_limit import login_email_limiter, login_ip_limiter
+from app.core.refresh_tokens import refresh_tokens
+from app.core.tokens import token_versions
+from app.db.pool import pool_status
+from app.db.slow_query import slow_query_log
+from app.db.session import engine
+
+router = APIRouter(tags=["metrics"], prefix="/metrics")
+
+
+@router.get("", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Per-route request histograms in the Prometheus text format, for scrapers."""
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="metrics are disabled")
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
+@router.get("/auth-cache")
+async def auth_cache_metrics(admin=Depends(require_admin)):
+    return auth_cache.stats()
+
+
+@router.get("/token-versions")
+async def token_version_metrics(admin=Depends(require_admin)):
+    return {"auth_mode": settings.AUTH_MODE, **token_versions.stats()}
+
+
+@router.get("/refresh-tokens")
+async def refresh_token_metrics(admin=Depends(require_admin)):
+    return refresh_tokens.stats()
+
+
+@router.get("/rate-limits")
+async def rate_limit_metrics(admin=Depends(require_admin)):
+    return {"login_email": login_email_limiter.stats(), "login_ip": login_ip_limiter.stats()}
+
+
+@router.get("/service-catalog-cache")
+async def catalog_cache_metrics(admin=Depends(require_admin)):
+    return catalog_cache.stats()
+
+
+@router.get("/password-hasher")
+async def password_hasher_metrics(admin=Depends(require_admin)):
+    return password_hasher.stats()
+
+
+@router.get("/db-pool")
+async def db_pool_metrics(admin=Depends(require_admin)):
+    return pool_status(engine.pool)
+
+
+@router.get("/slow-queries")
+async def slow_query_metrics(
+    limit: int = Query(default=20, ge=1, le=500),
+    admin=Depends(require_admin),
+):
+    """Slow statements grouped by fingerprint, biggest total time first."""
+    return {
+        "threshold_ms": settings.SLOW_QUERY_THRESHOLD_MS,
+        "fingerprints": len(slow_query_log.entries),
+        "dropped": slow_query_log.dropped,
+        "queries": slow_query_log.top(limit),
+    }
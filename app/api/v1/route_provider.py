@@ -0,0 +1,249 @@
+import uuid
+from typing import List
+from datetime import datetime, timedelta
+from fastapi import APIRouter, HTTPException, Query, status, Depends
+from sqlalchemy import Float, select, and_, case, exists, func, literal, or_, union_all
+from sqlalchemy.orm import aliased
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.deps import epoch_seconds, validate_window
+from app.core.config import settings
+from app.core.scheduling import clip_intervals, slice_slots, subtract_intervals, to_naive_utc
+from app.core.security import get_authenticated_user
+from app.db.functions import epoch, from_epoch
+from app.db.session import get_db
+from app.models.appointment import Appointment, ACTIVE_STATUSES
+from app.models.availability import Availability
+from app.models.provider_service import ProviderService
+from app.models.user import User
+from app.schema.slot_schema import ProviderSlotsResponseSchema, ProviderSearchResultSchema, SlotSchema
+
+router = APIRouter(tags=["providers"], prefix="/providers")
+
+
+@router.get("/search", response_model=List[ProviderSearchResultSchema])
+async def search_providers(
+    service_id: uuid.UUID,
+    window_start: datetime = Query(..., alias="from"),
+    window_end: datetime = Query(..., alias="to"),
+    limit: int = Query(default=settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_authenticated_user),
+):
+    """
+    Active providers of a service with at least one free slot in the window,
+    earliest slot first. Computed in a single query for all providers, with
+    adjacent and overlapping availability merged as in /slots.
+    """
+    window_start, window_end = validate_window(window_start, window_end)
+    start_s = literal(epoch_seconds(window_start), Float)
+    end_s = literal(epoch_seconds(window_end), Float)
+
+    offers = (
+        select(
+            ProviderService.provider_id,
+            ProviderService.price,
+            ProviderService.duration_minutes,
+            (ProviderService.duration_minutes * 60).label("duration_s"),
+        )
+        .join(User, User.id == ProviderService.provider_id)
+        .where(
+            ProviderService.service_id == service_id,
+            ProviderService.is_active == True,
+            ProviderService.duration_minutes > 0,
+            User.is_active == True,
+        )
+        .cte("offers")
+    )
+
+    # بازه‌های availability که به پنجره‌ی جستجو بریده شدن
+    availability_start = epoch(Availability.start_time)
+    availability_end = epoch(Availability.end_time)
+    clipped = (
+        select(
+            offers.c.provider_id,
+            offers.c.duration_s,
+            case((availability_start > start_s, availability_start), else_=start_s).label("window_start"),
+            case((availability_end < end_s, availability_end), else_=end_s).label("window_end"),
+        )
+        .join(Availability, Availability.provider_id == offers.c.provider_id)
+        .where(
+            Availability.is_available == True,
+            Availability.start_time < window_end,
+            Availability.end_time > window_start,
+        )
+        .cte("clipped")
+    )
+
+    # بازه‌های پشت‌سرهم یا هم‌پوشان یکی می‌شن، مثل merge_intervals توی /slots:
+    # بازه‌ای که بعد از بیشترین پایان بازه‌های قبلیش شروع بشه یه island تازه‌ست
+    ordering = {"partition_by": clipped.c.provider_id, "order_by": (clipped.c.window_start, clipped.c.window_end)}
+    reach = func.max(clipped.c.window_end).over(**ordering, rows=(None, -1))
+    starts = select(
+        clipped,
+        case((or_(reach.is_(None), clipped.c.window_start > reach), 1), else_=0).label("starts_island"),
+    ).cte("starts")
+    islands = select(
+        starts.c.provider_id,
+        starts.c.duration_s,
+        starts.c.window_start,
+        starts.c.window_end,
+        func.sum(starts.c.starts_island).over(
+            partition_by=starts.c.provider_id,
+            order_by=(starts.c.window_start, starts.c.window_end),
+            rows=(None, 0),
+        ).label("island"),
+    ).cte("islands")
+    windows = (
+        select(
+            islands.c.provider_id,
+            islands.c.duration_s,
+            func.min(islands.c.window_start).label("window_start"),
+            func.max(islands.c.window_end).label("window_end"),
+        )
+        .group_by(islands.c.provider_id, islands.c.duration_s, islands.c.island)
+        .cte("windows")
+    )
+
+    # هر slot آزاد یا از اول یک بازه شروع می‌شه یا از پایان یک نوبت
+    booked = aliased(Appointment)
+    booked_end = epoch(booked.end_time)
+    candidates = union_all(
+        select(
+            windows.c.provider_id, windows.c.duration_s, windows.c.window_end,
+            windows.c.window_start.label("slot_start"),
+        ),
+        select(
+            windows.c.provider_id, windows.c.duration_s, windows.c.window_end,
+            booked_end.label("slot_start"),
+        )
+        .join(booked, booked.provider_id == windows.c.provider_id)
+        .where(
+            booked.status.in_(ACTIVE_STATUSES),
+            booked.end_time > window_start,
+            booked.end_time < window_end,
+            booked_end > windows.c.window_start,
+            booked_end < windows.c.window_end,
+        ),
+    ).cte("candidates")
+
+    conflict = aliased(Appointment)
+    slot_end = candidates.c.slot_start + candidates.c.duration_s
+    earliest = (
+        select(
+            candidates.c.provider_id,
+            func.min(candidates.c.slot_start).label("earliest_start"),
+        )
+        .where(
+            slot_end <= candidates.c.window_end,
+            ~exists().where(
+                conflict.provider_id == candidates.c.provider_id,
+                conflict.status.in_(ACTIVE_STATUSES),
+                conflict.start_time < window_end,
+                conflict.end_time > window_start,
+                epoch(conflict.start_time) < slot_end,
+                epoch(conflict.end_time) > candidates.c.slot_start,
+            ),
+        )
+        .group_by(candidates.c.provider_id)
+        .cte("earliest")
+    )
+
+    result = await db.execute(
+        select(
+            earliest.c.provider_id,
+            earliest.c.earliest_start,
+            offers.c.duration_minutes,
+            offers.c.price,
+            User.full_name,
+        )
+        .join(offers, offers.c.provider_id == earliest.c.provider_id)
+        .join(User, User.id == earliest.c.provider_id)
+        .order_by(earliest.c.earliest_start, earliest.c.provider_id)
+        .limit(limit)
+    )
+
+    results = []
+    for row in result:
+        slot_start = from_epoch(row.earliest_start)
+        results.append(ProviderSearchResultSchema(
+            provider_id=row.provider_id,
+            full_name=row.full_name,
+            price=row.price,
+            duration_minutes=row.duration_minutes,
+            earliest_slot=SlotSchema(
+                start_time=slot_start,
+                end_time=slot_start + timedelta(minutes=row.duration_minutes),
+            ),
+        ))
+    return results
+
+
+@router.get("/{provider_id}/slots", response_model=ProviderSlotsResponseSchema)
+async def list_free_slots(
+    provider_id: uuid.UUID,
+    service_id: uuid.UUID,
+    window_start: datetime = Query(..., alias="from"),
+    window_end: datetime = Query(..., alias="to"),
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_authenticated_user),
+):
+    window_start, window_end = validate_window(window_start, window_end)
+
+    # duration سرویس و بازه‌های availability با یک query
+    result = await db.execute(
+        select(ProviderService.duration_minutes, Availability.start_time, Availability.end_time)
+        .select_from(ProviderService)
+        .outerjoin(
+            Availability,
+            and_(
+                Availability.provider_id == ProviderService.provider_id,
+                Availability.is_available == True,
+                Availability.start_time < window_end,
+                Availability.end_time > window_start,
+            ),
+        )
+        .join(User, User.id == ProviderService.provider_id)
+        .where(
+            ProviderService.provider_id == provider_id,
+            ProviderService.service_id == service_id,
+            ProviderService.is_active == True,
+            # provider غیرفعال مثل /search اصلاً دیده نمی‌شه
+            User.is_active == True,
+        )
+        .order_by(Availability.start_time)
+    )
+    rows = result.all()
+    if not rows:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Provider does not offer this service")
+
+    duration_minutes = rows[0].duration_minutes
+    windows = [
+        (to_naive_utc(row.start_time), to_naive_utc(row.end_time))
+        for row in rows
+        if row.start_time is not None
+    ]
+
+    slots = []
+    if windows:
+        result = await db.execute(
+            select(Appointment.start_time, Appointment.end_time)
+            .where(
+                Appointment.provider_id == provider_id,
+                Appointment.status.in_(ACTIVE_STATUSES),
+                Appointment.start_time < window_end,
+                Appointment.end_time > window_start,
+            )
+            .order_by(Appointment.start_time)
+        )
+        free = subtract_intervals(
+            clip_intervals(windows, window_start, window_end),
+            [(to_naive_utc(start), to_naive_utc(end)) for start, end in result.all()],
+        )
+        slots = slice_slots(free, timedelta(minutes=duration_minutes))
+
+    return ProviderSlotsResponseSchema(
+        provider_id=provider_id,
+        service_id=service_id,
+        duration_minutes=duration_minutes,
+        slots=[SlotSchema(start_time=start, end_time=end) for start, end in slots],
+    )
@@ -2,28 +2,38 @@ import uuid
 from fastapi.responses import JSONResponse
 from fastapi import APIRouter, HTTPException, status, Depends
 from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.deps import Pagination
 from app.db.session import get_db   
-from typing import List
+from typing import List, Optional
 from app.models.provider_service import ProviderService
 from app.models.user import User
 from app.models.service import Service
 from app.schema.provider_service_schema import *
+from app.schema.pagination_schema import PageSchema
 from app.core.security import get_authenticated_user
 
 router = APIRouter(tags=["provider-services"], prefix="/provider-services")
 
-@router.get("/list-provider-service", response_model=List[ProviderServiceResponseSchema])
-async def list_service(db: AsyncSession = Depends(get_db), user=Depends(get_authenticated_user)):
-    if user.role == "admin":
-        result = await db.execute(select(ProviderService))
-    else:
-        result = await db.execute(select(ProviderService)
-                                  .join(User)
-                                  .join(Service)
-                                  .where(ProviderService.is_active == True,User.is_active == True,Service.is_active == True)
-                                )
-    return result.scalars().all()
+@router.get("/list-provider-service", response_model=PageSchema[ProviderServiceResponseSchema])
+async def list_service(
+    provider_id: Optional[uuid.UUID] = None,
+    service_id: Optional[uuid.UUID] = None,
+    pagination: Pagination = Depends(),
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_authenticated_user),
+):
+    stmt = select(ProviderService)
+    if user.role != "admin":
+        stmt = (stmt.join(User)
+                    .join(Service)
+                    .where(ProviderService.is_active == True,User.is_active == True,Service.is_active == True))
+    if provider_id:
+        stmt = stmt.where(ProviderService.provider_id == provider_id)
+    if service_id:
+        stmt = stmt.where(ProviderService.service_id == service_id)
+    return await pagination.paginate(db, stmt, ProviderService)
         
 @router.post("/create-provider-service")
 async def create_service(
@@ -52,8 +62,11 @@ async def create_service(
         )
 
         db.add(provider_service)
-        await db.commit()
-        await db.refresh(provider_service)
+        try:
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="provider-service already exists")
         return provider_service
     else:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="you have not permission")
@@ -99,8 +112,11 @@ async def update_provider_service(
     provider_service.price=request.price
     provider_service.duration_minutes=request.duration_minutes
     provider_service.is_active=request.is_active
-    await db.commit()
-    await db.refresh(provider_service)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="provider-service already exists")
     return provider_service
 
 
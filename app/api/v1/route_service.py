@@ -1,23 +1,39 @@
 import uuid
 from fastapi.responses import JSONResponse
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, Request, status, Depends
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.deps import Pagination
 from app.db.session import get_db   
-from typing import List
+from typing import List, Optional
 from app.models.service import Service
 from app.schema.service_schema import *
+from app.schema.pagination_schema import PageSchema
 from app.core.security import get_authenticated_user,require_admin
+from app.core.catalog_cache import cached_json_response, invalidate_catalog
 
 router = APIRouter(tags=["services"], prefix="/services")
 
-@router.get("/list-service", response_model=List[ServiceResponseSchema])
-async def list_service(db: AsyncSession = Depends(get_db), user=Depends(get_authenticated_user)):
-    if user.role == "admin":
-        result = await db.execute(select(Service))
-    else:
-        result = await db.execute(select(Service).where(Service.is_active == True))
-    return result.scalars().all()
+@router.get("/list-service", response_model=PageSchema[ServiceResponseSchema])
+async def list_service(
+    http_request: Request,
+    is_active: Optional[bool] = None,
+    pagination: Pagination = Depends(),
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_authenticated_user),
+):
+    stmt = select(Service)
+    if user.role != "admin":
+        is_active = True
+    if is_active is not None:
+        stmt = stmt.where(Service.is_active == is_active)
+
+    async def build():
+        page = await pagination.paginate(db, stmt, Service)
+        return PageSchema[ServiceResponseSchema].model_validate(page, from_attributes=True).model_dump_json().encode()
+
+    key = ("list", is_active, pagination.limit, pagination.cursor_id, pagination.cursor_created_at)
+    return await cached_json_response(http_request, key, build)
         
 @router.post("/create-service")
 async def create_service(request: ServiceCreateSchema,db: AsyncSession = Depends(get_db), admin=Depends(require_admin)):
@@ -33,22 +49,26 @@ async def create_service(request: ServiceCreateSchema,db: AsyncSession = Depends
     )
     db.add(service)
     await db.commit()
-    await db.refresh(service)
+    await invalidate_catalog()
     return service
 
 
 @router.get("/retrieve-service/{serviceID}", response_model=ServiceResponseSchema)
 async def retrieve_service(
+    http_request: Request,
     serviceID: uuid.UUID,
     db: AsyncSession = Depends(get_db), 
     user=Depends(get_authenticated_user),
 ):
-    
-    result = await db.execute(select(Service).where(Service.id == serviceID))
-    service = result.scalar_one_or_none()
-    if not service:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="service not found")
-    return service
+
+    async def build():
+        result = await db.execute(select(Service).where(Service.id == serviceID))
+        service = result.scalar_one_or_none()
+        if not service:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="service not found")
+        return ServiceResponseSchema.model_validate(service).model_dump_json().encode()
+
+    return await cached_json_response(http_request, ("retrieve", serviceID), build)
 
 
 @router.put("/update-service/{serviceID}", response_model=ServiceResponseSchema)
@@ -66,7 +86,7 @@ async def update_service(
     service.description = request.description
     service.is_active = request.is_active
     await db.commit()
-    await db.refresh(service)
+    await invalidate_catalog()
     return service
 
 
@@ -82,6 +102,7 @@ async def delete_service(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="service not found")
     await db.delete(service)
     await db.commit()
+    await invalidate_catalog()
     return JSONResponse(
             content={"message": "service successfully deleted"},
             status_code=status.HTTP_200_OK,
@@ -3,26 +3,34 @@ from fastapi import APIRouter, HTTPException, status, Depends
 from fastapi.responses import JSONResponse
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.deps import Pagination
 from app.db.session import get_db
-from typing import List
+from typing import List, Optional
 from app.models.user import User
 from app.schema.user_schema import *
-from app.core.security import hash_password
-from app.core.security import get_authenticated_user,require_admin
+from app.schema.pagination_schema import PageSchema
+from app.core.security import hash_password_async, revoke_user_tokens, verify_password_async
+from app.core.security import get_authenticated_user,require_admin,invalidate_authenticated_user
 
 router = APIRouter(tags=["users"], prefix="/users")
 
 
-@router.get("/list-user", response_model=List[UserBaseSchema])
+@router.get("/list-user", response_model=PageSchema[UserResponseSchema])
 async def list_user(
+    role: Optional[UserRole] = None,
+    is_active: Optional[bool] = None,
+    pagination: Pagination = Depends(),
     db: AsyncSession = Depends(get_db),
     admin_user=Depends(require_admin),
 ):
 
     if admin_user:
-        result = await db.execute(select(User))
-        users = result.scalars().all()
-        return users
+        stmt = select(User)
+        if role:
+            stmt = stmt.where(User.role == role.value)
+        if is_active is not None:
+            stmt = stmt.where(User.is_active == is_active)
+        return await pagination.paginate(db, stmt, User)
 
 
 @router.get("/{userID}", response_model=UserResponseSchema)
@@ -73,10 +81,13 @@ async def update_user(
 
     user_target.full_name=request.full_name
     user_target.email=request.email
-    user_target.password_hash=hash_password(request.password)
+    if not await verify_password_async(request.password, user_target.password_hash):
+        user_target.password_hash=await hash_password_async(request.password)
+        # رمز عوض شد: توکن‌های قبلی باطل می‌شن
+        revoke_user_tokens(user_target)
 
     await db.commit()
-    await db.refresh(user_target)
+    await invalidate_authenticated_user(user_target.id)
     return user_target
 
 @router.delete("/{userID}", status_code=status.HTTP_200_OK)
@@ -97,7 +108,9 @@ async def delete_user(
         user_target = result.scalar_one_or_none()
 
     user_target.is_active = False
+    revoke_user_tokens(user_target)
     await db.commit()
+    await invalidate_authenticated_user(user_target.id)
     return JSONResponse(
         content={"message": "user successfully deactivated"},
         status_code=status.HTTP_200_OK,
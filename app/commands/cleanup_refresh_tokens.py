@@ -0,0 +1,25 @@
+"""
+Delete expired rows from refresh_tokens. Run it periodically (cron, k8s CronJob).
+
+    python -m app.commands.cleanup_refresh_tokens [--batch-size 5000]
+"""
+import argparse
+import asyncio
+
+from app.core.refresh_tokens import purge_expired
+from app.db.session import AsyncSessionLocal, engine
+
+
+async def main(batch_size: int | None) -> None:
+    # JWT منقضی شده خودش رد می‌شه، پس ردیفش دیگه به کاری نمیاد
+    async with AsyncSessionLocal() as db:
+        deleted = await purge_expired(db, batch_size=batch_size)
+    await engine.dispose()
+    print(f"deleted {deleted} expired refresh tokens")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--batch-size", type=int, help="rows deleted per transaction")
+    args = parser.parse_args()
+    asyncio.run(main(args.batch_size))
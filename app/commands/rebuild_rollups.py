@@ -0,0 +1,27 @@
+"""
+Backfill or rebuild appointment_daily_rollups from the appointments table.
+
+    python -m app.commands.rebuild_rollups [--from 2026-01-01] [--to 2026-12-31]
+"""
+import argparse
+import asyncio
+from datetime import date
+
+from app.db.rollups import rebuild_rollups
+from app.db.session import AsyncSessionLocal, engine
+
+
+async def main(day_from: date | None, day_to: date | None) -> None:
+    async with AsyncSessionLocal() as db:
+        rows = await rebuild_rollups(db, day_from, day_to)
+        await db.commit()
+    await engine.dispose()
+    print(f"rebuilt {rows} rollup rows")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--from", dest="day_from", type=date.fromisoformat, help="first day to rebuild (inclusive)")
+    parser.add_argument("--to", dest="day_to", type=date.fromisoformat, help="last day to rebuild (inclusive)")
+    args = parser.parse_args()
+    asyncio.run(main(args.day_from, args.day_to))
@@ -0,0 +1,140 @@
+import hashlib
+from abc import ABC, abstractmethod
+import math
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List
+
+MISSING = object()
+
+
+class TTLCache:
+    """
+    In-process LRU cache whose entries also expire after `ttl` seconds.
+    Not shared between workers; use an InvalidationBackend to keep them in sync.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Any:
+        entry = self._data.get(key)
+        if entry is None or entry[0] <= self._clock():
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+            return MISSING
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self._data[key] = (self._clock() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        if self._data.pop(key, None) is not None:
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+class BloomFilter:
+    """
+    Set membership with no false negatives and about `error_rate` false
+    positives while it holds at most `capacity` keys. Keys cannot be removed;
+    rebuild the filter instead.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str):
+        # double hashing: k موقعیت از دو hash 64 بیتی
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1, h2 = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+Subscriber = Callable[[str], None]
+_subscribers: Dict[str, List[Subscriber]] = {}
+
+
+def subscribe(channel: str, callback: Subscriber) -> None:
+    _subscribers.setdefault(channel, []).append(callback)
+
+
+def dispatch(channel: str, key: str) -> None:
+    """Deliver an invalidation to this process's subscribers."""
+    for callback in _subscribers.get(channel, []):
+        callback(key)
+
+
+class InvalidationBackend(ABC):
+    """
+    Fans cache invalidations out to every worker.
+
+    Cross-worker implementations (Redis pub/sub, Postgres LISTEN/NOTIFY, ...)
+    send the message in `publish` and call `dispatch` in each process when it
+    is received, including the publishing one.
+    """
+
+    @abstractmethod
+    async def publish(self, channel: str, key: str) -> None:
+        ...
+
+
+class InMemoryInvalidationBackend(InvalidationBackend):
+    """Single-process backend, also used as the stand-in in tests."""
+
+    async def publish(self, channel: str, key: str) -> None:
+        dispatch(channel, key)
+
+
+invalidation_backend: InvalidationBackend = InMemoryInvalidationBackend()
+
+
+def set_invalidation_backend(backend: InvalidationBackend) -> None:
+    global invalidation_backend
+    invalidation_backend = backend
+
+
+async def publish_invalidation(channel: str, key: str) -> None:
+    await invalidation_backend.publish(channel, key)
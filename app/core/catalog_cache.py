@@ -0,0 +1,72 @@
+import hashlib
+from typing import Awaitable, Callable, Hashable
+
+from fastapi import Request, Response
+
+from app.core.cache import MISSING, TTLCache, publish_invalidation, subscribe
+from app.core.config import settings
+
+CATALOG_CACHE_CHANNEL = "service-catalog"
+
+catalog_cache = TTLCache(maxsize=settings.CATALOG_CACHE_MAXSIZE, ttl=settings.CATALOG_CACHE_TTL_SECONDS)
+catalog_version = 0
+
+
+def _bump_version(key: str) -> None:
+    # پاسخ‌هایی که وسط invalidation ساخته می‌شن با نسخه‌ی قبلی ذخیره می‌شن و دیگه خونده نمی‌شن
+    global catalog_version
+    catalog_version += 1
+    catalog_cache.clear()
+
+
+subscribe(CATALOG_CACHE_CHANNEL, _bump_version)
+
+
+async def invalidate_catalog() -> None:
+    """Call after any write to the services table."""
+    await publish_invalidation(CATALOG_CACHE_CHANNEL, "*")
+
+
+def _etag(body: bytes) -> str:
+    # از روی محتوا، تا همه‌ی workerها برای یک داده یک ETag بدن
+    return '"%s"' % hashlib.sha1(body).hexdigest()
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of If-None-Match against our ETag, as RFC 9110 asks for GET."""
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return True
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+
+async def cached_json_response(
+    request: Request,
+    key: Hashable,
+    build: Callable[[], Awaitable[bytes]],
+) -> Response:
+    """
+    Read-through cache for a JSON body, with ETag / If-None-Match support.
+    `build` runs only on a miss and must return the serialized body.
+    """
+    versioned_key = (catalog_version, key)
+    entry = catalog_cache.get(versioned_key)
+    if entry is MISSING:
+        body = await build()
+        entry = (_etag(body), body)
+        catalog_cache.set(versioned_key, entry)
+
+    etag, body = entry
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"private, max-age={settings.CATALOG_CACHE_MAX_AGE}",
+        "Vary": "Authorization",
+    }
+    if _etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
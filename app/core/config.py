@@ -1,9 +1,75 @@
+import os
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     DATABASE_URL: str
     SECRET_KEY: str
 
+    # تنظیمات engine و pool برای هر worker
+    DB_ECHO: bool = False
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_TIMEOUT_MS: int = 0
+    DB_STATEMENT_CACHE_SIZE: int = 100
+
+    PAGE_SIZE_DEFAULT: int = 50
+    PAGE_SIZE_MAX: int = 200
+    EXPORT_BATCH_SIZE: int = 1000
+    SLOT_SEARCH_MAX_DAYS: int = 62
+    ANALYTICS_MAX_DAYS: int = 366
+    AVAILABILITY_BULK_MAX: int = 2000
+
+    METRICS_ENABLED: bool = True
+    LOG_LEVEL: str = "INFO"
+    LOG_QUEUE_SIZE: int = 10_000
+    LOG_SAMPLE_RATE: float = 1.0
+    LOG_KEEP_STATUS_FROM: int = 400
+    SLOW_QUERY_THRESHOLD_MS: float = 200
+    SLOW_QUERY_EXPLAIN: bool = True
+    SLOW_QUERY_MAX_FINGERPRINTS: int = 500
+    # توکن‌ها؛ با RS256/ES256 بقیه‌ی سرویس‌ها با کلید عمومی (JWKS) خودشون verify می‌کنن
+    JWT_ALGORITHM: str = "HS256"
+    JWT_PRIVATE_KEY: str | None = None
+    JWT_PUBLIC_KEY: str | None = None
+    JWT_KEY_ID: str = "default"
+    JWT_ISSUER: str = "appointment-booking"
+    ACCESS_TOKEN_EXPIRE_SECONDS: int = 60 * 5
+    REFRESH_TOKEN_EXPIRE_SECONDS: int = 3600 * 24
+    REFRESH_TOKEN_FILTER_CAPACITY: int = 100_000
+    REFRESH_TOKEN_FILTER_ERROR_RATE: float = 0.001
+    REFRESH_TOKEN_CLEANUP_BATCH: int = 5000
+    # ردیف توکن‌های تازه با تأخیر نوشته می‌شه؛ چرخش و باطل کردن همون لحظه
+    REFRESH_TOKEN_FLUSH_SECONDS: float = 1.0
+    REFRESH_TOKEN_FLUSH_BATCH: int = 500
+    REFRESH_TOKEN_RECENT_TTL_SECONDS: float = 600
+    REFRESH_TOKEN_RECENT_MAXSIZE: int = 100_000
+    REFRESH_TOKEN_RELOAD_SECONDS: float = 30
+    # database: هر درخواست user رو (از cache یا DB) می‌خونه؛ stateless: فقط claimها + جدول token_version
+    AUTH_MODE: str = "database"
+    TOKEN_VERSION_REFRESH_SECONDS: float = 30
+    # قبل از هر query یا argon2 روی login
+    LOGIN_RATE_LIMIT_ENABLED: bool = True
+    LOGIN_RATE_LIMIT_PER_EMAIL: int = 5
+    LOGIN_RATE_LIMIT_PER_IP: int = 30
+    LOGIN_RATE_LIMIT_WINDOW_SECONDS: float = 60
+    RATE_LIMIT_MAX_KEYS: int = 100_000
+    AUTH_CACHE_ENABLED: bool = True
+    AUTH_CACHE_TTL_SECONDS: float = 60
+    AUTH_CACHE_MAXSIZE: int = 10_000
+    CATALOG_CACHE_TTL_SECONDS: float = 300
+    CATALOG_CACHE_MAXSIZE: int = 1024
+    CATALOG_CACHE_MAX_AGE: int = 60
+
+    # argon2 روی thread pool جدا اجرا می‌شه؛ بیشتر از workers + queue → 503
+    PASSWORD_HASH_WORKERS: int = max(1, (os.cpu_count() or 2) - 1)
+    PASSWORD_HASH_QUEUE_SIZE: int = 64
+    ARGON2_TIME_COST: int = 2
+    ARGON2_MEMORY_COST: int = 102400
+    ARGON2_PARALLELISM: int = 8
+
     class Config:
         env_file = ".env"
         extra = "allow"
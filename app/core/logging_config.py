@@ -0,0 +1,166 @@
+import json
+import logging
+import queue
+import random
+import re
+import sys
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+from app.core.config import settings
+from app.core.instrumentation import current_request_stats, route_template
+
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+access_logger = logging.getLogger("app.access")
+
+_VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+# فیلدهای استاندارد LogRecord؛ بقیه از extra اومدن و توی JSON می‌رن
+_RECORD_FIELDS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "request_id"}
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamps the current request id on the record, in the thread that logs it."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if getattr(record, "request_id", None) is None:
+            record.request_id = request_id_var.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+        }
+        payload.update(
+            (key, value) for key, value in vars(record).items()
+            if key not in _RECORD_FIELDS and not key.startswith("_")
+        )
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload["exc_info"] = record.exc_text
+        return json.dumps(payload, default=str)
+
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    Never blocks the caller: the record is formatted by the listener thread,
+    and when the queue is full it is dropped and counted instead.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # فقط پیام رو ثابت می‌کنیم؛ JSON کردن توی thread جدا انجام می‌شه
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def setup_logging() -> QueueListener:
+    """
+    Route every logger through a bounded queue to a JSON stdout handler run by
+    a background thread. Returns the started listener; stop it on shutdown.
+    """
+    queue_handler = DroppingQueueHandler(queue.Queue(maxsize=settings.LOG_QUEUE_SIZE))
+    queue_handler.addFilter(RequestIdFilter())
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JsonFormatter())
+
+    root = logging.getLogger()
+    root.handlers[:] = [queue_handler]
+    root.setLevel(settings.LOG_LEVEL)
+    # به جای echo=True روی engine، SQLها از همین صف با request_id رد می‌شن
+    logging.getLogger("sqlalchemy.engine").setLevel(logging.INFO if settings.DB_ECHO else logging.WARNING)
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        logging.getLogger(name).handlers[:] = []
+        logging.getLogger(name).propagate = True
+    # access log خودمون جای uvicorn.access رو می‌گیره
+    logging.getLogger("uvicorn.access").disabled = True
+
+    listener = QueueListener(queue_handler.queue, stream_handler, respect_handler_level=True)
+    listener.start()
+    return listener
+
+
+def should_log(status_code: int) -> bool:
+    # خطاها همیشه؛ درخواست‌های موفق با نرخ sampling
+    if status_code >= settings.LOG_KEEP_STATUS_FROM:
+        return True
+    return settings.LOG_SAMPLE_RATE >= 1 or random.random() < settings.LOG_SAMPLE_RATE
+
+
+class AccessLogMiddleware:
+    """
+    Assigns a request id (or accepts a sane incoming X-Request-ID), returns
+    it as X-Request-ID and writes one sampled structured access log per request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        incoming = dict(scope["headers"]).get(b"x-request-id", b"").decode("latin-1")
+        request_id = incoming if _VALID_REQUEST_ID.match(incoming) else uuid.uuid4().hex
+        token = request_id_var.set(request_id)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_request_id(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message = {**message, "headers": [*message.get("headers", []), (b"x-request-id", request_id.encode())]}
+            await send(message)
+
+        error = None
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        except Exception as exc:
+            error = exc
+            raise
+        finally:
+            if error is not None or should_log(status_code):
+                stats = current_request_stats.get()
+                extra = {
+                    "request_id": request_id,
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "route": route_template(scope),
+                    "status": status_code,
+                    "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+                }
+                if stats is not None:
+                    extra.update(db_statements=stats.statements, db_ms=round(stats.db_seconds * 1000, 3))
+                access_logger.log(
+                    logging.ERROR if error is not None or status_code >= 500 else logging.INFO,
+                    "%s %s %s", scope["method"], scope["path"], status_code,
+                    extra=extra,
+                    exc_info=error,
+                )
+            request_id_var.reset(token)
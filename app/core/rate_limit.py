@@ -0,0 +1,180 @@
+import math
+from abc import ABC, abstractmethod
+import time
+from collections import OrderedDict
+from typing import Callable, Tuple
+
+from fastapi import HTTPException, Request, status
+
+from app.core.config import settings
+
+
+class RateLimitBackend(ABC):
+    """
+    Per-key hit counters for fixed windows.
+
+    Shared implementations (Redis INCR + EXPIRE on "key:window", ...) make the
+    limits global instead of per worker; `incr` must count the hit and `get`
+    must not, and both return the counts of the given window and the one
+    before it.
+    """
+
+    @abstractmethod
+    async def incr(self, key: str, window_index: int, window_seconds: float) -> Tuple[int, int]:
+        ...
+
+    @abstractmethod
+    async def get(self, key: str, window_index: int) -> Tuple[int, int]:
+        ...
+
+    def clear(self) -> None:
+        pass
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """Per-process counters, at most `maxsize` keys (least recently hit evicted)."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        # key -> [window_index, current, previous]
+        self._windows: "OrderedDict[str, list]" = OrderedDict()
+
+    def _entry(self, key: str, window_index: int) -> list:
+        entry = self._windows.get(key)
+        if entry is None or entry[0] < window_index - 1:
+            return [window_index, 0, 0]
+        if entry[0] == window_index - 1:
+            return [window_index, 0, entry[1]]
+        return entry
+
+    async def get(self, key: str, window_index: int) -> Tuple[int, int]:
+        entry = self._entry(key, window_index)
+        return entry[1], entry[2]
+
+    async def incr(self, key: str, window_index: int, window_seconds: float) -> Tuple[int, int]:
+        entry = self._entry(key, window_index)
+        entry[1] += 1
+        self._windows[key] = entry
+        self._windows.move_to_end(key)
+        while len(self._windows) > self.maxsize:
+            self._windows.popitem(last=False)
+        return entry[1], entry[2]
+
+    def clear(self) -> None:
+        self._windows.clear()
+
+
+rate_limit_backend: RateLimitBackend = InMemoryRateLimitBackend(settings.RATE_LIMIT_MAX_KEYS)
+
+
+def set_rate_limit_backend(backend: RateLimitBackend) -> None:
+    global rate_limit_backend
+    rate_limit_backend = backend
+
+
+class SlidingWindowLimiter:
+    """
+    Sliding-window counter: the hits of the current fixed window plus those
+    of the previous one, weighted by how much of it the sliding window still
+    covers. Two counters per key instead of a timestamp per hit.
+    """
+
+    def __init__(self, name: str, limit: int, window_seconds: float, clock: Callable[[], float] = time.time):
+        self.name = name
+        self.limit = limit
+        self.window_seconds = window_seconds
+        self._clock = clock
+        self.rejected = 0
+
+    async def check(self, key: str) -> float:
+        """0 if one more hit for `key` is allowed, otherwise seconds until it would be. Counts nothing."""
+        now = self._clock()
+        window_index = int(now // self.window_seconds)
+        elapsed = now - window_index * self.window_seconds
+        current, previous = await rate_limit_backend.get(f"{self.name}:{key}", window_index)
+        if previous * (1 - elapsed / self.window_seconds) + current + 1 <= self.limit:
+            return 0.0
+        self.rejected += 1
+        return self._retry_after(current, previous, elapsed)
+
+    async def record(self, key: str) -> None:
+        now = self._clock()
+        await rate_limit_backend.incr(f"{self.name}:{key}", int(now // self.window_seconds), self.window_seconds)
+
+    async def hit(self, key: str) -> float:
+        """Like `check`, but counts the hit when it is allowed; rejected hits are never counted."""
+        retry_after = await self.check(key)
+        if not retry_after:
+            await self.record(key)
+        return retry_after
+
+    def _retry_after(self, current: int, previous: int, elapsed: float) -> float:
+        # تا وقتی که یه hit دیگه (+1) هنوز زیر limit باشه
+        window = self.window_seconds
+        room = self.limit - 1
+        if current <= room and previous:
+            # هنوز توی همین window: سهم window قبلی باید به اندازه‌ی کافی کم بشه
+            wait = window * (1 - (room - current) / previous) - elapsed
+            if wait < window - elapsed:
+                return max(wait, 0.0)
+        # window بعدی: hitهای همین window نقش previous رو دارن
+        return (window - elapsed) + (window * max(0.0, 1 - room / current) if current else 0.0)
+
+    def stats(self) -> dict:
+        return {"limit": self.limit, "window_seconds": self.window_seconds, "rejected": self.rejected}
+
+
+login_email_limiter = SlidingWindowLimiter(
+    "login-email", settings.LOGIN_RATE_LIMIT_PER_EMAIL, settings.LOGIN_RATE_LIMIT_WINDOW_SECONDS
+)
+login_ip_limiter = SlidingWindowLimiter(
+    "login-ip", settings.LOGIN_RATE_LIMIT_PER_IP, settings.LOGIN_RATE_LIMIT_WINDOW_SECONDS
+)
+
+
+class LoginAttempt:
+    """Limiter keys of one login request; call `failed` when the credentials are wrong."""
+
+    def __init__(self, ip: str, email: str | None):
+        self.ip = ip
+        self.email = email
+
+    async def failed(self) -> None:
+        if not settings.LOGIN_RATE_LIMIT_ENABLED:
+            return
+        await login_ip_limiter.record(self.ip)
+        if self.email is not None:
+            await login_email_limiter.record(self.email)
+
+
+async def login_rate_limit(request: Request) -> LoginAttempt:
+    """
+    Rejects login attempts with 429 while the failed logins of the email or
+    the client IP are over the limit, before the endpoint runs any query or
+    password hash. Only failures are counted, so neither successful logins
+    nor the rejected retries of a locked-out client extend the lockout.
+    """
+    # body قبلاً توسط FastAPI خونده و cache شده
+    try:
+        body = await request.json()
+    except ValueError:
+        body = None
+    email = body.get("email") if isinstance(body, dict) else None
+    # پشت proxy، uvicorn با --proxy-headers آدرس واقعی رو توی request.client می‌ذاره
+    attempt = LoginAttempt(
+        request.client.host if request.client else "unknown",
+        email.strip().lower() if isinstance(email, str) else None,
+    )
+    if not settings.LOGIN_RATE_LIMIT_ENABLED:
+        return attempt
+
+    retry_after = await login_ip_limiter.check(attempt.ip)
+    if attempt.email is not None:
+        retry_after = max(retry_after, await login_email_limiter.check(attempt.email))
+    if retry_after:
+        raise HTTPException(
+            status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts, try again later",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+    return attempt
@@ -0,0 +1,333 @@
+import asyncio
+import logging
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete, exists, literal, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import MISSING, BloomFilter, TTLCache, publish_invalidation, subscribe
+from app.core.config import settings
+from app.core.security import AuthenticatedUser, authenticate_claims, generate_refresh_token, principal_from_claims
+from app.db.session import AsyncSessionLocal
+from app.models.refresh_token import RefreshToken
+
+REFRESH_TOKEN_CHANNEL = "refresh-token-revoked"
+_INSERT = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+logger = logging.getLogger(__name__)
+
+
+class RefreshTokenStore:
+    """
+    Single-use refresh tokens: using one rotates it (its row gets revoked_at
+    and replaced_by) and presenting a rotated token again revokes its whole
+    family, since either the client or someone who stole the token is
+    replaying it.
+
+    Rotations and family revocations are written before the response, and
+    the rotation is one conditional upsert, so a token can be rotated only
+    once across all workers. A revoked family also gets a row keyed by its
+    family_id, which stops rotations of tokens whose rows were not written
+    yet. Only issuing is written behind: `issue` and `rotate` queue the new
+    rows and `run` (from the app lifespan) inserts them every
+    REFRESH_TOKEN_FLUSH_SECONDS, or sooner once REFRESH_TOKEN_FLUSH_BATCH are
+    waiting.
+
+    Known revocations are rejected in memory before any write: recent ones
+    exactly from `recent` (other workers get them through the invalidation
+    channel), older ones from a bloom filter loaded from the table and
+    reloaded by `run` every `reload_seconds`. Only filter hits are confirmed
+    against the table.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        error_rate: float,
+        reload_seconds: float,
+        session_factory=AsyncSessionLocal,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.reload_seconds = reload_seconds
+        self.session_factory = session_factory
+        self._clock = clock
+        self.revoked = BloomFilter(capacity, error_rate)
+        self.recent = TTLCache(
+            maxsize=settings.REFRESH_TOKEN_RECENT_MAXSIZE, ttl=settings.REFRESH_TOKEN_RECENT_TTL_SECONDS
+        )
+        self.loaded_at: float | None = None
+        self.reloads = 0
+        self.lookups = 0
+        self.false_positives = 0
+        self.reuse_detected = 0
+        self.flushes = 0
+        self.flush_errors = 0
+        self._new_rows: list[dict] = []
+        self._load_lock = asyncio.Lock()
+        self._flush_lock = asyncio.Lock()
+        self._wake = asyncio.Event()
+        self._during_reload: list[str] | None = None
+
+    def mark_revoked(self, key: str) -> None:
+        self.recent.set(key, True)
+        self.revoked.add(key)
+        if self._during_reload is not None:
+            self._during_reload.append(key)
+
+    def on_revoked(self, key: str) -> None:
+        # پیام خود این worker هم برمی‌گرده؛ قبلاً توی recent و filter ثبت شده
+        if self.recent.get(key) is MISSING:
+            self.mark_revoked(key)
+
+    def is_revoked(self, key: str) -> bool | None:
+        """True if known revoked, False if certainly not, None if the table must decide."""
+        if self.recent.get(key) is not MISSING:
+            return True
+        return None if key in self.revoked else False
+
+    async def reload(self, db: AsyncSession) -> None:
+        self._during_reload = []
+        try:
+            # ردیف‌های منقضی شده لازم نیستن؛ خود JWT دیگه قبول نمی‌شه
+            result = await db.execute(
+                select(RefreshToken.jti)
+                .where(RefreshToken.revoked_at.is_not(None), RefreshToken.expires_at > datetime.now(timezone.utc))
+            )
+            keys = [str(jti) for jti in result.scalars()] + self._during_reload
+        finally:
+            self._during_reload = None
+        revoked = BloomFilter(max(self.capacity, 2 * len(keys)), self.error_rate)
+        for key in keys:
+            revoked.add(key)
+        self.revoked = revoked
+        self.loaded_at = self._clock()
+        self.reloads += 1
+
+    async def ensure_loaded(self) -> None:
+        # پر شدن filter نرخ false positive رو بالا می‌بره؛ از نو ساخته می‌شه
+        if self.loaded_at is not None and self.revoked.count <= self.revoked.capacity:
+            return
+        async with self._load_lock:
+            if self.loaded_at is None or self.revoked.count > self.revoked.capacity:
+                async with self.session_factory() as db:
+                    await self.reload(db)
+
+    def issue(self, user_id: uuid.UUID, claims: dict, family_id: uuid.UUID | None = None) -> str:
+        """Return a new refresh token and queue its row."""
+        return self._issue(user_id, claims, family_id or uuid.uuid4(), uuid.uuid4())
+
+    def _issue(self, user_id: uuid.UUID, claims: dict, family_id: uuid.UUID, jti: uuid.UUID) -> str:
+        expires_in = settings.REFRESH_TOKEN_EXPIRE_SECONDS
+        self._new_rows.append({
+            "jti": jti,
+            "user_id": user_id,
+            "family_id": family_id,
+            "expires_at": datetime.now(timezone.utc) + timedelta(seconds=expires_in),
+        })
+        self._queued()
+        return generate_refresh_token(
+            user_id, expires_in=expires_in, claims={**claims, "jti": str(jti), "fam": str(family_id)}
+        )
+
+    async def verify(self, payload: dict) -> None:
+        """Raise 401 unless the decoded refresh token is still usable."""
+        jti, family_id = payload.get("jti"), payload.get("fam")
+        if not jti or not family_id:
+            raise HTTPException(status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
+
+        await self.ensure_loaded()
+        revoked = (self.is_revoked(jti), self.is_revoked(family_id))
+        if revoked == (False, False):
+            return
+        if True not in revoked:
+            self.lookups += 1
+            async with self.session_factory() as db:
+                result = await db.execute(select(RefreshToken.revoked_at).where(RefreshToken.jti == uuid.UUID(jti)))
+                row = result.one_or_none()
+            # ردیف نبودن یعنی هنوز flush نشده؛ اگه باطل شده بود توی recent بود
+            if row is None or row.revoked_at is None:
+                self.false_positives += 1
+                return
+
+        await self._reused(payload)
+
+    async def _reused(self, payload: dict) -> None:
+        self.reuse_detected += 1
+        await self.revoke_family(uuid.UUID(payload["fam"]), uuid.UUID(payload["user_id"]))
+        raise HTTPException(status.HTTP_401_UNAUTHORIZED, detail="Refresh token revoked")
+
+    async def principal(self, payload: dict) -> AuthenticatedUser:
+        """
+        User of a refresh token, taken from its claims whenever the token
+        version table vouches for them; a session is opened only otherwise.
+        """
+        principal = principal_from_claims(payload)
+        if principal is not None:
+            return principal
+        async with self.session_factory() as db:
+            return await authenticate_claims(db, payload, stateless=True)
+
+    async def rotate(self, payload: dict, claims: dict) -> str:
+        """Replace a verified refresh token with a new one of the same family."""
+        old_jti, family_id, user_id = payload["jti"], uuid.UUID(payload["fam"]), uuid.UUID(payload["user_id"])
+        if self.recent.get(old_jti) is not MISSING:
+            # یه refresh دیگه همزمان همین توکن رو مصرف کرده
+            await self._reused(payload)
+
+        new_jti = uuid.uuid4()
+        async with self.session_factory() as db:
+            result = await db.execute(self._rotation(db, payload, new_jti))
+            rotated = result.first() is not None
+            await db.commit()
+        if not rotated:
+            # worker دیگه‌ای زودتر چرخونده یا family باطل شده
+            await self._reused(payload)
+
+        self.mark_revoked(old_jti)
+        token = self._issue(user_id, claims, family_id, new_jti)
+        await publish_invalidation(REFRESH_TOKEN_CHANNEL, old_jti)
+        return token
+
+    def _rotation(self, db: AsyncSession, payload: dict, new_jti: uuid.UUID):
+        """
+        Mark the token rotated unless it already is or its family is revoked,
+        returning its jti only on success. The row is inserted when the
+        worker that issued the token has not written it yet.
+        """
+        table = RefreshToken.__table__
+        family = table.alias("family")
+        family_revoked = exists().where(family.c.jti == uuid.UUID(payload["fam"]))
+        values = {
+            "jti": uuid.UUID(payload["jti"]),
+            "user_id": uuid.UUID(payload["user_id"]),
+            "family_id": uuid.UUID(payload["fam"]),
+            "expires_at": datetime.fromtimestamp(payload["exp"], timezone.utc),
+            "revoked_at": datetime.now(timezone.utc),
+            "replaced_by": new_jti,
+        }
+        row = select(*(literal(value, table.c[name].type) for name, value in values.items())).where(~family_revoked)
+        stmt = _INSERT[db.get_bind().dialect.name](table).from_select(list(values), row)
+        return stmt.on_conflict_do_update(
+            index_elements=[table.c.jti],
+            set_={"revoked_at": stmt.excluded.revoked_at, "replaced_by": stmt.excluded.replaced_by},
+            where=table.c.revoked_at.is_(None) & ~family_revoked,
+        ).returning(table.c.jti)
+
+    async def revoke_family(self, family_id: uuid.UUID, user_id: uuid.UUID) -> None:
+        """Revoke every token of the family, including rows not written yet."""
+        now = datetime.now(timezone.utc)
+        self.mark_revoked(str(family_id))
+        async with self.session_factory() as db:
+            # ردیفی با jti برابر family_id جلوی چرخش توکن‌های flush نشده رو می‌گیره
+            await db.execute(
+                _INSERT[db.get_bind().dialect.name](RefreshToken)
+                .values(
+                    jti=family_id,
+                    user_id=user_id,
+                    family_id=family_id,
+                    expires_at=now + timedelta(seconds=settings.REFRESH_TOKEN_EXPIRE_SECONDS),
+                    revoked_at=now,
+                )
+                .on_conflict_do_nothing(index_elements=[RefreshToken.jti])
+            )
+            await db.execute(
+                update(RefreshToken)
+                .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+                .values(revoked_at=now)
+            )
+            await db.commit()
+        await publish_invalidation(REFRESH_TOKEN_CHANNEL, str(family_id))
+
+    def _queued(self) -> None:
+        if self.pending >= settings.REFRESH_TOKEN_FLUSH_BATCH:
+            self._wake.set()
+
+    @property
+    def pending(self) -> int:
+        return len(self._new_rows)
+
+    async def flush(self) -> None:
+        """Write the queued rows of issued tokens."""
+        async with self._flush_lock:
+            rows = self._new_rows
+            if not rows:
+                return
+            self._new_rows = []
+            try:
+                async with self.session_factory() as db:
+                    # ردیفی که worker دیگه موقع چرخش نوشته همون‌جا می‌مونه
+                    await db.execute(
+                        _INSERT[db.get_bind().dialect.name](RefreshToken).on_conflict_do_nothing(index_elements=[RefreshToken.jti]),
+                        rows,
+                    )
+                    await db.commit()
+            except BaseException as exc:
+                # برمی‌گردن اول صف؛ flush بعدی دوباره امتحان می‌کنه
+                self._new_rows[:0] = rows
+                if not isinstance(exc, Exception):
+                    raise
+                self.flush_errors += 1
+                logger.exception("refresh token flush failed")
+                return
+            self.flushes += 1
+
+    async def run(self) -> None:
+        """Background flush loop, started from the app lifespan."""
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), settings.REFRESH_TOKEN_FLUSH_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            # cancel شدن loop موقع shutdown نباید flush نیمه‌کاره رو قطع کنه
+            await asyncio.shield(self.flush())
+            if self.loaded_at is None or self._clock() - self.loaded_at >= self.reload_seconds:
+                try:
+                    async with self._load_lock:
+                        async with self.session_factory() as db:
+                            await self.reload(db)
+                except Exception:
+                    logger.exception("refresh token filter reload failed")
+
+    def stats(self) -> dict:
+        return {
+            "reloads": self.reloads,
+            "age_seconds": None if self.loaded_at is None else self._clock() - self.loaded_at,
+            "filter_keys": self.revoked.count,
+            "filter_capacity": self.revoked.capacity,
+            "recent": self.recent.stats()["size"],
+            "lookups": self.lookups,
+            "false_positives": self.false_positives,
+            "reuse_detected": self.reuse_detected,
+            "pending_writes": self.pending,
+            "flushes": self.flushes,
+            "flush_errors": self.flush_errors,
+        }
+
+
+async def purge_expired(db: AsyncSession, before: datetime | None = None, batch_size: int | None = None) -> int:
+    """Delete refresh token rows that expired before `before`, in batches. Commits each batch."""
+    before = before or datetime.now(timezone.utc)
+    batch_size = batch_size or settings.REFRESH_TOKEN_CLEANUP_BATCH
+    deleted = 0
+    while True:
+        batch = select(RefreshToken.jti).where(RefreshToken.expires_at < before).limit(batch_size)
+        result = await db.execute(delete(RefreshToken).where(RefreshToken.jti.in_(batch)))
+        await db.commit()
+        deleted += result.rowcount
+        if result.rowcount < batch_size:
+            return deleted
+
+
+refresh_tokens = RefreshTokenStore(
+    settings.REFRESH_TOKEN_FILTER_CAPACITY,
+    settings.REFRESH_TOKEN_FILTER_ERROR_RATE,
+    settings.REFRESH_TOKEN_RELOAD_SECONDS,
+)
+subscribe(REFRESH_TOKEN_CHANNEL, refresh_tokens.on_revoked)
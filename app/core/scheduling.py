@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, Tuple
+
+Interval = Tuple[datetime, datetime]
+
+
+def to_naive_utc(value: datetime) -> datetime:
+    """Appointments are stored without tzinfo (UTC); availabilities with it."""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def merge_intervals(intervals: Iterable[Interval]) -> List[Interval]:
+    """Merge overlapping or touching intervals. Input must be sorted by start."""
+    merged: List[Interval] = []
+    for start, end in intervals:
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def subtract_intervals(windows: Iterable[Interval], busy: Iterable[Interval]) -> List[Interval]:
+    """
+    Free parts of `windows` not covered by `busy`, in a single sweep.
+    Both inputs must be sorted by start; overlaps inside each are allowed.
+    """
+    windows = merge_intervals(windows)
+    busy = merge_intervals(busy)
+    free: List[Interval] = []
+    i = 0
+    for start, end in windows:
+        cursor = start
+        # نوبت‌هایی که قبل از این بازه تموم شدن دیگه به کار نمیان
+        while i < len(busy) and busy[i][1] <= cursor:
+            i += 1
+        j = i
+        while j < len(busy) and busy[j][0] < end:
+            if busy[j][0] > cursor:
+                free.append((cursor, busy[j][0]))
+            cursor = max(cursor, busy[j][1])
+            j += 1
+        if cursor < end:
+            free.append((cursor, end))
+    return free
+
+
+def slice_slots(free: Iterable[Interval], duration: timedelta) -> List[Interval]:
+    """Cut each free interval into back-to-back slots of `duration`."""
+    if duration <= timedelta(0):
+        return []
+    slots: List[Interval] = []
+    for start, end in free:
+        while start + duration <= end:
+            slots.append((start, start + duration))
+            start += duration
+    return slots
+
+
+def clip_intervals(intervals: Iterable[Interval], lower: datetime, upper: datetime) -> List[Interval]:
+    return [
+        (max(start, lower), min(end, upper))
+        for start, end in intervals
+        if start < upper and end > lower
+    ]
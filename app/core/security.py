@@ -1,9 +1,14 @@
+import asyncio
 import jwt
 import uuid
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
 from passlib.context import CryptContext
+from app.core.cache import MISSING, TTLCache, publish_invalidation, subscribe
 from app.core.config import settings
-from jwt import ExpiredSignatureError, DecodeError
+from app.core.tokens import jwt_keys, token_versions
+from jwt import ExpiredSignatureError, InvalidTokenError
 from fastapi import Depends, HTTPException, status
 from app.db.session import get_db
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -12,71 +17,183 @@ from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from app.models.user import User
 
 security = HTTPBearer()
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["argon2"],
+    deprecated="auto",
+    argon2__time_cost=settings.ARGON2_TIME_COST,
+    argon2__memory_cost=settings.ARGON2_MEMORY_COST,
+    argon2__parallelism=settings.ARGON2_PARALLELISM,
+)
 
-async def get_authenticated_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: AsyncSession = Depends(get_db),
-):
-    token = credentials.credentials
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
+AUTH_CACHE_CHANNEL = "auth-user"
 
-        if payload.get("type") != "access":
-            raise HTTPException(status.HTTP_401_UNAUTHORIZED, detail="Invalid token type")
 
-        user_id = payload.get("user_id")
-        if not user_id:
-            raise HTTPException(status.HTTP_401_UNAUTHORIZED, detail="Invalid token payload")
+@dataclass(frozen=True)
+class AuthenticatedUser:
+    """Minimal principal cached per user id instead of the full User row."""
+    id: uuid.UUID
+    role: str
+    is_active: bool
+    is_superuser: bool
+    token_version: int = 0
 
-        result = await db.execute(
-            select(User).where(User.id == uuid.UUID(user_id))
-        )
-        user = result.scalar_one_or_none()
 
-        if not user:
-            raise HTTPException(status.HTTP_401_UNAUTHORIZED, detail="User not found")
+auth_cache = TTLCache(maxsize=settings.AUTH_CACHE_MAXSIZE, ttl=settings.AUTH_CACHE_TTL_SECONDS)
+subscribe(AUTH_CACHE_CHANNEL, lambda key: auth_cache.invalidate(uuid.UUID(key)))
+subscribe(AUTH_CACHE_CHANNEL, lambda key: token_versions.mark(uuid.UUID(key)))
+
+
+def revoke_user_tokens(user: User) -> None:
+    """Invalidate every token issued to `user` so far; the caller commits."""
+    user.token_version += 1
+    user.token_version_changed_at = datetime.now(timezone.utc)
+
+
+async def invalidate_authenticated_user(user_id: uuid.UUID) -> None:
+    """
+    Call after changing a user's role, active state or deleting it. Call
+    revoke_user_tokens in the same change so stateless tokens stop working.
+    """
+    await publish_invalidation(AUTH_CACHE_CHANNEL, str(user_id))
+
+
+async def load_authenticated_user(db: AsyncSession, user_id: uuid.UUID) -> AuthenticatedUser | None:
+    if settings.AUTH_CACHE_ENABLED:
+        principal = auth_cache.get(user_id)
+        if principal is not MISSING:
+            return principal
+
+    result = await db.execute(
+        select(User.id, User.role, User.is_active, User.is_superuser, User.token_version).where(User.id == user_id)
+    )
+    row = result.one_or_none()
+    principal = AuthenticatedUser(*row) if row else None
+
+    if principal and settings.AUTH_CACHE_ENABLED:
+        auth_cache.set(user_id, principal)
+    return principal
+
 
-        return user
+def token_claims(user: User | AuthenticatedUser) -> dict:
+    """Claims that let a verifier authorize the request without loading the user."""
+    return {"role": user.role, "active": user.is_active, "su": user.is_superuser, "ver": user.token_version}
 
+
+def decode_token(token: str, token_type: str) -> dict:
+    keys = jwt_keys()
+    try:
+        payload = jwt.decode(
+            token,
+            keys.verification_key,
+            algorithms=[keys.algorithm],
+            issuer=settings.JWT_ISSUER,
+            options={"require": ["exp", "iat", "iss"]},
+        )
     except ExpiredSignatureError:
         raise HTTPException(status.HTTP_401_UNAUTHORIZED, detail="Token expired")
-    except DecodeError:
+    except InvalidTokenError:
         raise HTTPException(status.HTTP_401_UNAUTHORIZED, detail="Token invalid")
+
+    if payload.get("type") != token_type:
+        raise HTTPException(status.HTTP_401_UNAUTHORIZED, detail="Invalid token type")
+    if not payload.get("user_id"):
+        raise HTTPException(status.HTTP_401_UNAUTHORIZED, detail="Invalid token payload")
+    return payload
+
+
+def principal_from_claims(payload: dict) -> AuthenticatedUser | None:
+    """
+    Principal carried by the token itself, if the token version table vouches
+    for it. None when the table has to be reloaded or the user was
+    invalidated since its last reload.
+    """
+    user_id = uuid.UUID(payload["user_id"])
+    version = payload.get("ver")
+    if version is None or token_versions.is_stale():
+        return None
+    if not payload.get("active"):
+        raise HTTPException(status.HTTP_401_UNAUTHORIZED, detail="User is inactive")
+    valid = token_versions.check(user_id, version)
+    if valid is False:
+        raise HTTPException(status.HTTP_401_UNAUTHORIZED, detail="Token revoked")
+    if valid is None:
+        return None
+    return AuthenticatedUser(
+        id=user_id,
+        role=payload["role"],
+        is_active=payload["active"],
+        is_superuser=payload.get("su", False),
+        token_version=version,
+    )
+
+
+async def authenticate_claims(db: AsyncSession, payload: dict, stateless: bool | None = None) -> AuthenticatedUser:
+    """
+    Principal of a decoded token. In stateless mode tokens carrying claims are
+    trusted once their version passes the in-memory table; otherwise (and for
+    users invalidated since the last table reload) the user is loaded.
+    """
+    user_id = uuid.UUID(payload["user_id"])
+    version = payload.get("ver")
+
+    if stateless is None:
+        stateless = settings.AUTH_MODE == "stateless"
+    if stateless and version is not None:
+        await token_versions.ensure_fresh(db)
+        principal = principal_from_claims(payload)
+        if principal is not None:
+            return principal
+
+    user = await load_authenticated_user(db, user_id)
+
+    if not user:
+        raise HTTPException(status.HTTP_401_UNAUTHORIZED, detail="User not found")
+
+    if not user.is_active:
+        raise HTTPException(status.HTTP_401_UNAUTHORIZED, detail="User is inactive")
+
+    if version is not None and version != user.token_version:
+        raise HTTPException(status.HTTP_401_UNAUTHORIZED, detail="Token revoked")
+
+    return user
+
+
+async def get_authenticated_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_db),
+) -> AuthenticatedUser:
+    try:
+        payload = decode_token(credentials.credentials, "access")
+        return await authenticate_claims(db, payload)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status.HTTP_401_UNAUTHORIZED, detail=f"Authentications failed, {e}")
 
-# ساخت توکن
-def generate_access_token(user_id: uuid.UUID, expires_in: int = 60 * 5) -> str:
-    now = datetime.utcnow()
+
+def _encode_token(token_type: str, user_id: uuid.UUID, expires_in: int, claims: dict | None) -> str:
+    keys = jwt_keys()
+    if keys.signing_key is None:
+        raise RuntimeError("JWT_PRIVATE_KEY is required to issue tokens")
+    now = datetime.now(timezone.utc)
     payload = {
-        "type": "access",
+        **(claims or {}),
+        "type": token_type,
         "user_id": str(user_id),
+        "iss": settings.JWT_ISSUER,
         "iat": now,
         "exp": now + timedelta(seconds=expires_in),
     }
-    return jwt.encode(payload, settings.SECRET_KEY, algorithm="HS256")
+    return jwt.encode(payload, keys.signing_key, algorithm=keys.algorithm, headers={"kid": keys.kid})
 
 
-def generate_refresh_token(user_id: int, expires_in: int = 3600 * 24) -> str:
-    now = datetime.utcnow()
-    payload = {
-        "type": "refresh",
-        "user_id": str(user_id),
-        "iat": now,
-        "exp": now + timedelta(seconds=expires_in),
-    }
-    return jwt.encode(payload, settings.SECRET_KEY, algorithm="HS256")
+# ساخت توکن
+def generate_access_token(user_id: uuid.UUID, expires_in: int | None = None, claims: dict | None = None) -> str:
+    return _encode_token("access", user_id, expires_in or settings.ACCESS_TOKEN_EXPIRE_SECONDS, claims)
 
 
-def decode_refresh_token(token: str) -> uuid.UUID:
-    try:
-        decode = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
-        if decode.get("type") != "refresh":
-            raise HTTPException(status.HTTP_401_UNAUTHORIZED, detail="Token type invalid")
-        return uuid.UUID(decode["user_id"])
-    except (ExpiredSignatureError, DecodeError):
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
+def generate_refresh_token(user_id: uuid.UUID, expires_in: int | None = None, claims: dict | None = None) -> str:
+    return _encode_token("refresh", user_id, expires_in or settings.REFRESH_TOKEN_EXPIRE_SECONDS, claims)
 
 
 def hash_password(password: str):
@@ -85,7 +202,58 @@ def hash_password(password: str):
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
 
-def require_admin(user: User = Depends(get_authenticated_user)):
+
+class PasswordHasherPool:
+    """
+    Runs argon2 off the event loop on a dedicated thread pool (argon2-cffi
+    releases the GIL while hashing). At most `workers` hashes run at once and
+    `queue_size` more may wait; anything beyond that is rejected with 503.
+    """
+
+    def __init__(self, workers: int, queue_size: int):
+        self.workers = workers
+        self.capacity = workers + queue_size
+        self.in_flight = 0
+        self.rejected = 0
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="argon2")
+
+    async def run(self, fn, *args):
+        if self.in_flight >= self.capacity:
+            self.rejected += 1
+            raise HTTPException(
+                status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, try again later",
+                headers={"Retry-After": "1"},
+            )
+        loop = asyncio.get_running_loop()
+        future = self._executor.submit(fn, *args)
+        self.in_flight += 1
+        # وقتی thread واقعاً تموم شد، نه وقتی درخواست (مثلاً با قطع اتصال) cancel شد
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(self._release))
+        return await asyncio.wrap_future(future)
+
+    def _release(self) -> None:
+        self.in_flight -= 1
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "capacity": self.capacity,
+            "in_flight": self.in_flight,
+            "rejected": self.rejected,
+        }
+
+
+password_hasher = PasswordHasherPool(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_QUEUE_SIZE)
+
+
+async def hash_password_async(password: str) -> str:
+    return await password_hasher.run(hash_password, password)
+
+async def verify_password_async(plain_password, hashed_password) -> bool:
+    return await password_hasher.run(verify_password, plain_password, hashed_password)
+
+def require_admin(user: AuthenticatedUser = Depends(get_authenticated_user)):
     if user.role != "admin":
         raise HTTPException(status_code=403)
     return user
\ No newline at end of file
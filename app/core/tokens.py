@@ -0,0 +1,152 @@
+import asyncio
+import logging
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from cryptography.hazmat.primitives.serialization import load_pem_private_key, load_pem_public_key
+from jwt.algorithms import get_default_algorithms
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class JWTKeys:
+    algorithm: str
+    kid: str
+    signing_key: Any
+    verification_key: Any
+
+    @property
+    def symmetric(self) -> bool:
+        return self.algorithm.startswith("HS")
+
+
+@lru_cache(maxsize=1)
+def jwt_keys() -> JWTKeys:
+    """
+    Key material parsed once per process. HS* signs with SECRET_KEY; RS*/ES*/PS*
+    sign with JWT_PRIVATE_KEY (PEM) and verify with JWT_PUBLIC_KEY, which is
+    derived from the private key when not given. A process that only verifies
+    can be configured with the public key alone.
+    """
+    algorithm = settings.JWT_ALGORITHM
+    if algorithm not in get_default_algorithms() or algorithm == "none":
+        raise RuntimeError(f"Unsupported JWT_ALGORITHM {algorithm!r}")
+    if algorithm.startswith("HS"):
+        return JWTKeys(algorithm, settings.JWT_KEY_ID, settings.SECRET_KEY, settings.SECRET_KEY)
+
+    private_key = (
+        load_pem_private_key(settings.JWT_PRIVATE_KEY.encode(), password=None)
+        if settings.JWT_PRIVATE_KEY else None
+    )
+    if settings.JWT_PUBLIC_KEY:
+        public_key = load_pem_public_key(settings.JWT_PUBLIC_KEY.encode())
+    elif private_key is not None:
+        public_key = private_key.public_key()
+    else:
+        raise RuntimeError(f"{algorithm} needs JWT_PRIVATE_KEY or JWT_PUBLIC_KEY")
+    return JWTKeys(algorithm, settings.JWT_KEY_ID, private_key, public_key)
+
+
+def jwks() -> dict:
+    """Public verification keys as a JWK Set; empty for shared-secret algorithms."""
+    keys = jwt_keys()
+    if keys.symmetric:
+        return {"keys": []}
+    jwk = get_default_algorithms()[keys.algorithm].to_jwk(keys.verification_key, as_dict=True)
+    jwk.update(kid=keys.kid, use="sig", alg=keys.algorithm)
+    return {"keys": [jwk]}
+
+
+class TokenVersionTable:
+    """
+    Per-process copy of the users whose tokens were revoked (token_version
+    bumped, which deactivation also does) within the last token lifetime.
+    Tokens issued before an older bump have all expired, so any unexpired
+    token of a user missing from the table is valid and the table only
+    holds recent revocations.
+
+    Reloaded every TOKEN_VERSION_REFRESH_SECONDS. Users invalidated since the
+    last reload are `pending` and checked against the database until then.
+    """
+
+    def __init__(self, refresh_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.refresh_seconds = refresh_seconds
+        self._clock = clock
+        self.versions: Dict[uuid.UUID, Tuple[int, bool]] = {}
+        self.pending: set[uuid.UUID] = set()
+        self.loaded_at: Optional[float] = None
+        self.reloads = 0
+        self._lock = asyncio.Lock()
+
+    def check(self, user_id: uuid.UUID, token_version: int) -> Optional[bool]:
+        """True/False when the table knows the answer, None to ask the database."""
+        if self.loaded_at is None or user_id in self.pending:
+            return None
+        entry = self.versions.get(user_id)
+        if entry is None:
+            return True
+        version, is_active = entry
+        return is_active and version == token_version
+
+    def mark(self, user_id: uuid.UUID) -> None:
+        self.pending.add(user_id)
+
+    def is_stale(self) -> bool:
+        # دو برابر بازه: یعنی refresh پس‌زمینه اجرا نشده یا از کار افتاده
+        return self.loaded_at is None or self._clock() - self.loaded_at > 2 * self.refresh_seconds
+
+    async def reload(self, db: AsyncSession) -> None:
+        pending = set(self.pending)
+        lifetime = max(settings.ACCESS_TOKEN_EXPIRE_SECONDS, settings.REFRESH_TOKEN_EXPIRE_SECONDS)
+        result = await db.execute(
+            select(User.id, User.token_version, User.is_active)
+            .where(User.token_version_changed_at > datetime.now(timezone.utc) - timedelta(seconds=lifetime))
+        )
+        self.versions = {row.id: (row.token_version, row.is_active) for row in result}
+        # invalidationهایی که وسط همین query رسیدن pending می‌مونن
+        self.pending -= pending
+        self.loaded_at = self._clock()
+        self.reloads += 1
+
+    async def ensure_fresh(self, db: AsyncSession) -> None:
+        if not self.is_stale():
+            return
+        async with self._lock:
+            if self.is_stale():
+                await self.reload(db)
+
+    async def run(self, session_factory) -> None:
+        """Background reload loop, started from the app lifespan."""
+        while True:
+            try:
+                async with session_factory() as db:
+                    await self.reload(db)
+            except Exception:
+                logger.exception("token version reload failed")
+            await asyncio.sleep(self.refresh_seconds)
+
+    def clear(self) -> None:
+        self.versions.clear()
+        self.pending.clear()
+        self.loaded_at = None
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self.versions),
+            "pending": len(self.pending),
+            "reloads": self.reloads,
+            "age_seconds": None if self.loaded_at is None else self._clock() - self.loaded_at,
+        }
+
+
+token_versions = TokenVersionTable(settings.TOKEN_VERSION_REFRESH_SECONDS)
@@ -0,0 +1,31 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import Float
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+
+class epoch(FunctionElement):
+    """
+    Seconds since 1970-01-01 for a timestamp expression, so durations can be
+    compared with plain arithmetic on every backend. Naive values count as UTC;
+    SQLite only has whole-second precision.
+    """
+    type = Float()
+    name = "epoch"
+    inherit_cache = True
+
+
+@compiles(epoch, "postgresql")
+def _epoch_postgresql(element, compiler, **kw):
+    return "EXTRACT(EPOCH FROM %s)" % compiler.process(element.clauses, **kw)
+
+
+@compiles(epoch, "sqlite")
+def _epoch_sqlite(element, compiler, **kw):
+    # دقت ثانیه؛ julianday خطای اعشاری داره و مقایسه‌ی مرزها رو خراب می‌کنه
+    return "CAST(strftime('%%s', %s) AS INTEGER)" % compiler.process(element.clauses, **kw)
+
+
+def from_epoch(seconds: float) -> datetime:
+    return datetime.fromtimestamp(round(seconds, 3), timezone.utc).replace(tzinfo=None)
@@ -0,0 +1,111 @@
+from collections import Counter, defaultdict
+from datetime import date, datetime, time, timedelta
+from typing import Any, Iterable, Optional, Tuple
+
+from sqlalchemy import Integer, cast, delete, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.scheduling import to_naive_utc
+from app.db.functions import epoch
+from app.models.appointment import Appointment
+from app.models.appointment_rollup import AppointmentDailyRollup, ROLLUP_COUNTERS, ROLLUP_STATUSES
+
+# (appointment یا row با provider_id/service_id/start_time/end_time/price, وضعیت قبلی, وضعیت جدید)
+RollupChange = Tuple[Any, Optional[str], Optional[str]]
+
+_UPSERT_INSERT = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def _contribution(status: Optional[str], minutes: int, price: int) -> dict:
+    if status is None:
+        return {}
+    counters = {status: 1}
+    if status != "cancelled":
+        counters["booked_minutes"] = minutes
+        counters["revenue"] = price
+    return counters
+
+
+async def record_rollup_changes(db: AsyncSession, changes: Iterable[RollupChange]) -> None:
+    """
+    Apply appointment status changes to the daily rollups as deltas, inside
+    the caller's transaction. Deltas are added atomically in the upsert, so
+    concurrent writers to the same bucket don't overwrite each other.
+    Revenue uses the price stored on the appointment when it was booked, so
+    a later change undoes exactly what booking it added.
+    """
+    changes = [change for change in changes if change[1] != change[2]]
+    if not changes:
+        return
+
+    deltas = defaultdict(Counter)
+    for appointment, old_status, new_status in changes:
+        start, end = to_naive_utc(appointment.start_time), to_naive_utc(appointment.end_time)
+        minutes = int((end - start).total_seconds()) // 60
+        price = appointment.price or 0
+        key = (appointment.provider_id, appointment.service_id, start.date())
+        deltas[key].update(_contribution(new_status, minutes, price))
+        deltas[key].subtract(_contribution(old_status, minutes, price))
+
+    # ترتیب ثابت کلیدها تا دو batch هم‌زمان روی ردیف‌ها deadlock نکنن
+    rows = [
+        {
+            "provider_id": provider_id,
+            "service_id": service_id,
+            "day": day,
+            **{column: counters[column] for column in ROLLUP_COUNTERS},
+        }
+        for (provider_id, service_id, day), counters in sorted(deltas.items(), key=lambda item: str(item[0]))
+    ]
+    table = AppointmentDailyRollup.__table__
+    stmt = _UPSERT_INSERT[db.get_bind().dialect.name](table).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.provider_id, table.c.service_id, table.c.day],
+        set_={
+            **{column: table.c[column] + stmt.excluded[column] for column in ROLLUP_COUNTERS},
+            "updated_at": func.now(),
+        },
+    )
+    await db.execute(stmt)
+
+
+async def rebuild_rollups(
+    db: AsyncSession,
+    day_from: Optional[date] = None,
+    day_to: Optional[date] = None,
+) -> int:
+    """
+    Recompute the rollups of [day_from, day_to] (inclusive, open-ended when
+    omitted) from the appointments table.
+    Returns the number of rollup rows written; the caller commits.
+    """
+    day = func.date(Appointment.start_time)
+    not_cancelled = Appointment.status != "cancelled"
+    minutes = cast(epoch(Appointment.end_time) - epoch(Appointment.start_time), Integer) // 60
+    aggregate = (
+        select(
+            Appointment.provider_id,
+            Appointment.service_id,
+            day.label("day"),
+            *[func.count().filter(Appointment.status == status).label(status) for status in ROLLUP_STATUSES],
+            func.coalesce(func.sum(minutes).filter(not_cancelled), 0).label("booked_minutes"),
+            func.coalesce(func.sum(Appointment.price).filter(not_cancelled), 0).label("revenue"),
+        )
+        .group_by(Appointment.provider_id, Appointment.service_id, day)
+    )
+    cleanup = delete(AppointmentDailyRollup)
+    if day_from:
+        aggregate = aggregate.where(Appointment.start_time >= datetime.combine(day_from, time.min))
+        cleanup = cleanup.where(AppointmentDailyRollup.day >= day_from)
+    if day_to:
+        aggregate = aggregate.where(Appointment.start_time < datetime.combine(day_to + timedelta(days=1), time.min))
+        cleanup = cleanup.where(AppointmentDailyRollup.day <= day_to)
+
+    await db.execute(cleanup)
+    result = await db.execute(
+        insert(AppointmentDailyRollup).from_select(
+            ["provider_id", "service_id", "day", *ROLLUP_COUNTERS], aggregate
+        )
+    )
+    return result.rowcount
@@ -1,11 +1,48 @@
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.db.pool import InstrumentedAsyncQueuePool
+from app.db.slow_query import install_slow_query_log
+
+
+def engine_options(database_url: str) -> dict:
+    url = make_url(database_url)
+    # DB_ECHO از طریق logger "sqlalchemy.engine" و صف لاگ اعمال می‌شه، نه echo
+    options = {
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+    # sqlite در حافظه یک connection ثابت داره و pool اندازه‌پذیر نمی‌خواد
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return options
+
+    options.update(
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+    )
+
+    if url.get_driver_name() == "asyncpg":
+        server_settings = {}
+        if settings.DB_STATEMENT_TIMEOUT_MS:
+            server_settings["statement_timeout"] = str(settings.DB_STATEMENT_TIMEOUT_MS)
+        options["connect_args"] = {
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "server_settings": server_settings,
+        }
+
+    return options
+
 
 engine = create_async_engine(
     settings.DATABASE_URL,
-    echo=True,
+    **engine_options(settings.DATABASE_URL),
 )
+if settings.SLOW_QUERY_THRESHOLD_MS:
+    install_slow_query_log(engine)
 
 AsyncSessionLocal = sessionmaker(
     bind=engine,
@@ -0,0 +1,163 @@
+import asyncio
+import hashlib
+import logging
+import re
+import time
+from collections import Counter
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+from app.core.instrumentation import current_request_stats
+
+logger = logging.getLogger("app.db.slow_query")
+
+_NORMALIZERS = (
+    (re.compile(r"'(?:[^']|'')*'"), "?"),
+    (re.compile(r"\$\d+|%\(\w+\)s|\?"), "?"),
+    (re.compile(r"(?<![\w.])\d+(?:\.\d+)?\b"), "?"),
+    (re.compile(r"\s+"), " "),
+    # IN (?, ?, ?) و VALUES (?, ?), (?, ?) با هر تعداد عضو یک fingerprint دارن
+    (re.compile(r"\(\?(?:, \?)*\)"), "(...)"),
+    (re.compile(r"\(\.\.\.\)(?:, \(\.\.\.\))+"), "(...)"),
+)
+
+
+def normalize(statement: str) -> str:
+    """Statement with literals and bind placeholders replaced, whitespace collapsed."""
+    for pattern, replacement in _NORMALIZERS:
+        statement = pattern.sub(replacement, statement)
+    return statement.strip()
+
+
+def fingerprint(normalized: str) -> str:
+    return hashlib.sha1(normalized.encode()).hexdigest()[:12]
+
+
+def _shape(parameters: Any) -> Any:
+    if isinstance(parameters, dict):
+        return {name: type(value).__name__ for name, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+def parameter_shapes(parameters: Any, executemany: bool) -> Any:
+    """Types of the bound parameters, never their values."""
+    if executemany and isinstance(parameters, (list, tuple)) and parameters:
+        return {"rows": len(parameters), "shape": _shape(parameters[0])}
+    return _shape(parameters)
+
+
+class SlowQueryLog:
+    """Slow statements aggregated by fingerprint, bounded to `max_fingerprints`."""
+
+    def __init__(self, max_fingerprints: int):
+        self.max_fingerprints = max_fingerprints
+        self.entries: Dict[str, dict] = {}
+        self.dropped = 0
+
+    def record(self, normalized: str, duration_ms: float, route: str, shapes: Any) -> Optional[dict]:
+        key = fingerprint(normalized)
+        entry = self.entries.get(key)
+        if entry is None:
+            if len(self.entries) >= self.max_fingerprints:
+                self.dropped += 1
+                return None
+            entry = self.entries[key] = {
+                "fingerprint": key,
+                "statement": normalized,
+                "count": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "routes": Counter(),
+                "parameter_shapes": shapes,
+                "plan": None,
+            }
+        entry["count"] += 1
+        entry["total_ms"] += duration_ms
+        entry["max_ms"] = max(entry["max_ms"], duration_ms)
+        entry["routes"][route] += 1
+        return entry
+
+    def top(self, limit: int) -> list:
+        ranked = sorted(self.entries.values(), key=lambda entry: entry["total_ms"], reverse=True)
+        return [
+            {
+                **entry,
+                "total_ms": round(entry["total_ms"], 3),
+                "max_ms": round(entry["max_ms"], 3),
+                "avg_ms": round(entry["total_ms"] / entry["count"], 3),
+                "routes": dict(entry["routes"].most_common()),
+            }
+            for entry in ranked[:limit]
+        ]
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.dropped = 0
+
+
+slow_query_log = SlowQueryLog(settings.SLOW_QUERY_MAX_FINGERPRINTS)
+_plan_tasks: set = set()
+
+
+async def _capture_plan(engine: AsyncEngine, entry: dict, statement: str, parameters: Any) -> None:
+    # روی connection جدا و بیرون از request؛ EXPLAIN بدون ANALYZE چیزی اجرا نمی‌کنه
+    try:
+        async with engine.connect() as conn:
+            result = await conn.exec_driver_sql(f"EXPLAIN {statement}", parameters)
+            entry["plan"] = "\n".join(row[0] for row in result)
+        logger.info("plan for slow query %s:\n%s", entry["fingerprint"], entry["plan"])
+    except Exception:
+        entry["plan"] = None
+        logger.exception("could not capture plan for slow query %s", entry["fingerprint"])
+
+
+def install_slow_query_log(engine: AsyncEngine) -> None:
+    """Log and aggregate statements slower than SLOW_QUERY_THRESHOLD_MS (0 disables)."""
+    explain = engine.dialect.name == "postgresql"
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("slow_query_start", []).append(time.perf_counter())
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("slow_query_start")
+        if not starts:
+            return
+        duration_ms = (time.perf_counter() - starts.pop()) * 1000
+        threshold = settings.SLOW_QUERY_THRESHOLD_MS
+        if not threshold or duration_ms < threshold:
+            return
+
+        stats = current_request_stats.get()
+        route = stats.route if stats is not None else "-"
+        shapes = parameter_shapes(parameters, executemany)
+        normalized = normalize(statement)
+        entry = slow_query_log.record(normalized, duration_ms, route, shapes)
+        logger.warning(
+            "slow query %.1fms route=%s fingerprint=%s params=%s: %s",
+            duration_ms, route, fingerprint(normalized), shapes, normalized,
+        )
+
+        if (
+            explain and settings.SLOW_QUERY_EXPLAIN and entry is not None
+            and entry["plan"] is None and not executemany
+            and not statement.lstrip().upper().startswith("EXPLAIN")
+        ):
+            entry["plan"] = "pending"
+            task = asyncio.get_running_loop().create_task(_capture_plan(engine, entry, statement, parameters))
+            _plan_tasks.add(task)
+            task.add_done_callback(_plan_tasks.discard)
+
+    def handle_error(exception_context):
+        # statement خطا داده و after_cursor_execute صدا زده نمی‌شه
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("slow_query_start"):
+            conn.info["slow_query_start"].pop()
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", after_cursor_execute)
+    event.listen(engine.sync_engine, "handle_error", handle_error)
@@ -1,17 +1,53 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from app.core.config import settings
+from app.core.instrumentation import InstrumentationMiddleware, install_query_hooks
+from app.core.logging_config import AccessLogMiddleware, setup_logging
+from app.core.refresh_tokens import refresh_tokens
+from app.core.tokens import token_versions
+from app.db.session import AsyncSessionLocal, engine
 from app.api.v1.route_appointment import router as route_appointment
 from app.api.v1.route_availability import router as route_availability
 from app.api.v1.route_user import router as route_user
 from app.api.v1.route_auth import router as route_auth
 from app.api.v1.route_provider_service import router as route_provider_service
 from app.api.v1.route_service import router as route_service
+from app.api.v1.route_provider import router as route_provider
+from app.api.v1.route_metrics import router as route_metrics
+from app.api.v1.route_analytics import router as route_analytics
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    listener = setup_logging()
+    # refresh توکن در هر دو حالت AUTH_MODE به جدول نسخه‌ها تکیه می‌کنه
+    tasks = [
+        asyncio.create_task(token_versions.run(AsyncSessionLocal)),
+        asyncio.create_task(refresh_tokens.run()),
+    ]
+    yield
+    for task in tasks:
+        task.cancel()
+    # صبر تا taskها واقعاً تموم بشن؛ بعدش flush آخر و بعد listener لاگ
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await refresh_tokens.flush()
+    listener.stop()
+
 
 app = FastAPI(
+    lifespan=lifespan,
     title="Appointment Booking System",
     description="this is a course management with minimal usage of authentication and post managing",
     contact={"name": "Kamran Rezaei"},
     )
 
+# آخرین middleware بیرونی‌ترینه: access log داخل instrumentation اجرا می‌شه تا آمار DB رو ببینه
+app.add_middleware(AccessLogMiddleware)
+if settings.METRICS_ENABLED:
+    install_query_hooks(engine)
+    app.add_middleware(InstrumentationMiddleware)
+
 
 
 @app.get("/")
@@ -23,4 +59,7 @@ app.include_router(route_user)
 app.include_router(route_service)
 app.include_router(route_provider_service)
 app.include_router(route_availability)
-app.include_router(route_appointment)
\ No newline at end of file
+app.include_router(route_appointment)
+app.include_router(route_provider)
+app.include_router(route_metrics)
+app.include_router(route_analytics)
\ No newline at end of file
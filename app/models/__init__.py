@@ -3,3 +3,5 @@ from .appointment import Appointment
 from .availability import Availability
 from .service import Service
 from .provider_service import ProviderService
+from .appointment_rollup import AppointmentDailyRollup
+from .refresh_token import RefreshToken
@@ -1,14 +1,45 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import ForeignKey, String, DateTime
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import DDL, ForeignKey, Index, Integer, String, DateTime, event, literal_column, text
+from sqlalchemy.dialects.postgresql import UUID, ExcludeConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 
 from app.db.base import Base
 
+# وضعیت‌هایی که بازه زمانی provider رو اشغال می‌کنن
+ACTIVE_STATUSES = ("pending", "confirmed")
+OVERLAP_CONSTRAINT = "appointments_no_overlap"
+
+
 class Appointment(Base):
     __tablename__ = "appointments"
+    __mapper_args__ = {"eager_defaults": True}
+    __table_args__ = (
+        # Postgres: overlap رو خود دیتابیس رد می‌کنه (نیاز به btree_gist)
+        ExcludeConstraint(
+            ("provider_id", "="),
+            (func.tsrange(literal_column("start_time"), literal_column("end_time")), "&&"),
+            name=OVERLAP_CONSTRAINT,
+            using="gist",
+            where="status IN ('pending', 'confirmed')",
+        ).ddl_if(dialect="postgresql"),
+        Index("ix_appointments_patient_id_start_time", "patient_id", "start_time"),
+        Index("ix_appointments_provider_id_start_time", "provider_id", "start_time"),
+        # گزارش‌های analytics روی بازه‌ی زمانی همه‌ی providerها
+        Index("ix_appointments_start_time", "start_time"),
+        # keyset pagination روی (created_at, id)
+        Index("ix_appointments_created_at_id", "created_at", "id"),
+        Index("ix_appointments_patient_id_created_at_id", "patient_id", "created_at", "id"),
+        Index("ix_appointments_provider_id_created_at_id", "provider_id", "created_at", "id"),
+        # بررسی overlap فقط روی نوبت‌های فعال
+        Index(
+            "ix_appointments_provider_id_active",
+            "provider_id", "start_time", "end_time",
+            postgresql_where=text("status IN ('pending', 'confirmed')"),
+            sqlite_where=text("status IN ('pending', 'confirmed')"),
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
@@ -36,6 +67,8 @@ class Appointment(Base):
     status: Mapped[str] = mapped_column(
         String(20), default="pending"
     )
+    # قیمت provider-service موقع رزرو؛ rollupها با همین حساب می‌شن
+    price: Mapped[int | None] = mapped_column(Integer)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
     patient: Mapped["User"] = relationship(
@@ -50,4 +83,39 @@ class Appointment(Base):
 
     service: Mapped["Service"] = relationship(
         back_populates="appointments",
-    )
\ No newline at end of file
+    )
+
+
+event.listen(
+    Appointment.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS btree_gist").execute_if(dialect="postgresql"),
+)
+
+# SQLite (تست‌ها) ExcludeConstraint نداره، همون قانون با trigger پیاده می‌شه
+_SQLITE_OVERLAP_CHECK = f"""
+WHEN NEW.status IN ('pending', 'confirmed') AND EXISTS (
+    SELECT 1 FROM appointments
+    WHERE provider_id = NEW.provider_id
+      AND id != NEW.id
+      AND status IN ('pending', 'confirmed')
+      AND start_time < NEW.end_time
+      AND end_time > NEW.start_time
+)
+BEGIN
+    SELECT RAISE(ABORT, '{OVERLAP_CONSTRAINT}');
+END
+"""
+
+for _name, _when in (
+    ("insert", "BEFORE INSERT"),
+    ("update", "BEFORE UPDATE OF provider_id, start_time, end_time, status"),
+):
+    event.listen(
+        Appointment.__table__,
+        "after_create",
+        DDL(
+            f"CREATE TRIGGER {OVERLAP_CONSTRAINT}_{_name} {_when} ON appointments"
+            + _SQLITE_OVERLAP_CHECK
+        ).execute_if(dialect="sqlite"),
+    )
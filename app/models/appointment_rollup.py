@@ -0,0 +1,47 @@
+import uuid
+from datetime import date, datetime
+from sqlalchemy import Date, DateTime, ForeignKey, Index, Integer
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from app.db.base import Base
+
+ROLLUP_STATUSES = ("pending", "confirmed", "completed", "cancelled")
+ROLLUP_COUNTERS = ROLLUP_STATUSES + ("booked_minutes", "revenue")
+
+
+class AppointmentDailyRollup(Base):
+    """
+    Pre-aggregated appointments per provider, service and day (UTC).
+    booked_minutes and revenue only count appointments that are not cancelled.
+    """
+    __tablename__ = "appointment_daily_rollups"
+    __table_args__ = (
+        Index("ix_appointment_daily_rollups_day", "day"),
+    )
+
+    provider_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    service_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("services.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+
+    pending: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    confirmed: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    completed: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    cancelled: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    booked_minutes: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    revenue: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
@@ -1,7 +1,7 @@
 import uuid
-from datetime import time,datetime
+from datetime import datetime
 
-from sqlalchemy import DateTime, Boolean, ForeignKey, func
+from sqlalchemy import DateTime, Boolean, ForeignKey, Index, func, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID
 
@@ -10,6 +10,16 @@ from app.db.base import Base
 
 class Availability(Base):
     __tablename__ = "availabilities"
+    __mapper_args__ = {"eager_defaults": True}
+    __table_args__ = (
+        Index(
+            "ix_availabilities_provider_id_available",
+            "provider_id", "start_time", "end_time",
+            postgresql_where=text("is_available"),
+            sqlite_where=text("is_available = 1"),
+        ),
+        Index("ix_availabilities_provider_id_created_at_id", "provider_id", "created_at", "id"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
@@ -24,12 +34,12 @@ class Availability(Base):
         index=True
     )
 
-    start_time: Mapped[time] = mapped_column(
+    start_time: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         nullable=False
     )
 
-    end_time: Mapped[time] = mapped_column(
+    end_time: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         nullable=False
     )
@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import ForeignKey, DateTime, Boolean, Integer
+from sqlalchemy import ForeignKey, DateTime, Boolean, Index, Integer, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
@@ -9,6 +9,13 @@ from app.db.base import Base
 
 class ProviderService(Base):
     __tablename__ = "provider_services"
+    __mapper_args__ = {"eager_defaults": True}
+    __table_args__ = (
+        UniqueConstraint("provider_id", "service_id", name="uq_provider_services_provider_id_service_id"),
+        # keyset pagination روی (created_at, id)
+        Index("ix_provider_services_created_at_id", "created_at", "id"),
+        Index("ix_provider_services_provider_id_created_at_id", "provider_id", "created_at", "id"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
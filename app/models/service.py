@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Boolean, String, DateTime
+from sqlalchemy import Boolean, Index, String, DateTime
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
@@ -9,6 +9,11 @@ from app.db.base import Base
 
 class Service(Base):
     __tablename__ = "services"
+    __mapper_args__ = {"eager_defaults": True}
+    __table_args__ = (
+        # keyset pagination روی (created_at, id)
+        Index("ix_services_created_at_id", "created_at", "id"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
@@ -2,7 +2,7 @@ import uuid
 from typing import List
 from datetime import datetime
 
-from sqlalchemy import String, Boolean, DateTime
+from sqlalchemy import String, Boolean, DateTime, Index, Integer
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
@@ -11,6 +11,13 @@ from app.db.base import Base
 
 class User(Base):
     __tablename__ = "users"
+    # created_at و بقیه‌ی server defaultها با RETURNING همون INSERT برمی‌گردن، بدون refresh
+    __mapper_args__ = {"eager_defaults": True}
+    __table_args__ = (
+        Index("ix_users_created_at_id", "created_at", "id"),
+        # جدول نسخه‌ها توی حالت stateless فقط باطل‌شدن‌های اخیر رو از همین می‌خونه
+        Index("ix_users_token_version_changed_at", "token_version_changed_at"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
@@ -23,6 +30,8 @@ class User(Base):
     role: Mapped[str] = mapped_column(String, nullable=False)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
     is_superuser: Mapped[bool] = mapped_column(Boolean, default=False)
+    token_version: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    token_version_changed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
     patient_appointments: Mapped[List["Appointment"]] = relationship(
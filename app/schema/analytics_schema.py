@@ -0,0 +1,51 @@
+import uuid
+from datetime import date
+from pydantic import BaseModel, Field
+
+
+class ProviderUtilizationSchema(BaseModel):
+    provider_id: uuid.UUID
+    full_name: str | None
+    available_minutes: float
+    booked_minutes: float
+    utilization: float | None = Field(None, description="booked / available minutes, null without availability")
+
+class ServiceRevenueSchema(BaseModel):
+    service_id: uuid.UUID
+    name: str
+    appointments: int = Field(..., description="appointments that were not cancelled")
+    completed: int
+    booked_revenue: int
+    completed_revenue: int
+
+class ProviderCancellationSchema(BaseModel):
+    provider_id: uuid.UUID
+    full_name: str | None
+    total: int
+    cancelled: int
+    no_show: int = Field(..., description="still confirmed after the end time")
+    cancellation_rate: float
+    no_show_rate: float
+
+class DailyVolumeSchema(BaseModel):
+    day: date
+    appointments: int
+    cancelled: int
+    running_total: int
+    moving_average_7d: float = Field(
+        ..., description="appointments per calendar day over this and the previous 6 days, days without any count as 0"
+    )
+
+class DailyRollupSchema(BaseModel):
+    provider_id: uuid.UUID
+    service_id: uuid.UUID
+    day: date
+    pending: int
+    confirmed: int
+    completed: int
+    cancelled: int
+    booked_minutes: int
+    revenue: int
+
+    class Config:
+        from_attributes = True
@@ -1,7 +1,10 @@
 import uuid
-from pydantic import BaseModel, Field
+from typing import List, Optional
+from pydantic import BaseModel, Field, model_validator
 from enum import Enum
 from datetime import datetime
+from app.schema.service_schema import ServiceResponseSchema
+from app.schema.user_schema import UserSummarySchema
 
 
 class AppointmentStatus(str, Enum):
@@ -10,6 +13,10 @@ class AppointmentStatus(str, Enum):
     completed = "completed"
     cancelled = "cancelled"
 
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
 class AppointmentBaseSchema(BaseModel):
     service_id: uuid.UUID
     provider_id: uuid.UUID
@@ -19,9 +26,35 @@ class AppointmentBaseSchema(BaseModel):
 class AppointmentCreateSchema(AppointmentBaseSchema):
     pass
 
+class AppointmentBatchCreateSchema(BaseModel):
+    items: List[AppointmentCreateSchema] = Field(
+        ..., min_length=1, max_length=100, description="appointments booked all-or-nothing"
+    )
+
 class AppointmentUpdateSchema(BaseModel):
     status: AppointmentStatus = Field(default=AppointmentStatus.pending)
 
+class AppointmentBulkStatusSchema(BaseModel):
+    status: AppointmentStatus
+    ids: Optional[List[uuid.UUID]] = Field(None, min_length=1, max_length=1000)
+    provider_id: Optional[uuid.UUID] = None
+    date_from: Optional[datetime] = None
+    date_to: Optional[datetime] = None
+    current_status: Optional[AppointmentStatus] = None
+    dry_run: bool = False
+
+    @model_validator(mode="after")
+    def check_selector(self):
+        # بدون فیلتر یعنی همه‌ی نوبت‌ها؛ اجازه نمی‌دیم
+        if not any((self.ids, self.provider_id, self.date_from, self.date_to, self.current_status)):
+            raise ValueError("At least one of ids, provider_id, date_from, date_to or current_status is required")
+        return self
+
+class AppointmentBulkStatusResponseSchema(BaseModel):
+    dry_run: bool
+    matched: int
+    ids: List[uuid.UUID] = []
+
 class AppointmentResponseSchema(AppointmentBaseSchema):
     id : uuid.UUID
     patient_id: uuid.UUID
@@ -30,3 +63,9 @@ class AppointmentResponseSchema(AppointmentBaseSchema):
 
     class Config:
         from_attributes = True
+
+class AppointmentExpandedResponseSchema(AppointmentResponseSchema):
+    # فقط وقتی با expand خواسته بشن پر می‌شن؛ email و role طرف مقابل نه
+    patient: Optional[UserSummarySchema] = None
+    provider: Optional[UserSummarySchema] = None
+    service: Optional[ServiceResponseSchema] = None
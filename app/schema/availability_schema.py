@@ -1,12 +1,13 @@
 import uuid
-from pydantic import BaseModel, Field, field_validator, EmailStr
-from datetime import datetime,time
+from typing import Annotated, Iterator, List
+from pydantic import BaseModel, Field, field_validator, model_validator, EmailStr
+from datetime import date, datetime, time, timedelta
 
 
 class AvaiabilityBaseSchema(BaseModel): 
     provider_id: uuid.UUID 
-    end_time: time = Field(default=0)
-    start_time: time = Field(default=0)
+    end_time: datetime
+    start_time: datetime
     is_available: bool = Field(default=True, description="status of the provider availability")
 
 class AvailabilityCreateSchema(AvaiabilityBaseSchema):
@@ -19,4 +20,53 @@ class AvailabilityResponseSchema(AvaiabilityBaseSchema):
     id : uuid.UUID
     created_at: datetime
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class AvailabilityWindowSchema(BaseModel):
+    start_time: datetime
+    end_time: datetime
+
+class WeeklyRecurrenceSchema(BaseModel):
+    weekdays: List[Annotated[int, Field(ge=0, le=6)]] = Field(
+        ..., min_length=1, description="days of week, 0=Monday ... 6=Sunday"
+    )
+    start_time: time = Field(..., description="daily start of the window")
+    end_time: time = Field(..., description="daily end of the window")
+    start_date: date
+    end_date: date = Field(..., description="last day included")
+    exceptions: List[date] = Field(default_factory=list, description="days to skip")
+
+    @model_validator(mode="after")
+    def check_ranges(self):
+        if self.start_time >= self.end_time:
+            raise ValueError("start_time must be before end_time")
+        if self.start_date > self.end_date:
+            raise ValueError("start_date must not be after end_date")
+        return self
+
+    def expand(self) -> Iterator[tuple[datetime, datetime]]:
+        weekdays = set(self.weekdays)
+        exceptions = set(self.exceptions)
+        # offset به جای day += 1، تا end_date == date.max سرریز نکنه
+        for offset in range((self.end_date - self.start_date).days + 1):
+            day = self.start_date + timedelta(days=offset)
+            if day.weekday() in weekdays and day not in exceptions:
+                yield datetime.combine(day, self.start_time), datetime.combine(day, self.end_time)
+
+class AvailabilityBulkCreateSchema(BaseModel):
+    provider_id: uuid.UUID
+    windows: List[AvailabilityWindowSchema] = Field(default_factory=list)
+    recurrence: WeeklyRecurrenceSchema | None = None
+
+    @model_validator(mode="after")
+    def check_source(self):
+        if bool(self.windows) == bool(self.recurrence):
+            raise ValueError("provide either windows or recurrence")
+        return self
+
+    def expand(self) -> Iterator[tuple[datetime, datetime]]:
+        if self.recurrence:
+            yield from self.recurrence.expand()
+        for window in self.windows:
+            yield window.start_time, window.end_time
@@ -0,0 +1,9 @@
+from typing import Generic, List, TypeVar
+from pydantic import BaseModel, Field
+
+T = TypeVar("T")
+
+
+class PageSchema(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: str | None = Field(None, description="pass as cursor to fetch the next page")
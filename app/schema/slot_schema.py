@@ -0,0 +1,22 @@
+import uuid
+from typing import List
+from pydantic import BaseModel, Field
+from datetime import datetime
+
+
+class SlotSchema(BaseModel):
+    start_time: datetime
+    end_time: datetime
+
+class ProviderSlotsResponseSchema(BaseModel):
+    provider_id: uuid.UUID
+    service_id: uuid.UUID
+    duration_minutes: int = Field(..., description="length of each slot")
+    slots: List[SlotSchema]
+
+class ProviderSearchResultSchema(BaseModel):
+    provider_id: uuid.UUID
+    full_name: str | None
+    price: int
+    duration_minutes: int
+    earliest_slot: SlotSchema
@@ -54,8 +54,18 @@ class UserBaseSchema(BaseModel):
 class UserUpdateSchema(UserBaseSchema):
     pass
 
-class UserResponseSchema(UserBaseSchema):
+class UserSummarySchema(BaseModel):
+    """Public part of a user, embedded in other users' responses."""
     id: uuid.UUID
+    full_name: str | None
+
+    class Config:
+        from_attributes = True
+
+class UserResponseSchema(BaseModel):
+    id: uuid.UUID
+    full_name: str | None
+    email: EmailStr
     role: UserRole
     created_at: datetime
 
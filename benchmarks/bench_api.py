@@ -0,0 +1,198 @@
+"""
+End-to-end latency and throughput of the booking API on a seeded dataset.
+
+Seeds users, services, provider-services, availabilities and appointments
+(benchmarks.seed with Faker names), then drives the app in-process over
+ASGI and writes p50/p95/p99 per scenario as JSON, so runs on different
+commits can be diffed.
+
+    python -m benchmarks.bench_api --appointments 1000000 --output bench_api.json
+    python -m benchmarks.bench_api --database-url postgresql+asyncpg://localhost/bench
+    python -m benchmarks.bench_api --skip-seed   # reuse the dataset of the previous run
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+PASSWORD = "benchmark-password"
+SCENARIOS = ("login", "create_appointment_contended", "list_appointments", "list_availability")
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run_scenario(client, make_request, requests, concurrency):
+    """Send `requests` requests with at most `concurrency` in flight."""
+    semaphore = asyncio.Semaphore(concurrency)
+    samples, statuses = [], Counter()
+
+    async def one(i):
+        async with semaphore:
+            started = time.perf_counter()
+            response = await make_request(i)
+            samples.append((time.perf_counter() - started) * 1000)
+            statuses[response.status_code] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return samples, time.perf_counter() - started, statuses
+
+
+async def main(args):
+    # app باید بعد از تنظیم DATABASE_URL import بشه
+    import httpx
+    from faker import Faker
+
+    from app.core.security import generate_access_token, hash_password
+    from app.db.base import Base
+    from app.db.session import engine
+    from app.main import app
+    from app.models import ProviderService, User
+    from benchmarks.seed import BASE_TIME, seed
+    from benchmarks.stats import summarize
+    from sqlalchemy import select
+
+    rng = random.Random(args.seed)
+    if args.skip_seed:
+        async with engine.connect() as conn:
+            rows = (await conn.execute(select(User.id, User.email, User.role))).all()
+        data = {
+            "provider_ids": [row.id for row in rows if row.role == "provider"],
+            "patient_ids": [row.id for row in rows if row.role == "client"],
+        }
+        emails = [row.email for row in rows if row.role == "client"]
+    else:
+        fake = Faker()
+        fake.seed_instance(args.seed)
+        started = time.perf_counter()
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+            data = await seed(
+                conn,
+                appointments=args.appointments,
+                providers=args.providers,
+                patients=args.patients,
+                services=args.services,
+                days=args.days,
+                password_hash=hash_password(PASSWORD),
+                rng=rng,
+                fake=fake,
+            )
+        print(f"seeded in {time.perf_counter() - started:.1f}s")
+        emails = [f"client{i}@example.com" for i in range(len(data["patient_ids"]))]
+
+    def auth(user_id):
+        return {"Authorization": f"Bearer {generate_access_token(user_id, expires_in=3600)}"}
+
+    patient_headers = [auth(user_id) for user_id in rng.sample(data["patient_ids"], min(200, len(data["patient_ids"])))]
+    hot_providers = data["provider_ids"][: args.hot_providers]
+    async with engine.connect() as conn:
+        rows = (await conn.execute(
+            select(ProviderService.provider_id, ProviderService.service_id)
+            .where(ProviderService.provider_id.in_(hot_providers))
+        )).all()
+    service_by_provider = {provider_id: service_id for provider_id, service_id in rows}
+    # روز آخر؛ appointmentهای seed شده از اول بازه پشت سر هم چیده می‌شن
+    last_day = BASE_TIME + timedelta(days=args.days - 1)
+    window_from = BASE_TIME.isoformat()
+    window_to = (BASE_TIME + timedelta(days=7)).isoformat()
+
+    async def login(i):
+        return await client.post("/auth/login", json={"email": rng.choice(emails), "password": PASSWORD})
+
+    async def create_contended(i):
+        # چند provider و چند ساعت ثابت؛ بیشتر درخواست‌ها باید 409 بگیرن
+        provider_id = rng.choice(hot_providers)
+        start = last_day + timedelta(hours=rng.randrange(10))
+        return await client.post("/appointments/", json={
+            "provider_id": str(provider_id),
+            "service_id": str(service_by_provider[provider_id]),
+            "start_time": start.isoformat(),
+            "end_time": (start + timedelta(hours=1)).isoformat(),
+        }, headers=rng.choice(patient_headers))
+
+    async def list_appointments(i):
+        return await client.get("/appointments/", params={"limit": 50}, headers=rng.choice(patient_headers))
+
+    async def list_availability(i):
+        return await client.get("/availability/list-availability", params={
+            "provider_id": str(rng.choice(data["provider_ids"])),
+            "date_from": window_from,
+            "date_to": window_to,
+        }, headers=rng.choice(patient_headers))
+
+    scenarios = {
+        "login": (login, args.login_requests),
+        "create_appointment_contended": (create_contended, args.requests),
+        "list_appointments": (list_appointments, args.requests),
+        "list_availability": (list_availability, args.requests),
+    }
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        for name in args.scenarios:
+            make_request, requests = scenarios[name]
+            samples, elapsed, statuses = await run_scenario(client, make_request, requests, args.concurrency)
+            results[name] = {
+                **summarize(samples, elapsed),
+                "concurrency": args.concurrency,
+                "statuses": {str(code): count for code, count in sorted(statuses.items())},
+            }
+            print(f"{name:30} p50={results[name]['p50_ms']:>9}ms p99={results[name]['p99_ms']:>9}ms "
+                  f"{results[name]['throughput_rps']:>8} req/s {results[name]['statuses']}")
+    await engine.dispose()
+
+    report = {
+        "commit": git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "database": engine.url.get_backend_name(),
+        "dataset": {
+            "appointments": args.appointments,
+            "providers": args.providers,
+            "patients": args.patients,
+            "services": args.services,
+            "days": args.days,
+            "seeded": not args.skip_seed,
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2)
+    print(f"wrote {args.output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL", "sqlite+aiosqlite:///./bench_api.db"))
+    parser.add_argument("--appointments", type=int, default=100_000)
+    parser.add_argument("--providers", type=int, default=1_000)
+    parser.add_argument("--patients", type=int, default=5_000)
+    parser.add_argument("--services", type=int, default=20)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--requests", type=int, default=1_000, help="requests per scenario")
+    parser.add_argument("--login-requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--hot-providers", type=int, default=5, help="providers targeted by the contended bookings")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--skip-seed", action="store_true")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="bench_api.json")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-with-enough-bytes")
+    os.environ.setdefault("LOGIN_RATE_LIMIT_ENABLED", "false")
+    asyncio.run(main(args))
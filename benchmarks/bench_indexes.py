@@ -0,0 +1,149 @@
+"""
+Query plans and latency of the booking hot queries before and after the
+indexes added in revision 8d3f0a6b1c52.
+
+    python -m benchmarks.bench_indexes --appointments 1000000
+    python -m benchmarks.bench_indexes --database-url postgresql+asyncpg://...
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from sqlalchemy import DDL, select, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db.base import Base
+from app.models import Appointment, Availability, ProviderService
+from app.models.appointment import OVERLAP_CONSTRAINT
+from benchmarks.seed import BASE_TIME, seed
+
+HOT_INDEX_NAMES = {
+    "ix_appointments_patient_id_start_time",
+    "ix_appointments_provider_id_start_time",
+    "ix_appointments_provider_id_active",
+    "ix_availabilities_provider_id_available",
+}
+HOT_INDEXES = [
+    index
+    for table in (Appointment.__table__, Availability.__table__)
+    for index in table.indexes
+    if index.name in HOT_INDEX_NAMES
+]
+
+
+def hot_queries(data, rng):
+    provider_id = rng.choice(data["provider_ids"])
+    start = BASE_TIME + timedelta(days=rng.randrange(100), hours=rng.randrange(9))
+    end = start + timedelta(hours=1)
+    return {
+        "list_by_patient": select(Appointment).where(
+            Appointment.patient_id == rng.choice(data["patient_ids"])
+        ),
+        "list_by_provider": select(Appointment).where(Appointment.provider_id == provider_id),
+        # همون شرطی که constraint/trigger برای overlap چک می‌کنه
+        "overlap_check": select(Appointment.id).where(
+            Appointment.provider_id == provider_id,
+            text("status IN ('pending', 'confirmed')"),
+            Appointment.start_time < end,
+            Appointment.end_time > start,
+        ),
+        "availability_check": select(Availability.id).where(
+            Availability.provider_id == provider_id,
+            Availability.is_available == True,
+            Availability.start_time <= start,
+            Availability.end_time >= end,
+        ),
+        "provider_service_check": select(ProviderService.id).where(
+            ProviderService.provider_id == provider_id,
+            ProviderService.service_id == rng.choice(data["offered"][provider_id]),
+            ProviderService.is_active == True,
+        ),
+    }
+
+
+async def explain(conn, stmt):
+    sql = str(stmt.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+    if conn.dialect.name == "postgresql":
+        result = await conn.exec_driver_sql(f"EXPLAIN (ANALYZE, BUFFERS) {sql}")
+        return [row[0] for row in result]
+    result = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")
+    return [row[-1] for row in result]
+
+
+async def measure(conn, data, repeat):
+    rng = random.Random(7)
+    plans = {name: await explain(conn, stmt) for name, stmt in hot_queries(data, rng).items()}
+    timings = {name: [] for name in plans}
+    for _ in range(repeat):
+        for name, stmt in hot_queries(data, rng).items():
+            started = time.perf_counter()
+            (await conn.execute(stmt)).fetchall()
+            timings[name].append((time.perf_counter() - started) * 1000)
+    return {
+        name: {
+            "plan": plans[name],
+            "p50_ms": statistics.median(samples),
+            "max_ms": max(samples),
+        }
+        for name, samples in timings.items()
+    }
+
+
+def report(label, results):
+    print(f"\n=== {label}")
+    for name, result in results.items():
+        print(f"{name:24} p50={result['p50_ms']:9.3f}ms  max={result['max_ms']:9.3f}ms")
+        for line in result["plan"]:
+            print(f"    {line}")
+
+
+async def main(args):
+    engine = create_async_engine(args.database_url)
+    is_sqlite = engine.dialect.name == "sqlite"
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        for index in HOT_INDEXES:
+            await conn.execute(DDL(f"DROP INDEX {index.name}"))
+        if is_sqlite:
+            # trigger بدون index برای seed کردن یک میلیون ردیف خیلی کنده
+            for suffix in ("insert", "update"):
+                await conn.execute(DDL(f"DROP TRIGGER {OVERLAP_CONSTRAINT}_{suffix}"))
+
+    print(f"seeding {args.appointments} appointments for {args.providers} providers ...")
+    started = time.perf_counter()
+    async with engine.begin() as conn:
+        data = await seed(conn, appointments=args.appointments, providers=args.providers)
+    print(f"seeded in {time.perf_counter() - started:.1f}s")
+
+    async with engine.connect() as conn:
+        await conn.exec_driver_sql("ANALYZE")
+        before = await measure(conn, data, args.repeat)
+    report("before", before)
+
+    async with engine.begin() as conn:
+        for index in HOT_INDEXES:
+            await conn.run_sync(index.create)
+        await conn.exec_driver_sql("ANALYZE")
+    async with engine.connect() as conn:
+        after = await measure(conn, data, args.repeat)
+    report("after", after)
+
+    print("\n=== speedup (p50)")
+    for name in before:
+        print(f"{name:24} x{before[name]['p50_ms'] / after[name]['p50_ms']:.1f}")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite+aiosqlite:///./bench.db")
+    parser.add_argument("--appointments", type=int, default=1_000_000)
+    parser.add_argument("--providers", type=int, default=1_000)
+    parser.add_argument("--repeat", type=int, default=50)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,103 @@
+"""
+Refreshes per second of one worker (one event loop, in-process over ASGI).
+
+Each of `--clients` clients logs in once and then keeps rotating its own
+refresh token, so every request is a valid, single-use refresh. The rows of
+the rotations are written behind by the store's flush loop, as in the app
+lifespan; the report includes how many flushes that took.
+
+    python -m benchmarks.bench_refresh --clients 50 --refreshes 200
+    python -m benchmarks.bench_refresh --database-url postgresql+asyncpg://localhost/bench
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+PASSWORD = "benchmark-password"
+
+
+async def main(args):
+    # app باید بعد از تنظیم DATABASE_URL import بشه
+    import httpx
+
+    from app.core.refresh_tokens import refresh_tokens
+    from app.core.security import hash_password
+    from app.core.tokens import token_versions
+    from app.db.base import Base
+    from app.db.session import AsyncSessionLocal, engine
+    from app.main import app
+    from app.models import User
+    from benchmarks.stats import summarize
+    from sqlalchemy import insert
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        password_hash = hash_password(PASSWORD)
+        emails = [f"refresh{i}@example.com" for i in range(args.clients)]
+        await conn.execute(insert(User), [
+            {"email": email, "password_hash": password_hash, "full_name": email, "role": "client"}
+            for email in emails
+        ])
+
+    samples, statuses = [], {}
+
+    async def chain(client, token):
+        for _ in range(args.refreshes):
+            started = time.perf_counter()
+            response = await client.post("/auth/refresh-token", json={"token": token})
+            samples.append((time.perf_counter() - started) * 1000)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+            if response.status_code != 200:
+                return
+            token = response.json()["refresh_token"]
+            # روی ASGITransport بدون I/O واقعی هیچ await ای event loop رو آزاد نمی‌کنه
+            await asyncio.sleep(0)
+
+    # ASGITransport lifespan رو اجرا نمی‌کنه؛ همون کارهای startup اینجا
+    async with AsyncSessionLocal() as db:
+        await token_versions.reload(db)
+    await refresh_tokens.ensure_loaded()
+    writer = asyncio.create_task(refresh_tokens.run())
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        tokens = []
+        for email in emails:
+            response = await client.post("/auth/login", json={"email": email, "password": PASSWORD})
+            tokens.append(response.json()["refresh_token"])
+        flushes = refresh_tokens.flushes
+
+        started = time.perf_counter()
+        await asyncio.gather(*(chain(client, token) for token in tokens))
+        elapsed = time.perf_counter() - started
+    writer.cancel()
+    await refresh_tokens.flush()
+    await engine.dispose()
+
+    report = {
+        **summarize(samples, elapsed),
+        "clients": args.clients,
+        "statuses": {str(code): count for code, count in sorted(statuses.items())},
+        "flushes": refresh_tokens.flushes - flushes,
+        "revocation_lookups": refresh_tokens.lookups,
+    }
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL", "sqlite+aiosqlite:///./bench_refresh.db"))
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--refreshes", type=int, default=200, help="refreshes per client")
+    parser.add_argument("--output", help="also write the report to this JSON file")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-with-enough-bytes")
+    os.environ.setdefault("LOGIN_RATE_LIMIT_ENABLED", "false")
+    asyncio.run(main(args))
@@ -0,0 +1,113 @@
+"""
+Latency of an unrelated endpoint (GET /) while logins flood the server.
+
+With argon2 on the event loop every login stalls all other requests; with
+the hashing pool the probe latency should stay flat and excess logins get 503.
+
+    python -m benchmarks.login_flood --logins 200 --concurrency 50
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///./bench_login.db")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-with-enough-bytes")
+# همه‌ی loginها از یه IP میان؛ rate limit اینجا فقط 429 می‌ده
+os.environ.setdefault("LOGIN_RATE_LIMIT_ENABLED", "false")
+
+import httpx
+
+from app.core import security
+from app.db.base import Base
+from app.db.session import engine
+from app.main import app
+from benchmarks.stats import percentile
+
+EMAIL = "flood@example.com"
+PASSWORD = "benchmark-password"
+
+
+async def probe(client, samples, stop, interval=0.01):
+    # latency از زمانی که probe باید شروع می‌شد، تا گیر کردن event loop هم دیده بشه
+    intended = time.perf_counter()
+    while not stop.is_set():
+        intended += interval
+        delay = intended - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        await client.get("/")
+        samples.append((time.perf_counter() - intended) * 1000)
+
+
+async def flood(client, logins, concurrency, statuses):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def login():
+        async with semaphore:
+            response = await client.post("/auth/login", json={"email": EMAIL, "password": PASSWORD})
+            statuses.append(response.status_code)
+
+    await asyncio.gather(*(login() for _ in range(logins)))
+
+
+async def run_phase(client, logins, concurrency, duration):
+    samples, statuses, stop = [], [], asyncio.Event()
+    probe_task = asyncio.create_task(probe(client, samples, stop))
+    started = time.perf_counter()
+    if logins:
+        await flood(client, logins, concurrency, statuses)
+    else:
+        await asyncio.sleep(duration)
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe_task
+    return {
+        "probe_requests": len(samples),
+        "probe_p50_ms": round(statistics.median(samples), 3),
+        "probe_p99_ms": round(percentile(samples, 0.99), 3),
+        "probe_max_ms": round(max(samples), 3),
+        "logins_ok": statuses.count(200),
+        "logins_rejected_503": statuses.count(503),
+        "elapsed_s": round(elapsed, 2),
+    }
+
+
+async def run_inline(fn, *args):
+    return fn(*args)
+
+
+async def main(args):
+    if args.inline:
+        # رفتار قبلی: argon2 مستقیم روی event loop
+        security.password_hasher.run = run_inline
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        await client.post("/auth/register", json={
+            "full_name": "Flood Tester",
+            "email": EMAIL,
+            "password": PASSWORD,
+            "password_confirm": PASSWORD,
+        })
+        idle = await run_phase(client, 0, 0, args.idle_seconds)
+        flooded = await run_phase(client, args.logins, args.concurrency, 0)
+
+    print(f"{'':22}{'idle':>12}{'login flood':>14}")
+    for key in idle:
+        print(f"{key:22}{idle[key]:>12}{flooded[key]:>14}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--idle-seconds", type=float, default=2.0)
+    parser.add_argument("--inline", action="store_true", help="hash on the event loop, for comparison")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,123 @@
+import random
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from app.models import Appointment, Availability, ProviderService, Service, User
+
+BASE_TIME = datetime(2030, 1, 1, 8, 0)
+STATUS_WEIGHTS = {"pending": 2, "confirmed": 3, "completed": 4, "cancelled": 1}
+
+
+async def _insert_batches(conn, table, rows, batch_size):
+    for i in range(0, len(rows), batch_size):
+        await conn.execute(insert(table), rows[i:i + batch_size])
+
+
+async def seed(
+    conn,
+    appointments=1_000_000,
+    providers=1_000,
+    patients=5_000,
+    services=20,
+    days=365,
+    password_hash="!",
+    batch_size=5_000,
+    rng=None,
+    fake=None,
+):
+    """
+    Seed a synthetic dataset with core inserts.
+
+    Appointments are one hour long and laid out back to back per provider, so
+    they never violate the overlap constraint. Pass a seeded Faker as `fake`
+    for realistic names and descriptions. Returns the generated ids.
+    """
+    rng = rng or random.Random(42)
+
+    provider_ids = [uuid.uuid4() for _ in range(providers)]
+    patient_ids = [uuid.uuid4() for _ in range(patients)]
+    service_ids = [uuid.uuid4() for _ in range(services)]
+
+    await _insert_batches(conn, User.__table__, [
+        {
+            "id": user_id,
+            "email": f"{role}{i}@example.com",
+            "password_hash": password_hash,
+            "full_name": fake.name() if fake else f"{role} {i}",
+            "role": role,
+            "is_active": True,
+            "is_superuser": False,
+        }
+        for role, ids in (("provider", provider_ids), ("client", patient_ids))
+        for i, user_id in enumerate(ids)
+    ], batch_size)
+
+    await _insert_batches(conn, Service.__table__, [
+        {
+            "id": service_id,
+            "name": f"service {i}",
+            "description": fake.sentence(nb_words=8) if fake else None,
+            "is_active": True,
+        }
+        for i, service_id in enumerate(service_ids)
+    ], batch_size)
+
+    offered = {
+        provider_id: rng.sample(service_ids, min(3, len(service_ids)))
+        for provider_id in provider_ids
+    }
+    await _insert_batches(conn, ProviderService.__table__, [
+        {
+            "id": uuid.uuid4(),
+            "provider_id": provider_id,
+            "service_id": service_id,
+            "price": rng.randrange(50, 500),
+            "duration_minutes": 60,
+            "is_active": True,
+        }
+        for provider_id, service_list in offered.items()
+        for service_id in service_list
+    ], batch_size)
+
+    await _insert_batches(conn, Availability.__table__, [
+        {
+            "id": uuid.uuid4(),
+            "provider_id": provider_id,
+            "start_time": BASE_TIME + timedelta(days=day),
+            "end_time": BASE_TIME + timedelta(days=day, hours=10),
+            "is_available": True,
+        }
+        for provider_id in provider_ids
+        for day in range(days)
+    ], batch_size)
+
+    statuses = list(STATUS_WEIGHTS)
+    weights = list(STATUS_WEIGHTS.values())
+    rows = []
+    for i in range(appointments):
+        provider_id = provider_ids[i % providers]
+        slot = i // providers
+        start = BASE_TIME + timedelta(days=slot // 10, hours=slot % 10)
+        rows.append({
+            "id": uuid.uuid4(),
+            "patient_id": rng.choice(patient_ids),
+            "provider_id": provider_id,
+            "service_id": rng.choice(offered[provider_id]),
+            "start_time": start,
+            "end_time": start + timedelta(hours=1),
+            "status": rng.choices(statuses, weights)[0],
+        })
+        if len(rows) == batch_size:
+            await conn.execute(insert(Appointment.__table__), rows)
+            rows = []
+    if rows:
+        await conn.execute(insert(Appointment.__table__), rows)
+
+    return {
+        "provider_ids": provider_ids,
+        "patient_ids": patient_ids,
+        "service_ids": service_ids,
+        "offered": offered,
+    }
@@ -0,0 +1,18 @@
+import statistics
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def summarize(samples_ms, elapsed_s):
+    """Latency percentiles (ms) and throughput for one scenario."""
+    return {
+        "requests": len(samples_ms),
+        "throughput_rps": round(len(samples_ms) / elapsed_s, 2) if elapsed_s else None,
+        "p50_ms": round(statistics.median(samples_ms), 3),
+        "p95_ms": round(percentile(samples_ms, 0.95), 3),
+        "p99_ms": round(percentile(samples_ms, 0.99), 3),
+        "max_ms": round(max(samples_ms), 3),
+    }
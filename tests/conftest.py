@@ -4,6 +4,10 @@ from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 
 from app.main import app
+from app.core.instrumentation import install_query_hooks
+from app.core import rate_limit
+from app.core.refresh_tokens import refresh_tokens
+from app.db.slow_query import install_slow_query_log
 from app.db.base import Base
 from app.db.session import get_db
 
@@ -15,6 +19,9 @@ engine_test = create_async_engine(
     future=True,
 )
 
+install_query_hooks(engine_test)
+install_slow_query_log(engine_test)
+
 TestingSessionLocal = sessionmaker(
     bind=engine_test,
     class_=AsyncSession,
@@ -27,6 +34,8 @@ async def override_get_db():
         yield session
 
 app.dependency_overrides[get_db] = override_get_db
+# refresh توکن‌ها session خودشون رو باز می‌کنن، نه از get_db
+refresh_tokens.session_factory = TestingSessionLocal
 
 
 @pytest.fixture(scope="session", autouse=True)
@@ -39,6 +48,12 @@ async def create_test_database():
         await conn.run_sync(Base.metadata.drop_all)
 
 
+@pytest.fixture(autouse=True)
+def reset_rate_limits():
+    # همه‌ی تست‌ها از یه IP login می‌کنن
+    rate_limit.rate_limit_backend.clear()
+
+
 @pytest.fixture
 def client():
     return TestClient(app)
@@ -0,0 +1,103 @@
+from tests.utils import create_user_and_login, setup_bookable_provider
+
+WINDOW = {"from": "2020-01-06T00:00:00", "to": "2020-01-08T00:00:00"}
+
+
+def book(client, headers, provider, start, end):
+    response = client.post("/appointments/", json={
+        "provider_id": provider["provider_id"],
+        "service_id": provider["service_id"],
+        "start_time": start,
+        "end_time": end,
+    }, headers=headers)
+    assert response.status_code == 200
+    return response.json()["id"]
+
+
+def test_analytics_reports(client):
+    provider = setup_bookable_provider(client)
+    for start, end in (("2020-01-06T09:00:00", "2020-01-06T17:00:00"), ("2020-01-07T09:00:00", "2020-01-07T13:00:00")):
+        client.post("/availability/create-availability", json={
+            "provider_id": provider["provider_id"], "start_time": start, "end_time": end,
+        }, headers=provider["provider_headers"])
+    headers, _ = create_user_and_login(client)
+    completed = book(client, headers, provider, "2020-01-06T09:00:00", "2020-01-06T10:00:00")
+    no_show = book(client, headers, provider, "2020-01-06T10:00:00", "2020-01-06T11:00:00")
+    cancelled = book(client, headers, provider, "2020-01-07T09:00:00", "2020-01-07T10:00:00")
+    client.post("/appointments/bulk-status", json={"status": "completed", "ids": [completed]}, headers=provider["provider_headers"])
+    client.post("/appointments/bulk-status", json={"status": "confirmed", "ids": [no_show]}, headers=provider["provider_headers"])
+    client.delete(f"/appointments/{cancelled}", headers=headers)
+    admin = provider["admin_headers"]
+
+    utilization = client.get("/analytics/utilization", params={**WINDOW, "provider_id": provider["provider_id"]}, headers=admin).json()
+    assert utilization == [{
+        "provider_id": provider["provider_id"],
+        "full_name": utilization[0]["full_name"],
+        "available_minutes": 720,
+        "booked_minutes": 120,
+        "utilization": 120 / 720,
+    }]
+
+    revenue = client.get("/analytics/revenue", params=WINDOW, headers=admin).json()
+    row = next(r for r in revenue if r["service_id"] == provider["service_id"])
+    assert (row["appointments"], row["completed"], row["booked_revenue"], row["completed_revenue"]) == (2, 1, 200, 100)
+
+    rates = client.get("/analytics/cancellations", params=WINDOW, headers=admin).json()
+    row = next(r for r in rates if r["provider_id"] == provider["provider_id"])
+    assert (row["total"], row["cancelled"], row["no_show"]) == (3, 1, 1)
+    assert row["cancellation_rate"] == row["no_show_rate"] == 1 / 3
+
+    volume = client.get("/analytics/daily-volume", params=WINDOW, headers=admin).json()
+    assert volume == [
+        {"day": "2020-01-06", "appointments": 2, "cancelled": 0, "running_total": 2, "moving_average_7d": 2.0},
+        {"day": "2020-01-07", "appointments": 1, "cancelled": 1, "running_total": 3, "moving_average_7d": 1.5},
+    ]
+
+    assert client.get("/analytics/revenue", params=WINDOW, headers=headers).status_code == 403
+    assert client.get("/analytics/revenue", params={"from": "2020-01-01", "to": "2022-01-01"}, headers=admin).status_code == 400
+
+
+def test_moving_average_counts_calendar_days(client):
+    provider = setup_bookable_provider(client)
+    client.post("/availability/create-availability", json={
+        "provider_id": provider["provider_id"], "start_time": "2021-03-01T00:00:00", "end_time": "2021-03-11T00:00:00",
+    }, headers=provider["provider_headers"])
+    headers, _ = create_user_and_login(client)
+    for start in ("2021-03-01T09:00:00", "2021-03-01T10:00:00", "2021-03-05T09:00:00", "2021-03-10T09:00:00"):
+        book(client, headers, provider, start, start.replace(":00:00", ":30:00"))
+
+    volume = client.get(
+        "/analytics/daily-volume", params={"from": "2021-03-01T00:00:00", "to": "2021-03-11T00:00:00"},
+        headers=provider["admin_headers"],
+    ).json()
+
+    # روزهای خالی بین نوبت‌ها صفر حساب می‌شن
+    assert [(row["day"], row["moving_average_7d"]) for row in volume] == [
+        ("2021-03-01", 2.0), ("2021-03-05", 3 / 5), ("2021-03-10", 2 / 7),
+    ]
+
+
+def test_revenue_uses_price_at_booking(client):
+    provider = setup_bookable_provider(client)
+    client.post("/availability/create-availability", json={
+        "provider_id": provider["provider_id"], "start_time": "2021-05-03T09:00:00", "end_time": "2021-05-03T12:00:00",
+    }, headers=provider["provider_headers"])
+    headers, _ = create_user_and_login(client)
+    book(client, headers, provider, "2021-05-03T09:00:00", "2021-05-03T10:00:00")
+
+    response = client.put(
+        f"/provider-services/update-provider-service/{provider['provider_service_id']}",
+        json={"provider_id": provider["provider_id"], "service_id": provider["service_id"],
+              "price": 250, "duration_minutes": 30},
+        headers=provider["provider_headers"],
+    )
+    assert response.status_code == 200
+    book(client, headers, provider, "2021-05-03T10:00:00", "2021-05-03T11:00:00")
+
+    revenue = client.get(
+        "/analytics/revenue", params={"from": "2021-05-03T00:00:00", "to": "2021-05-04T00:00:00"},
+        headers=provider["admin_headers"],
+    ).json()
+    row = next(r for r in revenue if r["service_id"] == provider["service_id"])
+    # نوبت اول با قیمت قبلی (۱۰۰) رزرو شده
+    assert (row["appointments"], row["booked_revenue"]) == (2, 100 + 250)
@@ -0,0 +1,246 @@
+import asyncio
+
+import httpx
+
+from app.main import app
+from tests.utils import QueryCounter, create_user_and_login, setup_bookable_provider
+
+
+def booking(provider, start="2030-01-07T10:00:00", end="2030-01-07T11:00:00"):
+    return {
+        "provider_id": provider["provider_id"],
+        "service_id": provider["service_id"],
+        "start_time": start,
+        "end_time": end,
+    }
+
+
+def test_create_appointment(client):
+    provider = setup_bookable_provider(client)
+    headers, client_id = create_user_and_login(client)
+
+    response = client.post("/appointments/", json=booking(provider), headers=headers)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["patient_id"] == client_id
+    assert data["status"] == "pending"
+
+
+def test_create_appointment_overlap_conflict(client):
+    provider = setup_bookable_provider(client)
+    headers, _ = create_user_and_login(client)
+
+    first = client.post("/appointments/", json=booking(provider), headers=headers)
+    assert first.status_code == 200
+
+    overlap = booking(provider, "2030-01-07T10:30:00", "2030-01-07T11:30:00")
+    response = client.post("/appointments/", json=overlap, headers=headers)
+    assert response.status_code == 409
+
+    adjacent = booking(provider, "2030-01-07T11:00:00", "2030-01-07T12:00:00")
+    response = client.post("/appointments/", json=adjacent, headers=headers)
+    assert response.status_code == 200
+
+
+def test_cancelled_appointment_frees_slot(client):
+    provider = setup_bookable_provider(client)
+    headers, _ = create_user_and_login(client)
+
+    first = client.post("/appointments/", json=booking(provider), headers=headers)
+    client.delete(f"/appointments/{first.json()['id']}", headers=headers)
+
+    response = client.post("/appointments/", json=booking(provider), headers=headers)
+    assert response.status_code == 200
+
+    reopen = client.put(
+        f"/appointments/{first.json()['id']}/status",
+        json={"status": "confirmed"},
+        headers=provider["provider_headers"],
+    )
+    assert reopen.status_code == 409
+
+
+def test_create_appointment_outside_availability(client):
+    provider = setup_bookable_provider(client)
+    headers, _ = create_user_and_login(client)
+
+    late = booking(provider, "2030-01-07T16:30:00", "2030-01-07T17:30:00")
+    response = client.post("/appointments/", json=late, headers=headers)
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Provider not available at this time"
+
+
+async def test_concurrent_bookings_single_winner(client):
+    provider = setup_bookable_provider(client)
+    clients = [create_user_and_login(client)[0] for _ in range(5)]
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+        responses = await asyncio.gather(*(
+            ac.post(
+                "/appointments/",
+                json=booking(
+                    provider,
+                    f"2030-01-07T10:{i % 30:02d}:00",
+                    f"2030-01-07T11:{i % 30:02d}:00",
+                ),
+                headers=clients[i % len(clients)],
+            )
+            for i in range(200)
+        ))
+
+    statuses = [r.status_code for r in responses]
+    assert statuses.count(200) == 1
+    assert statuses.count(409) == len(statuses) - 1
+
+
+def test_batch_booking_all_or_nothing(client):
+    provider = setup_bookable_provider(client)
+    headers, _ = create_user_and_login(client)
+    taken = client.post("/appointments/", json=booking(provider, "2030-01-07T15:00:00", "2030-01-07T16:00:00"), headers=headers)
+    assert taken.status_code == 200
+
+    response = client.post("/appointments/batch", json={"items": [
+        booking(provider, "2030-01-07T09:00:00", "2030-01-07T10:00:00"),
+        booking(provider, "2030-01-07T09:30:00", "2030-01-07T10:30:00"),
+        booking(provider, "2030-01-07T15:30:00", "2030-01-07T16:30:00"),
+        booking(provider, "2030-01-07T18:00:00", "2030-01-07T19:00:00"),
+    ]}, headers=headers)
+
+    assert response.status_code == 409
+    assert response.json()["detail"]["conflicts"] == [
+        {"index": 1, "reason": "Overlaps another appointment in this batch"},
+        {"index": 2, "reason": "Time slot already booked"},
+        {"index": 3, "reason": "Provider not available at this time"},
+    ]
+    listed = client.get("/appointments/", params={"provider_id": provider["provider_id"]}, headers=headers)
+    assert len(listed.json()["items"]) == 1
+
+
+def test_batch_booking_success(client):
+    provider = setup_bookable_provider(client)
+    headers, _ = create_user_and_login(client)
+
+    with QueryCounter() as counter:
+        response = client.post("/appointments/batch", json={"items": [
+            booking(provider, f"2030-01-07T{hour:02d}:00:00", f"2030-01-07T{hour:02d}:45:00")
+            for hour in range(9, 17)
+        ]}, headers=headers)
+
+    assert response.status_code == 200
+    assert len(response.json()) == 8
+    selects = [s for s in counter.statements if s.startswith("SELECT")]
+    inserts = [s for s in counter.statements if s.startswith("INSERT INTO appointments ")]
+    assert len(selects) <= 4
+    assert len(inserts) == 1
+
+
+def test_batch_booking_normalizes_timezones(client):
+    provider = setup_bookable_provider(client)
+    headers, _ = create_user_and_login(client)
+
+    # 19:00+03:00 همون 16:00 UTC ـه، داخل availability
+    response = client.post("/appointments/batch", json={"items": [
+        booking(provider, "2030-01-07T19:00:00+03:00", "2030-01-07T20:00:00+03:00"),
+    ]}, headers=headers)
+
+    assert response.status_code == 200
+    created = response.json()[0]
+    assert created["start_time"] == "2030-01-07T16:00:00"
+    assert created["end_time"] == "2030-01-07T17:00:00"
+
+    # همون بازه از مسیر تکی هم رزرو شده دیده می‌شه
+    single = client.post("/appointments/", json=booking(provider, "2030-01-07T16:30:00", "2030-01-07T17:00:00"), headers=headers)
+    assert single.status_code == 409
+
+
+def test_booking_normalizes_timezone_offsets(client):
+    provider = setup_bookable_provider(client)
+    headers, _ = create_user_and_login(client)
+
+    # 18:30+03:00 یعنی 15:30 UTC؛ به ساعت محلی بیرون از availability (۹ تا ۱۷) می‌افته
+    response = client.post(
+        "/appointments/", json=booking(provider, "2030-01-07T18:30:00+03:00", "2030-01-07T19:30:00+03:00"), headers=headers,
+    )
+
+    assert response.status_code == 200
+    assert (response.json()["start_time"], response.json()["end_time"]) == ("2030-01-07T15:30:00", "2030-01-07T16:30:00")
+    overlapping = client.post(
+        "/appointments/", json=booking(provider, "2030-01-07T16:00:00Z", "2030-01-07T16:30:00Z"), headers=headers,
+    )
+    assert overlapping.status_code == 409
+
+
+def test_bulk_status_by_filter_and_dry_run(client):
+    provider = setup_bookable_provider(client)
+    headers, _ = create_user_and_login(client)
+    client.post("/appointments/batch", json={"items": [
+        booking(provider, f"2030-01-07T{hour:02d}:00:00", f"2030-01-07T{hour:02d}:30:00")
+        for hour in range(9, 14)
+    ]}, headers=headers)
+    body = {"status": "confirmed", "provider_id": provider["provider_id"], "date_to": "2030-01-07T12:00:00"}
+
+    dry = client.post("/appointments/bulk-status", json={**body, "dry_run": True}, headers=provider["provider_headers"])
+    assert dry.json() == {"dry_run": True, "matched": 3, "ids": []}
+
+    with QueryCounter() as counter:
+        response = client.post("/appointments/bulk-status", json=body, headers=provider["provider_headers"])
+    assert response.status_code == 200
+    assert response.json()["matched"] == 3
+    # یک UPDATE برای هر وضعیت قبلی، نه برای هر ردیف و بدون لیست id ها
+    updates = [s for s in counter.statements if s.startswith("UPDATE appointments ")]
+    assert len(updates) == 3
+    assert not any(" IN (" in s for s in updates)
+
+    confirmed = client.get("/appointments/", params={"status": "confirmed"}, headers=headers)
+    assert len(confirmed.json()["items"]) == 3
+
+
+def test_bulk_status_role_rules(client):
+    provider = setup_bookable_provider(client)
+    owner_headers, _ = create_user_and_login(client)
+    other_headers, _ = create_user_and_login(client)
+    created = client.post("/appointments/", json=booking(provider), headers=owner_headers).json()
+
+    assert client.post("/appointments/bulk-status", json={"status": "cancelled"}, headers=owner_headers).status_code == 422
+    assert client.post(
+        "/appointments/bulk-status", json={"status": "confirmed", "ids": [created["id"]]}, headers=owner_headers
+    ).status_code == 403
+    assert client.post(
+        "/appointments/bulk-status", json={"status": "cancelled", "ids": [created["id"]]}, headers=other_headers
+    ).json()["matched"] == 0
+    assert client.post(
+        "/appointments/bulk-status", json={"status": "cancelled", "ids": [created["id"]]}, headers=owner_headers
+    ).json()["ids"] == [created["id"]]
+
+
+def test_list_appointments_expand_constant_queries(client):
+    provider = setup_bookable_provider(client)
+    headers, user_id = create_user_and_login(client)
+    client.post("/appointments/batch", json={"items": [
+        booking(provider, f"2030-01-07T{hour:02d}:00:00", f"2030-01-07T{hour:02d}:30:00")
+        for hour in range(9, 17)
+    ]}, headers=headers)
+
+    with QueryCounter() as counter:
+        response = client.get("/appointments/", params={"expand": "patient,provider,service"}, headers=headers)
+
+    assert response.status_code == 200
+    items = response.json()["items"]
+    assert len(items) == 8
+    assert all(item["patient"]["id"] == user_id for item in items)
+    assert all(item["provider"]["id"] == provider["provider_id"] for item in items)
+    assert all(item["service"]["id"] == provider["service_id"] for item in items)
+    assert "password" not in items[0]["patient"]
+    # client نباید email و role provider رو از طریق expand ببینه
+    assert items[0]["provider"] == {"id": provider["provider_id"], "full_name": "test user"}
+    assert "email" not in items[0]["patient"]
+    assert len(counter.statements) <= 4
+
+    plain = client.get(f"/appointments/{items[0]['id']}", headers=headers).json()
+    assert plain["patient"] is None
+    expanded = client.get(f"/appointments/{items[0]['id']}", params={"expand": "service"}, headers=headers).json()
+    assert expanded["service"]["id"] == provider["service_id"]
+    assert client.get("/appointments/", params={"expand": "owner"}, headers=headers).status_code == 400
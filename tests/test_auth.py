@@ -1,3 +1,12 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.security import PasswordHasherPool
+
+
 def test_register_user(client):
     payload = {
         "full_name": "Test User",
@@ -23,3 +32,45 @@ def test_login_user(client):
 
     assert response.status_code == 200
     assert "access_token" in response.json()
+
+
+async def test_password_hasher_rejects_when_saturated():
+    pool = PasswordHasherPool(workers=1, queue_size=1)
+    release = threading.Event()
+    busy = [asyncio.ensure_future(pool.run(release.wait)) for _ in range(2)]
+    await asyncio.sleep(0)
+
+    with pytest.raises(HTTPException) as exc:
+        await pool.run(release.wait)
+    assert exc.value.status_code == 503
+    assert exc.value.headers["Retry-After"] == "1"
+
+    release.set()
+    await asyncio.gather(*busy)
+    assert pool.in_flight == 0
+    assert await pool.run(lambda: "ok") == "ok"
+
+
+async def test_password_hasher_counts_cancelled_hashes_until_done():
+    pool = PasswordHasherPool(workers=1, queue_size=0)
+    started, release = threading.Event(), threading.Event()
+
+    def hash_slowly():
+        started.set()
+        release.wait()
+
+    request = asyncio.ensure_future(pool.run(hash_slowly))
+    await asyncio.to_thread(started.wait)
+    request.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await request
+
+    try:
+        # client رفته ولی argon2 هنوز روی thread اجرا می‌شه
+        with pytest.raises(HTTPException):
+            await asyncio.wait_for(pool.run(lambda: "ok"), 1)
+    finally:
+        release.set()
+    while pool.in_flight:
+        await asyncio.sleep(0.01)
+    assert await pool.run(lambda: "ok") == "ok"
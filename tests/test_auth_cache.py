@@ -0,0 +1,26 @@
+from app.core.security import auth_cache
+from tests.utils import QueryCounter, create_user_and_login
+
+
+def test_warm_cache_skips_user_lookup(client):
+    headers, _ = create_user_and_login(client, "admin")
+    client.get("/metrics/auth-cache", headers=headers)
+    hits = auth_cache.hits
+
+    with QueryCounter() as counter:
+        response = client.get("/metrics/auth-cache", headers=headers)
+
+    assert response.status_code == 200
+    assert counter.statements == []
+    assert auth_cache.hits == hits + 1
+
+
+def test_delete_user_invalidates_cache(client):
+    headers, user_id = create_user_and_login(client)
+    assert client.get("/appointments/", headers=headers).status_code == 200
+
+    response = client.delete(f"/users/{user_id}", headers=headers)
+    assert response.status_code == 200
+
+    response = client.get("/appointments/", headers=headers)
+    assert response.status_code == 401
@@ -0,0 +1,86 @@
+from tests.utils import QueryCounter, create_user_and_login
+
+
+def test_bulk_create_availability_from_recurrence(client):
+    headers, provider_id = create_user_and_login(client, "provider")
+
+    with QueryCounter() as counter:
+        response = client.post("/availability/bulk-create-availability", json={
+            "provider_id": provider_id,
+            "recurrence": {
+                "weekdays": [0, 2],
+                "start_time": "09:00:00",
+                "end_time": "17:00:00",
+                "start_date": "2030-01-01",
+                "end_date": "2030-12-31",
+                "exceptions": ["2030-01-07"],
+            },
+        }, headers=headers)
+
+    assert response.status_code == 200
+    items = response.json()
+    assert len(items) == 103
+    assert items[0]["start_time"] == "2030-01-02T09:00:00"
+    assert all(item["provider_id"] == provider_id for item in items)
+    inserts = [s for s in counter.statements if s.startswith("INSERT INTO availabilities")]
+    assert len(inserts) == 1
+
+
+def test_bulk_create_availability_rejects_overlap(client):
+    headers, provider_id = create_user_and_login(client, "provider")
+
+    response = client.post("/availability/bulk-create-availability", json={
+        "provider_id": provider_id,
+        "windows": [
+            {"start_time": "2030-01-07T09:00:00", "end_time": "2030-01-07T12:00:00"},
+            {"start_time": "2030-01-07T11:00:00", "end_time": "2030-01-07T13:00:00"},
+        ],
+    }, headers=headers)
+
+    assert response.status_code == 400
+    assert "overlap" in response.json()["detail"]
+
+
+def test_bulk_create_availability_requires_one_source(client):
+    headers, provider_id = create_user_and_login(client, "provider")
+
+    response = client.post("/availability/bulk-create-availability", json={
+        "provider_id": provider_id,
+    }, headers=headers)
+
+    assert response.status_code == 422
+
+
+def test_bulk_create_availability_mixed_timezones(client):
+    headers, provider_id = create_user_and_login(client, "provider")
+
+    response = client.post("/availability/bulk-create-availability", json={
+        "provider_id": provider_id,
+        "windows": [
+            {"start_time": "2030-01-08T09:00:00Z", "end_time": "2030-01-08T12:00:00Z"},
+            {"start_time": "2030-01-08T14:00:00+03:00", "end_time": "2030-01-08T16:00:00+03:00"},
+            {"start_time": "2030-01-07T09:00:00", "end_time": "2030-01-07T12:00:00"},
+        ],
+    }, headers=headers)
+
+    # 14:00+03:00 == 11:00 UTC، داخل پنجره‌ی اول
+    assert response.status_code == 400
+    assert "overlap" in response.json()["detail"]
+
+
+def test_recurrence_up_to_the_last_date(client):
+    headers, provider_id = create_user_and_login(client, "provider")
+
+    response = client.post("/availability/bulk-create-availability", json={
+        "provider_id": provider_id,
+        "recurrence": {
+            "weekdays": [4],
+            "start_time": "09:00:00",
+            "end_time": "17:00:00",
+            "start_date": "9999-12-25",
+            "end_date": "9999-12-31",
+        },
+    }, headers=headers)
+
+    assert response.status_code == 200
+    assert [item["start_time"] for item in response.json()] == ["9999-12-31T09:00:00"]
@@ -0,0 +1,61 @@
+import csv
+import io
+import json
+
+from tests.utils import create_user_and_login, setup_bookable_provider
+
+
+def book(client, provider, headers, hour):
+    response = client.post("/appointments/", json={
+        "provider_id": provider["provider_id"],
+        "service_id": provider["service_id"],
+        "start_time": f"2030-01-07T{hour:02d}:00:00",
+        "end_time": f"2030-01-07T{hour:02d}:30:00",
+    }, headers=headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_export_ndjson(client):
+    provider = setup_bookable_provider(client)
+    headers, _ = create_user_and_login(client)
+    booked = [book(client, provider, headers, hour) for hour in (9, 10, 11)]
+
+    response = client.get(
+        "/appointments/export",
+        params={"provider_id": provider["provider_id"]},
+        headers=provider["admin_headers"],
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(row["id"] for row in rows) == sorted(item["id"] for item in booked)
+
+
+def test_export_csv_with_date_range(client):
+    provider = setup_bookable_provider(client)
+    headers, _ = create_user_and_login(client)
+    for hour in (9, 10, 11):
+        book(client, provider, headers, hour)
+
+    response = client.get(
+        "/appointments/export",
+        params={
+            "format": "csv",
+            "provider_id": provider["provider_id"],
+            "date_from": "2030-01-07T10:00:00",
+        },
+        headers=provider["admin_headers"],
+    )
+
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert sorted(row["start_time"] for row in rows) == ["2030-01-07T10:00:00", "2030-01-07T11:00:00"]
+
+
+def test_export_requires_admin(client):
+    headers, _ = create_user_and_login(client)
+
+    response = client.get("/appointments/export", headers=headers)
+
+    assert response.status_code == 403
@@ -0,0 +1,27 @@
+import re
+
+from tests.utils import create_user_and_login
+
+
+def test_server_timing_header_counts_queries(client):
+    headers, _ = create_user_and_login(client)
+    response = client.get("/appointments/", headers=headers)
+
+    timing = response.headers["Server-Timing"]
+    match = re.fullmatch(r'app;dur=[\d.]+, db;dur=[\d.]+;desc="(\d+) queries", db-slowest;dur=[\d.]+', timing)
+    assert match
+    # صفحه‌ی appointments، و اگه cache خالی باشه خوندن کاربر
+    assert int(match.group(1)) in (1, 2)
+
+
+def test_prometheus_metrics_per_route(client):
+    headers, _ = create_user_and_login(client)
+    client.get("/appointments/", headers=headers)
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert "# TYPE http_request_duration_seconds histogram" in body
+    assert 'http_request_duration_seconds_count{method="GET",route="/appointments/",status="200"}' in body
+    assert 'http_request_db_statements_bucket{method="GET",route="/appointments/",status="200",le="+Inf"}' in body
@@ -0,0 +1,51 @@
+import json
+import logging
+import queue
+
+from app.core.config import settings
+from app.core.logging_config import DroppingQueueHandler, JsonFormatter, RequestIdFilter, request_id_var
+
+
+def test_request_id_header_and_access_log(client, caplog):
+    caplog.set_level(logging.INFO, logger="app.access")
+    response = client.get("/", headers={"X-Request-ID": "abc-123"})
+    generated = client.get("/")
+
+    assert response.headers["X-Request-ID"] == "abc-123"
+    assert len(generated.headers["X-Request-ID"]) == 32
+    records = [r for r in caplog.records if r.name == "app.access"]
+    assert records[0].request_id == "abc-123"
+    assert (records[0].route, records[0].status) == ("/", 200)
+
+
+def test_successful_requests_sampled_errors_kept(client, caplog, monkeypatch):
+    monkeypatch.setattr(settings, "LOG_SAMPLE_RATE", 0.0)
+    caplog.set_level(logging.INFO, logger="app.access")
+    client.get("/")
+    client.get("/appointments/")
+
+    statuses = [r.status for r in caplog.records if r.name == "app.access"]
+    assert statuses == [401]
+
+
+def test_json_formatter_and_queue_handler():
+    log_queue = queue.Queue(maxsize=1)
+    handler = DroppingQueueHandler(log_queue)
+    handler.addFilter(RequestIdFilter())
+    logger = logging.getLogger("test.json")
+    logger.addHandler(handler)
+    logger.propagate = False
+    token = request_id_var.set("req-1")
+    try:
+        logger.warning("booked %s", "slot", extra={"provider_id": "p1"})
+        logger.warning("dropped")
+    finally:
+        request_id_var.reset(token)
+        logger.removeHandler(handler)
+
+    assert handler.dropped == 1
+    payload = json.loads(JsonFormatter().format(log_queue.get_nowait()))
+    assert payload["message"] == "booked slot"
+    assert payload["request_id"] == "req-1"
+    assert payload["provider_id"] == "p1"
+    assert payload["level"] == "WARNING"
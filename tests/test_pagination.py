@@ -0,0 +1,119 @@
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import delete, update
+
+from app.models.appointment import Appointment
+from tests.conftest import TestingSessionLocal
+from tests.utils import create_user_and_login, setup_bookable_provider
+
+
+def test_list_appointments_pages_through_all_rows(client):
+    provider = setup_bookable_provider(client)
+    headers, _ = create_user_and_login(client)
+    for hour in range(9, 16):
+        response = client.post("/appointments/", json={
+            "provider_id": provider["provider_id"],
+            "service_id": provider["service_id"],
+            "start_time": f"2030-01-07T{hour:02d}:00:00",
+            "end_time": f"2030-01-07T{hour:02d}:30:00",
+        }, headers=headers)
+        assert response.status_code == 200
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 3}
+        if cursor:
+            params["cursor"] = cursor
+        page = client.get("/appointments/", params=params, headers=headers).json()
+        assert len(page["items"]) <= 3
+        seen.extend(item["id"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    assert len(seen) == 7
+    assert len(set(seen)) == 7
+
+
+def test_list_appointments_filters(client):
+    provider = setup_bookable_provider(client)
+    headers, _ = create_user_and_login(client)
+    for hour in (9, 12):
+        client.post("/appointments/", json={
+            "provider_id": provider["provider_id"],
+            "service_id": provider["service_id"],
+            "start_time": f"2030-01-07T{hour:02d}:00:00",
+            "end_time": f"2030-01-07T{hour:02d}:30:00",
+        }, headers=headers)
+
+    response = client.get("/appointments/", params={
+        "provider_id": provider["provider_id"],
+        "date_from": "2030-01-07T11:00:00",
+        "status": "pending",
+    }, headers=headers)
+
+    items = response.json()["items"]
+    assert [item["start_time"] for item in items] == ["2030-01-07T12:00:00"]
+
+
+def test_page_size_is_capped(client):
+    headers, _ = create_user_and_login(client)
+
+    response = client.get("/appointments/", params={"limit": 10_000}, headers=headers)
+
+    assert response.status_code == 422
+
+
+def test_invalid_cursor(client):
+    headers, _ = create_user_and_login(client)
+
+    response = client.get("/appointments/", params={"cursor": "not-a-cursor"}, headers=headers)
+
+    assert response.status_code == 400
+
+
+def test_list_user_hides_password(client):
+    admin_headers, _ = create_user_and_login(client, "admin")
+
+    response = client.get("/users/list-user", params={"role": "admin", "limit": 1}, headers=admin_headers)
+
+    assert response.status_code == 200
+    item = response.json()["items"][0]
+    assert item["role"] == "admin"
+    assert "password" not in item
+
+
+async def test_cursor_survives_deleted_row(client):
+    provider = setup_bookable_provider(client)
+    headers, _ = create_user_and_login(client)
+    ids = []
+    for hour in range(9, 14):
+        response = client.post("/appointments/", json={
+            "provider_id": provider["provider_id"],
+            "service_id": provider["service_id"],
+            "start_time": f"2030-01-07T{hour:02d}:00:00",
+            "end_time": f"2030-01-07T{hour:02d}:30:00",
+        }, headers=headers)
+        ids.append(uuid.UUID(response.json()["id"]))
+    # ترتیب قطعی؛ همه توی یک ثانیه ساخته شدن
+    async with TestingSessionLocal() as db:
+        for minute, appointment_id in enumerate(ids):
+            await db.execute(
+                update(Appointment)
+                .where(Appointment.id == appointment_id)
+                .values(created_at=datetime(2030, 1, 1, 0, minute, 0, 500, tzinfo=timezone.utc))
+            )
+        await db.commit()
+
+    first = client.get("/appointments/", params={"limit": 2}, headers=headers).json()
+    assert [item["id"] for item in first["items"]] == [str(i) for i in ids[:2]]
+
+    async with TestingSessionLocal() as db:
+        await db.execute(delete(Appointment).where(Appointment.id == ids[1]))
+        await db.commit()
+
+    second = client.get("/appointments/", params={"limit": 2, "cursor": first["next_cursor"]}, headers=headers).json()
+    assert [item["id"] for item in second["items"]] == [str(i) for i in ids[2:4]]
+    assert second["next_cursor"]
@@ -0,0 +1,18 @@
+from tests.utils import setup_bookable_provider
+
+
+def test_update_to_an_offered_service_conflicts(client):
+    provider = setup_bookable_provider(client)
+    other = client.post(
+        "/services/create-service", json={"name": "second-offered-service"}, headers=provider["admin_headers"]
+    ).json()
+    second = client.post("/provider-services/create-provider-service", json={
+        "price": 100, "duration_minutes": 30, "service_id": other["id"], "provider_id": provider["provider_id"],
+    }, headers=provider["provider_headers"]).json()
+
+    response = client.put(f"/provider-services/update-provider-service/{second['id']}", json={
+        "price": 100, "duration_minutes": 30,
+        "service_id": provider["service_id"], "provider_id": provider["provider_id"],
+    }, headers=provider["provider_headers"])
+
+    assert response.status_code == 409
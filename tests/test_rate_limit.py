@@ -0,0 +1,92 @@
+import pytest
+
+from app.core.rate_limit import SlidingWindowLimiter, login_email_limiter, login_ip_limiter
+from tests.utils import QueryCounter
+
+
+class FakeClock:
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+async def test_sliding_window_blocks_and_recovers():
+    clock = FakeClock(1000 * 60 + 10)
+    limiter = SlidingWindowLimiter("test-sliding", limit=3, window_seconds=60, clock=clock)
+
+    assert [await limiter.hit("k") for _ in range(3)] == [0, 0, 0]
+    retry_after = await limiter.hit("k")
+    assert 0 < retry_after <= 120
+
+    clock.now += retry_after
+    assert await limiter.hit("k") == 0
+    assert limiter.rejected == 1
+
+
+async def test_previous_window_still_counts():
+    clock = FakeClock(2000 * 60 + 50)
+    limiter = SlidingWindowLimiter("test-previous", limit=4, window_seconds=60, clock=clock)
+    for _ in range(4):
+        await limiter.hit("k")
+
+    # 20 ثانیه توی window بعدی: 4 * (40/60) از قبلی هنوز حساب می‌شه
+    clock.now += 30
+    assert await limiter.hit("k") == 0
+    assert await limiter.hit("k") > 0
+
+
+async def test_limit_clears_after_a_window_of_rejected_traffic():
+    window_start = 3000 * 60
+    clock = FakeClock(window_start)
+    limiter = SlidingWindowLimiter("test-rejected", limit=3, window_seconds=60, clock=clock)
+    assert [await limiter.hit("k") for _ in range(3)] == [0, 0, 0]
+
+    # کلاینت یه window کامل هر ثانیه دوباره امتحان می‌کنه
+    while clock.now < window_start + 60:
+        assert await limiter.hit("k") > 0
+        clock.now += 1
+    # تلاش‌های رد شده حساب نشدن: سهم اون ۳ تا کم می‌شه و دوباره راه باز می‌شه
+    while await limiter.hit("k") > 0:
+        clock.now += 1
+    assert clock.now <= window_start + 60 + 20
+    assert limiter.rejected == 60 + 20
+
+
+@pytest.fixture
+def tight_login_limits(monkeypatch):
+    monkeypatch.setattr(login_email_limiter, "limit", 2)
+    monkeypatch.setattr(login_ip_limiter, "limit", 100)
+
+
+def test_login_rejected_before_any_query(client, tight_login_limits):
+    credentials = {"email": "limited@test.com", "password": "wrong"}
+    assert client.post("/auth/login", json=credentials).status_code == 400
+    assert client.post("/auth/login", json=credentials).status_code == 400
+
+    with QueryCounter() as counter:
+        response = client.post("/auth/login", json={**credentials, "email": "LIMITED@test.com"})
+
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    assert counter.statements == []
+
+    # ایمیل دیگه از همون IP هنوز مجازه
+    other = client.post("/auth/login", json={"email": "other@test.com", "password": "wrong"})
+    assert other.status_code == 400
+
+
+def test_successful_logins_are_not_counted(client, tight_login_limits):
+    client.post("/auth/register", json={
+        "full_name": "Test User", "email": "often@test.com",
+        "password": "123456", "password_confirm": "123456", "role": "client",
+    })
+    for _ in range(4):
+        response = client.post("/auth/login", json={"email": "often@test.com", "password": "123456"})
+        assert response.status_code == 200
+
+    for _ in range(2):
+        client.post("/auth/login", json={"email": "often@test.com", "password": "wrong"})
+    response = client.post("/auth/login", json={"email": "often@test.com", "password": "123456"})
+    assert response.status_code == 429
@@ -0,0 +1,165 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import func, select, update
+
+from app.core.cache import BloomFilter
+from app.core.refresh_tokens import RefreshTokenStore, purge_expired, refresh_tokens
+from app.core.security import decode_token
+from app.models.refresh_token import RefreshToken
+from app.models.user import User
+from tests.conftest import TestingSessionLocal
+from tests.utils import QueryCounter
+
+
+def login(client, email):
+    client.post("/auth/register", json={
+        "full_name": "Test User", "email": email,
+        "password": "123456", "password_confirm": "123456", "role": "client",
+    })
+    response = client.post("/auth/login", json={"email": email, "password": "123456"})
+    assert response.status_code == 200
+    return response.json()["refresh_token"]
+
+
+def refresh(client, token):
+    return client.post("/auth/refresh-token", json={"token": token})
+
+
+async def test_refresh_writes_only_the_rotation(client):
+    token = login(client, "rotate@test.com")
+    refresh(client, token)  # filter و جدول نسخه‌ها از DB پر می‌شن
+    token = login(client, "rotate@test.com")
+    await refresh_tokens.flush()
+    lookups = refresh_tokens.lookups
+
+    with QueryCounter() as counter:
+        response = refresh(client, token)
+    assert response.status_code == 200
+    assert response.json()["refresh_token"] != token
+    # فقط upsert چرخش؛ ردیف توکن جدید بعداً نوشته می‌شه
+    assert [s.split()[0].upper() for s in counter.statements] == ["INSERT"]
+    assert refresh_tokens.lookups == lookups
+
+    with QueryCounter() as counter:
+        await refresh_tokens.flush()
+    assert [s.split()[0].upper() for s in counter.statements] == ["INSERT"]
+    assert refresh_tokens.pending == 0
+
+
+def test_reused_refresh_token_revokes_family(client):
+    first = login(client, "reuse@test.com")
+    second = refresh(client, first).json()["refresh_token"]
+
+    reuse = refresh(client, first)
+    assert reuse.status_code == 401
+    assert reuse.json()["detail"] == "Refresh token revoked"
+
+    # توکن جدید هم همراه کل family باطل شده
+    assert refresh(client, second).status_code == 401
+
+
+async def test_logout_revokes_the_family(client):
+    first = login(client, "logout@test.com")
+    second = refresh(client, first).json()["refresh_token"]
+
+    response = client.post("/auth/logout", json={"token": second})
+    assert response.status_code == 200
+
+    assert refresh(client, second).status_code == 401
+    refresh_tokens.recent.clear()
+    # بدون recent هم جدول همین رو می‌گه
+    assert refresh(client, second).status_code == 401
+
+
+def test_token_without_jti_is_rejected(client):
+    from app.core.security import generate_refresh_token
+
+    response = refresh(client, generate_refresh_token(uuid.uuid4()))
+    assert response.status_code == 401
+
+
+async def test_purge_expired_deletes_only_expired_rows(client):
+    login(client, "purge@test.com")
+    await refresh_tokens.flush()
+    now = datetime.now(timezone.utc)
+    async with TestingSessionLocal() as db:
+        user_id = (await db.execute(select(RefreshToken.user_id).limit(1))).scalar_one()
+        db.add_all([
+            RefreshToken(jti=uuid.uuid4(), user_id=user_id, family_id=uuid.uuid4(), expires_at=now - timedelta(days=1))
+            for _ in range(5)
+        ])
+        await db.commit()
+
+        live = (await db.execute(select(func.count()).where(RefreshToken.expires_at >= now))).scalar_one()
+        assert await purge_expired(db, now, batch_size=2) == 5
+        assert (await db.execute(select(func.count()).select_from(RefreshToken))).scalar_one() == live
+
+
+def test_rotation_adds_one_filter_key(client):
+    token = login(client, "filter-count@test.com")
+    token = refresh(client, token).json()["refresh_token"]
+    count = refresh_tokens.revoked.count
+    for _ in range(5):
+        token = refresh(client, token).json()["refresh_token"]
+    assert refresh_tokens.revoked.count == count + 5
+
+
+async def test_run_reloads_revocations_of_other_workers(client, monkeypatch):
+    token = login(client, "other-worker@test.com")
+    await refresh_tokens.flush()
+    await refresh_tokens.ensure_loaded()
+    # یه worker دیگه همین توکن رو چرخونده و flush کرده
+    async with TestingSessionLocal() as db:
+        await db.execute(update(RefreshToken).values(revoked_at=datetime.now(timezone.utc)))
+        await db.commit()
+    assert refresh_tokens.is_revoked(str(uuid.uuid4())) is False
+
+    monkeypatch.setattr(refresh_tokens, "reload_seconds", 0)
+    reloads = refresh_tokens.reloads
+    writer = asyncio.create_task(refresh_tokens.run())
+    refresh_tokens._wake.set()
+    for _ in range(100):
+        if refresh_tokens.reloads > reloads:
+            break
+        await asyncio.sleep(0.01)
+    writer.cancel()
+
+    assert refresh(client, token).status_code == 401
+
+
+async def test_replay_after_rotation_on_another_worker(client):
+    login(client, "two-workers@test.com")
+    async with TestingSessionLocal() as db:
+        user_id = (await db.execute(select(User.id).where(User.email == "two-workers@test.com"))).scalar_one()
+    first, second = (RefreshTokenStore(1000, 0.01, 30, session_factory=TestingSessionLocal) for _ in range(2))
+    await second.ensure_loaded()
+
+    # second توکن رو می‌چرخونه قبل از اینکه first ردیفش رو نوشته باشه
+    payload = decode_token(first.issue(user_id, {}), "refresh")
+    await second.verify(payload)
+    rotated = decode_token(await second.rotate(payload, {}), "refresh")
+    await first.flush()
+    await second.flush()
+
+    with pytest.raises(HTTPException) as exc:
+        await first.verify(payload)
+        await first.rotate(payload, {})
+    assert exc.value.detail == "Refresh token revoked"
+    # تکرار توکن کل family رو باطل کرده، حتی توی worker دیگه
+    with pytest.raises(HTTPException):
+        await second.rotate(rotated, {})
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    keys = [str(uuid.uuid4()) for _ in range(1000)]
+    for key in keys:
+        bloom.add(key)
+
+    assert all(key in bloom for key in keys)
+    false_positives = sum(str(uuid.uuid4()) in bloom for _ in range(10_000))
+    assert false_positives < 300
@@ -0,0 +1,59 @@
+from app.db.rollups import rebuild_rollups
+from tests.conftest import TestingSessionLocal
+from tests.utils import create_user_and_login, setup_bookable_provider
+
+DAY = {"from": "2030-01-07", "to": "2030-01-07"}
+
+
+def booking(provider, hour):
+    return {
+        "provider_id": provider["provider_id"],
+        "service_id": provider["service_id"],
+        "start_time": f"2030-01-07T{hour:02d}:00:00",
+        "end_time": f"2030-01-07T{hour:02d}:30:00",
+    }
+
+
+async def test_rollups_follow_writes_and_match_rebuild(client):
+    provider = setup_bookable_provider(client)
+    headers, _ = create_user_and_login(client)
+    first = client.post("/appointments/", json=booking(provider, 9), headers=headers).json()
+    batch = client.post("/appointments/batch", json={"items": [booking(provider, h) for h in (10, 11, 12)]}, headers=headers).json()
+    client.put(f"/appointments/{first['id']}/status", json={"status": "confirmed"}, headers=provider["provider_headers"])
+    client.delete(f"/appointments/{batch[0]['id']}", headers=headers)
+    client.post(
+        "/appointments/bulk-status",
+        json={"status": "completed", "ids": [batch[1]["id"], batch[2]["id"]]},
+        headers=provider["provider_headers"],
+    )
+
+    params = {**DAY, "provider_id": provider["provider_id"]}
+    incremental = client.get("/analytics/daily-rollups", params=params, headers=provider["admin_headers"]).json()
+    assert len(incremental) == 1
+    row = incremental[0]
+    assert (row["pending"], row["confirmed"], row["completed"], row["cancelled"]) == (0, 1, 2, 1)
+    assert (row["booked_minutes"], row["revenue"]) == (90, 300)
+
+    async with TestingSessionLocal() as session:
+        await rebuild_rollups(session)
+        await session.commit()
+    rebuilt = client.get("/analytics/daily-rollups", params=params, headers=provider["admin_headers"]).json()
+    assert rebuilt == incremental
+
+
+def test_cancel_after_price_change_undoes_booked_revenue(client):
+    provider = setup_bookable_provider(client)
+    headers, _ = create_user_and_login(client)
+    booked = client.post("/appointments/", json=booking(provider, 9), headers=headers).json()
+
+    client.put(
+        f"/provider-services/update-provider-service/{provider['provider_service_id']}",
+        json={"provider_id": provider["provider_id"], "service_id": provider["service_id"],
+              "price": 250, "duration_minutes": 30},
+        headers=provider["provider_headers"],
+    )
+    client.delete(f"/appointments/{booked['id']}", headers=headers)
+
+    params = {**DAY, "provider_id": provider["provider_id"]}
+    row = client.get("/analytics/daily-rollups", params=params, headers=provider["admin_headers"]).json()[0]
+    assert (row["pending"], row["cancelled"], row["booked_minutes"], row["revenue"]) == (0, 1, 0, 0)
@@ -0,0 +1,59 @@
+from tests.utils import QueryCounter, create_user_and_login
+
+
+def create_service(client, headers, name):
+    response = client.post("/services/create-service", json={"name": name}, headers=headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_catalog_served_from_cache(client):
+    admin_headers, _ = create_user_and_login(client, "admin")
+    headers, _ = create_user_and_login(client)
+    create_service(client, admin_headers, "cached-massage")
+    client.get("/services/list-service", headers=headers)
+
+    with QueryCounter() as counter:
+        response = client.get("/services/list-service", headers=headers)
+
+    assert response.status_code == 200
+    assert counter.statements == []
+    assert "cached-massage" in [s["name"] for s in response.json()["items"]]
+    assert response.headers["Vary"] == "Authorization"
+    assert response.headers["Cache-Control"].startswith("private, max-age=")
+
+
+def test_etag_not_modified_and_invalidation(client):
+    admin_headers, _ = create_user_and_login(client, "admin")
+    headers, _ = create_user_and_login(client)
+    service = create_service(client, admin_headers, "etag-physio")
+    url = f"/services/retrieve-service/{service['id']}"
+
+    first = client.get(url, headers=headers)
+    etag = first.headers["ETag"]
+    response = client.get(url, headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+
+    client.put(
+        f"/services/update-service/{service['id']}",
+        json={"name": "etag-physio", "description": "updated"},
+        headers=admin_headers,
+    )
+    response = client.get(url, headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["description"] == "updated"
+    assert response.headers["ETag"] != etag
+
+
+def test_if_none_match_forms(client):
+    headers, _ = create_user_and_login(client)
+    url = "/services/list-service"
+    etag = client.get(url, headers=headers).headers["ETag"]
+
+    for value in (etag, f"W/{etag}", f'"other",{etag}', f' "other" ,  W/{etag} ', "*"):
+        response = client.get(url, headers={**headers, "If-None-Match": value})
+        assert response.status_code == 304, value
+    for value in ('"other"', f"{etag[:-1]}x\"", ""):
+        response = client.get(url, headers={**headers, "If-None-Match": value})
+        assert response.status_code == 200, value
@@ -0,0 +1,154 @@
+from datetime import datetime, timedelta
+
+from app.core.scheduling import slice_slots, subtract_intervals
+from tests.utils import create_user_and_login, setup_bookable_provider
+
+
+def at(hour, minute=0):
+    return datetime(2030, 1, 7, hour, minute)
+
+
+def test_subtract_intervals():
+    windows = [(at(9), at(12)), (at(11), at(13)), (at(14), at(16))]
+    busy = [(at(8), at(9, 30)), (at(10), at(10, 30)), (at(10, 15), at(11)), (at(15), at(17))]
+
+    assert subtract_intervals(windows, busy) == [
+        (at(9, 30), at(10)),
+        (at(11), at(13)),
+        (at(14), at(15)),
+    ]
+
+
+def test_slice_slots():
+    free = [(at(9), at(10, 45)), (at(11), at(11, 20))]
+
+    assert slice_slots(free, timedelta(minutes=30)) == [
+        (at(9), at(9, 30)),
+        (at(9, 30), at(10)),
+        (at(10), at(10, 30)),
+    ]
+
+
+def test_provider_slots_exclude_booked_time(client):
+    provider = setup_bookable_provider(client, duration_minutes=120)
+    headers, _ = create_user_and_login(client)
+    client.post("/appointments/", json={
+        "provider_id": provider["provider_id"],
+        "service_id": provider["service_id"],
+        "start_time": "2030-01-07T10:00:00",
+        "end_time": "2030-01-07T11:00:00",
+    }, headers=headers)
+
+    response = client.get(
+        f"/providers/{provider['provider_id']}/slots",
+        params={
+            "service_id": provider["service_id"],
+            "from": "2030-01-07T00:00:00",
+            "to": "2030-01-08T00:00:00",
+        },
+        headers=headers,
+    )
+
+    assert response.status_code == 200
+    assert response.json()["duration_minutes"] == 120
+    assert response.json()["slots"] == [
+        {"start_time": "2030-01-07T11:00:00", "end_time": "2030-01-07T13:00:00"},
+        {"start_time": "2030-01-07T13:00:00", "end_time": "2030-01-07T15:00:00"},
+        {"start_time": "2030-01-07T15:00:00", "end_time": "2030-01-07T17:00:00"},
+    ]
+
+
+def test_provider_slots_unknown_service(client):
+    provider = setup_bookable_provider(client)
+    headers, _ = create_user_and_login(client)
+
+    response = client.get(
+        f"/providers/{provider['provider_id']}/slots",
+        params={
+            "service_id": "00000000-0000-0000-0000-000000000000",
+            "from": "2030-01-07T00:00:00",
+            "to": "2030-01-08T00:00:00",
+        },
+        headers=headers,
+    )
+
+    assert response.status_code == 404
+
+
+def test_provider_slots_inactive_provider(client):
+    provider = setup_bookable_provider(client)
+    headers, _ = create_user_and_login(client)
+    response = client.delete(f"/users/{provider['provider_id']}", headers=provider["admin_headers"])
+    assert response.status_code == 200
+
+    response = client.get(
+        f"/providers/{provider['provider_id']}/slots",
+        params={"service_id": provider["service_id"], "from": "2030-01-07T00:00:00", "to": "2030-01-08T00:00:00"},
+        headers=headers,
+    )
+
+    assert response.status_code == 404
+
+
+def add_provider(client, service_id, start, end):
+    headers, provider_id = create_user_and_login(client, "provider")
+    client.post("/provider-services/create-provider-service", json={
+        "price": 80,
+        "duration_minutes": 60,
+        "service_id": service_id,
+        "provider_id": provider_id,
+    }, headers=headers)
+    client.post("/availability/create-availability", json={
+        "provider_id": provider_id,
+        "start_time": start,
+        "end_time": end,
+    }, headers=headers)
+    return provider_id
+
+
+def test_search_providers_ranked_by_earliest_slot(client):
+    provider = setup_bookable_provider(client)
+    headers, _ = create_user_and_login(client)
+    client.post("/appointments/", json={
+        "provider_id": provider["provider_id"],
+        "service_id": provider["service_id"],
+        "start_time": "2030-01-07T09:00:00",
+        "end_time": "2030-01-07T10:00:00",
+    }, headers=headers)
+    early = add_provider(client, provider["service_id"], "2030-01-07T09:30:00", "2030-01-07T12:00:00")
+    add_provider(client, provider["service_id"], "2030-01-07T09:00:00", "2030-01-07T09:45:00")
+
+    response = client.get("/providers/search", params={
+        "service_id": provider["service_id"],
+        "from": "2030-01-07T09:00:00",
+        "to": "2030-01-07T12:00:00",
+    }, headers=headers)
+
+    assert response.status_code == 200
+    assert [(item["provider_id"], item["earliest_slot"]["start_time"]) for item in response.json()] == [
+        (early, "2030-01-07T09:30:00"),
+        (provider["provider_id"], "2030-01-07T10:00:00"),
+    ]
+
+
+def test_search_merges_adjacent_windows(client):
+    provider = setup_bookable_provider(client)
+    headers, _ = create_user_and_login(client)
+    # هیچ‌کدوم به تنهایی جای یه نوبت ۶۰ دقیقه‌ای رو نداره
+    provider_id = add_provider(client, provider["service_id"], "2030-01-08T09:00:00", "2030-01-08T09:30:00")
+    response = client.post("/availability/create-availability", json={
+        "provider_id": provider_id, "start_time": "2030-01-08T09:30:00", "end_time": "2030-01-08T10:00:00",
+    }, headers=provider["admin_headers"])
+    assert response.status_code == 200
+    window = {"from": "2030-01-08T00:00:00", "to": "2030-01-09T00:00:00"}
+
+    response = client.get("/providers/search", params={"service_id": provider["service_id"], **window}, headers=headers)
+    assert response.status_code == 200
+    assert [(item["provider_id"], item["earliest_slot"]["start_time"]) for item in response.json()] == [
+        (provider_id, "2030-01-08T09:00:00"),
+    ]
+
+    slots = client.get(
+        f"/providers/{provider_id}/slots", params={"service_id": provider["service_id"], **window}, headers=headers,
+    ).json()["slots"]
+    assert slots == [{"start_time": "2030-01-08T09:00:00", "end_time": "2030-01-08T10:00:00"}]
@@ -0,0 +1,37 @@
+from app.core.config import settings
+from app.db.slow_query import normalize, parameter_shapes, slow_query_log
+from tests.utils import create_user_and_login, setup_bookable_provider
+
+
+def test_normalize_collapses_literals_and_lists():
+    first = normalize("SELECT * FROM appointments WHERE id IN (?, ?, ?) AND status = 'pending' LIMIT 51")
+    second = normalize("SELECT  *  FROM appointments\nWHERE id IN (?) AND status = 'confirmed' LIMIT 11")
+    assert first == second == "SELECT * FROM appointments WHERE id IN (...) AND status = ? LIMIT ?"
+    assert normalize("INSERT INTO t (a, b) VALUES ($1, $2), ($3, $4)") == "INSERT INTO t (a, b) VALUES (...)"
+    assert parameter_shapes({"id": 1, "name": "x"}, False) == {"id": "int", "name": "str"}
+    assert parameter_shapes([(1,), (2,)], True) == {"rows": 2, "shape": ["int"]}
+
+
+def test_slow_queries_aggregated_by_fingerprint(client, monkeypatch):
+    monkeypatch.setattr(settings, "SLOW_QUERY_THRESHOLD_MS", 0.000001)
+    slow_query_log.clear()
+    provider = setup_bookable_provider(client)
+    headers, _ = create_user_and_login(client)
+    for hour in (9, 10):
+        client.post("/appointments/", json={
+            "provider_id": provider["provider_id"],
+            "service_id": provider["service_id"],
+            "start_time": f"2030-01-09T{hour:02d}:00:00",
+            "end_time": f"2030-01-09T{hour:02d}:30:00",
+        }, headers=headers)
+    monkeypatch.setattr(settings, "SLOW_QUERY_THRESHOLD_MS", 0)
+
+    response = client.get("/metrics/slow-queries", params={"limit": 500}, headers=provider["admin_headers"])
+    assert response.status_code == 200
+    queries = response.json()["queries"]
+    booking = next(q for q in queries if q["statement"].startswith("INSERT INTO appointments"))
+    assert booking["count"] == 2
+    assert booking["routes"] == {"/appointments/": 2}
+    assert provider["provider_id"].replace("-", "") not in booking["statement"]
+    # sqlite پارامترها رو positional می‌گیره؛ فقط نوع‌ها ذخیره می‌شن
+    assert booking["parameter_shapes"] and set(booking["parameter_shapes"]) <= {"str", "int", "float"}
@@ -0,0 +1,150 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from sqlalchemy import update
+
+from app.core.config import settings
+from app.core.security import auth_cache
+from app.core.tokens import jwt_keys, token_versions
+from app.models.user import User
+from tests.conftest import TestingSessionLocal
+from tests.utils import QueryCounter, create_user_and_login
+
+
+@pytest.fixture
+def stateless(monkeypatch):
+    monkeypatch.setattr(settings, "AUTH_MODE", "stateless")
+    token_versions.clear()
+    yield
+    token_versions.clear()
+
+
+@pytest.fixture
+def rsa_keys(monkeypatch):
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode()
+    monkeypatch.setattr(settings, "JWT_ALGORITHM", "RS256")
+    monkeypatch.setattr(settings, "JWT_PRIVATE_KEY", pem)
+    monkeypatch.setattr(settings, "JWT_KEY_ID", "test-key")
+    jwt_keys.cache_clear()
+    yield key
+    jwt_keys.cache_clear()
+
+
+def test_access_token_carries_claims(client):
+    headers, user_id = create_user_and_login(client, "provider")
+    payload = jwt.decode(headers["Authorization"][7:], options={"verify_signature": False})
+
+    assert payload["user_id"] == user_id
+    assert payload["role"] == "provider"
+    assert payload["active"] is True
+    assert payload["ver"] == 0
+    assert payload["exp"] - payload["iat"] == settings.ACCESS_TOKEN_EXPIRE_SECONDS
+
+
+def test_stateless_mode_skips_user_lookup(client, stateless):
+    headers, _ = create_user_and_login(client, "admin")
+    assert client.get("/metrics/auth-cache", headers=headers).status_code == 200
+    auth_cache.clear()
+
+    with QueryCounter() as counter:
+        response = client.get("/metrics/token-versions", headers=headers)
+
+    assert response.status_code == 200
+    assert counter.statements == []
+    assert response.json()["auth_mode"] == "stateless"
+
+
+def test_password_change_revokes_stateless_tokens(client, stateless):
+    headers, user_id = create_user_and_login(client)
+    assert client.get("/appointments/", headers=headers).status_code == 200
+
+    response = client.put(f"/users/{user_id}", headers=headers, json={
+        "full_name": "Changed",
+        "email": f"changed-{user_id[:8]}@test.com",
+        "password": "654321",
+    })
+    assert response.status_code == 200
+
+    # قبل و بعد از reload جدول نسخه‌ها
+    assert client.get("/appointments/", headers=headers).status_code == 401
+    token_versions.loaded_at = None
+    response = client.get("/appointments/", headers=headers)
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Token revoked"
+
+
+def test_profile_update_without_password_change_keeps_tokens(client, stateless):
+    headers, user_id = create_user_and_login(client)
+
+    response = client.put(f"/users/{user_id}", headers=headers, json={
+        "full_name": "Same Password",
+        "email": f"same-{user_id[:8]}@test.com",
+        "password": "123456",
+    })
+    assert response.status_code == 200
+
+    token_versions.loaded_at = None
+    assert client.get("/appointments/", headers=headers).status_code == 200
+    assert uuid.UUID(user_id) not in token_versions.versions
+
+
+async def test_reload_skips_revocations_older_than_token_lifetime(client, stateless):
+    headers, user_id = create_user_and_login(client)
+    client.put(f"/users/{user_id}", headers=headers, json={
+        "full_name": "Changed Twice",
+        "email": f"old-{user_id[:8]}@test.com",
+        "password": "654321",
+    })
+    async with TestingSessionLocal() as db:
+        await token_versions.reload(db)
+        assert uuid.UUID(user_id) in token_versions.versions
+
+        lifetime = timedelta(seconds=settings.REFRESH_TOKEN_EXPIRE_SECONDS + 60)
+        await db.execute(
+            update(User)
+            .where(User.id == uuid.UUID(user_id))
+            .values(token_version_changed_at=datetime.now(timezone.utc) - lifetime)
+        )
+        await db.commit()
+        await token_versions.reload(db)
+    assert uuid.UUID(user_id) not in token_versions.versions
+
+
+def test_deactivated_user_cannot_refresh(client, stateless):
+    email = "refresh-deactivated@test.com"
+    client.post("/auth/register", json={
+        "full_name": "Test User", "email": email,
+        "password": "123456", "password_confirm": "123456", "role": "client",
+    })
+    tokens = client.post("/auth/login", json={"email": email, "password": "123456"}).json()
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    user_id = jwt.decode(tokens["access_token"], options={"verify_signature": False})["user_id"]
+
+    assert client.post("/auth/refresh-token", json={"token": tokens["refresh_token"]}).status_code == 200
+    assert client.delete(f"/users/{user_id}", headers=headers).status_code == 200
+
+    token_versions.loaded_at = None
+    assert client.post("/auth/refresh-token", json={"token": tokens["refresh_token"]}).status_code == 401
+
+
+def test_rs256_tokens_verify_with_published_jwks(client, rsa_keys):
+    headers, user_id = create_user_and_login(client)
+    token = headers["Authorization"][7:]
+    assert jwt.get_unverified_header(token)["kid"] == "test-key"
+    assert client.get("/appointments/", headers=headers).status_code == 200
+
+    jwk_set = jwt.PyJWKSet.from_dict(client.get("/auth/.well-known/jwks.json").json())
+    key = jwk_set["test-key"]
+    payload = jwt.decode(token, key.key, algorithms=["RS256"], issuer=settings.JWT_ISSUER)
+    assert payload["user_id"] == user_id
+
+
+def test_hs256_publishes_no_keys(client):
+    assert client.get("/auth/.well-known/jwks.json").json() == {"keys": []}
@@ -0,0 +1,83 @@
+from tests.utils import QueryCounter, create_user_and_login, setup_bookable_provider
+
+
+def data_statements(counter):
+    return [s.split()[0] for s in counter.statements]
+
+
+def test_writes_do_not_refresh(client):
+    provider = setup_bookable_provider(client)
+    admin, provider_headers = provider["admin_headers"], provider["provider_headers"]
+    # auth cache گرم بشه تا lookup کاربر شمرده نشه
+    client.get("/services/list-service", headers=admin)
+    client.get("/availability/list-availability", headers=provider_headers)
+
+    with QueryCounter() as counter:
+        created = client.post("/services/create-service", json={"name": "roundtrip-svc"}, headers=admin)
+    assert created.status_code == 200 and created.json()["created_at"]
+    assert data_statements(counter) == ["SELECT", "INSERT"]
+    assert "RETURNING created_at" in counter.statements[-1]
+
+    with QueryCounter() as counter:
+        updated = client.put(
+            f"/services/update-service/{created.json()['id']}",
+            json={"name": "roundtrip-svc", "description": "changed"},
+            headers=admin,
+        )
+    assert updated.json()["description"] == "changed"
+    assert data_statements(counter) == ["SELECT", "UPDATE"]
+
+    with QueryCounter() as counter:
+        availability = client.post("/availability/create-availability", json={
+            "provider_id": provider["provider_id"],
+            "start_time": "2031-02-01T09:00:00",
+            "end_time": "2031-02-01T12:00:00",
+        }, headers=provider_headers)
+    assert availability.status_code == 200 and availability.json()["created_at"]
+    assert data_statements(counter) == ["INSERT"]
+
+    with QueryCounter() as counter:
+        response = client.put(f"/availability/update-availability/{availability.json()['id']}", json={
+            "provider_id": provider["provider_id"],
+            "start_time": "2031-02-01T10:00:00",
+            "end_time": "2031-02-01T12:00:00",
+        }, headers=provider_headers)
+    assert response.json()["start_time"] == "2031-02-01T10:00:00"
+    assert data_statements(counter) == ["SELECT", "UPDATE"]
+
+
+def test_booking_and_profile_writes_do_not_refresh(client):
+    provider = setup_bookable_provider(client)
+    headers, user_id = create_user_and_login(client)
+    client.get("/appointments/", headers=headers)
+    client.get("/provider-services/list-provider-service", headers=provider["provider_headers"])
+
+    with QueryCounter() as counter:
+        booked = client.post("/appointments/", json={
+            "provider_id": provider["provider_id"],
+            "service_id": provider["service_id"],
+            "start_time": "2030-01-07T09:00:00",
+            "end_time": "2030-01-07T10:00:00",
+        }, headers=headers)
+    assert booked.status_code == 200 and booked.json()["created_at"]
+    # خود نوبت و upsert rollup؛ created_at با RETURNING
+    assert data_statements(counter) == ["INSERT", "INSERT"]
+    assert "created_at" in counter.statements[0].split("RETURNING")[1]
+
+    with QueryCounter() as counter:
+        response = client.put(f"/provider-services/update-provider-service/{provider['provider_service_id']}", json={
+            "provider_id": provider["provider_id"], "service_id": provider["service_id"],
+            "price": 150, "duration_minutes": 45,
+        }, headers=provider["provider_headers"])
+    assert response.json()["price"] == 150
+    assert data_statements(counter) == ["SELECT", "UPDATE"]
+
+    with QueryCounter() as counter:
+        response = client.put(f"/users/{user_id}", json={
+            "full_name": "Roundtrip User",
+            "email": f"roundtrip-{user_id[:8]}@test.com",
+            "password": "123456",
+        }, headers=headers)
+    assert response.json()["full_name"] == "Roundtrip User"
+    # کاربر، بررسی تکراری نبودن email، update
+    assert data_statements(counter) == ["SELECT", "SELECT", "UPDATE"]
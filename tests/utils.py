@@ -1,3 +1,9 @@
+import uuid
+
+import jwt
+from sqlalchemy import event
+
+
 def register_and_login(client, role="client"):
     register_response = client.post("/auth/register", json={
         "full_name": "Test User",
@@ -23,3 +29,88 @@ def register_and_login(client, role="client"):
     assert "access_token" in data
 
     return data["access_token"]
+
+
+def create_user_and_login(client, role="client"):
+    email = f"{role}-{uuid.uuid4().hex[:12]}@test.com"
+    register_response = client.post("/auth/register", json={
+        "full_name": "Test User",
+        "email": email,
+        "password": "123456",
+        "password_confirm": "123456",
+        "role": role
+    })
+    assert register_response.status_code in (200, 201)
+
+    login_response = client.post(
+        "/auth/login",
+        json={"email": email, "password": "123456"}
+    )
+    assert login_response.status_code == 200
+
+    token = login_response.json()["access_token"]
+    user_id = jwt.decode(token, options={"verify_signature": False})["user_id"]
+    return {"Authorization": f"Bearer {token}"}, user_id
+
+
+def setup_bookable_provider(client, duration_minutes=60):
+    admin_headers, _ = create_user_and_login(client, "admin")
+    provider_headers, provider_id = create_user_and_login(client, "provider")
+
+    service = client.post(
+        "/services/create-service",
+        json={"name": f"service-{uuid.uuid4().hex[:8]}"},
+        headers=admin_headers,
+    )
+    assert service.status_code == 200
+    service_id = service.json()["id"]
+
+    provider_service = client.post(
+        "/provider-services/create-provider-service",
+        json={
+            "price": 100,
+            "duration_minutes": duration_minutes,
+            "service_id": service_id,
+            "provider_id": provider_id,
+        },
+        headers=provider_headers,
+    )
+    assert provider_service.status_code == 200
+
+    availability = client.post(
+        "/availability/create-availability",
+        json={
+            "provider_id": provider_id,
+            "start_time": "2030-01-07T09:00:00",
+            "end_time": "2030-01-07T17:00:00",
+        },
+        headers=provider_headers,
+    )
+    assert availability.status_code == 200
+
+    return {
+        "admin_headers": admin_headers,
+        "provider_headers": provider_headers,
+        "provider_id": provider_id,
+        "service_id": service_id,
+        "provider_service_id": provider_service.json()["id"],
+    }
+
+
+class QueryCounter:
+    """Collects the SQL statements the test engine runs inside the block."""
+
+    def __init__(self):
+        from tests.conftest import engine_test
+        self.engine = engine_test
+        self.statements = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        event.listen(self.engine.sync_engine, "before_cursor_execute", self)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine.sync_engine, "before_cursor_execute", self)